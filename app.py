@@ -1,18 +1,16 @@
 # app.py
 import streamlit as st
-import home
-import current
-import vision
-import phase1
-import phase2
-import phase3   # <-- NEW: must expose render_phase3()
-import finance  # must expose render_finance()
+import instrumentation
+from assets import report_missing_assets
 
 # ----------------------------------------------------
 # Page config
 # ----------------------------------------------------
 st.set_page_config(page_title="Amas Data-Driven Strategy", layout="wide")
 
+# Log referenced assets that are missing (once per process)
+report_missing_assets()
+
 # ----------------------------------------------------
 # Auth (simple access code)
 # ----------------------------------------------------
@@ -46,16 +44,33 @@ st.sidebar.image("input/logo.jpg", use_container_width=True)
 st.sidebar.title("Navigation")
 st.sidebar.markdown("### AMAS's Data-Driven Strategy for 2025")
 
+# Page name -> (module, render function). Page modules are imported only when
+# first selected; sys.modules keeps them for later reruns, so the
+# auth screen and light pages never pay for PIL, plotly, lottie or mysql.
 PAGES = {
-    "Home": "Home",
-    "Current Stage": "Current Stage",
-    "Vision": "Vision",
-    "Phase 1": "Phase 1",
-    "Phase 2": "Phase 2",
-    "Phase 3": "Phase 3",   # <-- NEW
-    "Finance": "Finance",
+    "Home": ("home", "render_home"),
+    "Current Stage": ("current", "render_current_stage"),
+    "Vision": ("vision", "render_vision"),
+    "Phase 1": ("phase1", "render_phase1"),
+    "Phase 2": ("phase2", "render_phase2"),
+    "Phase 3": ("phase3", "render_phase3"),
+    "Finance": ("finance", "render_finance"),
+    "Report": ("report", "render_report"),
+}
+
+# Not listed in the sidebar; reachable with ?page=diagnostics or ?page=jobs
+HIDDEN_PAGES = {
+    "Diagnostics": ("diagnostics", "render_diagnostics"),
+    "Jobs": ("jobs_ui", "render_jobs_page"),
 }
 
+
+def load_page(name: str):
+    """Import the page module on first use (timing the import) and return its render function."""
+    module_name, func_name = {**PAGES, **HIDDEN_PAGES}[name]
+    return getattr(instrumentation.import_module(module_name), func_name)
+
+
 # Persist selected page across reruns
 if "active_page" not in st.session_state:
     st.session_state.active_page = "Home"
@@ -72,18 +87,9 @@ st.session_state.active_page = selected
 # Main content router
 # ----------------------------------------------------
 page = st.session_state.active_page
+hidden = {name.lower(): name for name in HIDDEN_PAGES}
+if st.query_params.get("page") in hidden:
+    page = hidden[st.query_params.get("page")]
 
-if page == "Home":
-    home.render_home()
-elif page == "Current Stage":
-    current.render_current_stage()
-elif page == "Vision":
-    vision.render_vision()
-elif page == "Phase 1":
-    phase1.render_phase1()
-elif page == "Phase 2":
-    phase2.render_phase2()
-elif page == "Phase 3":                # <-- NEW
-    phase3.render_phase3()
-elif page == "Finance":
-    finance.render_finance()
+with instrumentation.render_page(page):
+    load_page(page)()
@@ -0,0 +1,406 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+# ------------------- IMAGE DERIVATIVES -------------------
+# Derivatives are written here, named after the source content hash and width
+CACHE_DIR = os.path.join(".cache", "assets")
+
+# Widths are bounded for the wide layout: photos sit in 1/4 columns or at width=400,
+# so 800px stays sharp on high-DPI screens.
+DEFAULT_MAX_WIDTH = 800
+
+# Photos shown by the pages (pre-generated by `python assets.py`)
+PAGE_IMAGES = [
+    "input/manual.jpg",
+    "input/roadmap.jpg",
+    "input/receiving.jpg",
+    "input/inventory.jpg",
+    "input/cashier.JPG",
+    "input/post.JPG",
+    "input/store.JPG",
+    "input/seamless.jpeg",
+    "input/integ.jpeg",
+    "input/well.jpeg",
+    "input/ceo.jpeg",
+    "input/hr.jpg",
+    "input/report.jpg",
+]
+
+_FORMATS = {"JPEG": ".jpg", "WEBP": ".webp"}
+
+# (path, mtime_ns, size) -> sha256 hex digest, so unchanged files are hashed once per process
+_hash_cache = {}
+
+
+def file_hash(path: str) -> str:
+    """Return the SHA-256 of a file's contents, memoized on its mtime and size."""
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    digest = _hash_cache.get(key)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        _hash_cache[key] = digest
+    return digest
+
+
+# ------------------- CONTENT-ADDRESSED MANIFEST -------------------
+# Built by `python assets.py manifest`: maps every file under input/ to its content
+# hash (with its size and a fingerprint of its first and last bytes, which survive a
+# git checkout unlike mtimes), and every distinct blob to one canonical file. Pages
+# resolve assets through it so byte-identical files are loaded (and their
+# derivatives built) only once. `python assets.py manifest --dedupe` also replaces
+# the duplicate files on disk with hard links to the canonical copy.
+ASSET_ROOT = "input"
+MANIFEST_PATH = os.path.join(ASSET_ROOT, "manifest.json")
+
+_manifest_cache = {"mtime": None, "data": {"files": {}, "blobs": {}, "stats": {}}}
+
+
+def _normalize(path: str) -> str:
+    return os.path.normpath(path).replace(os.sep, "/")
+
+
+# Bytes read from each end of a file for its fingerprint
+FINGERPRINT_BYTES = 64 * 1024
+
+# (path, mtime_ns, size) -> fingerprint, so unchanged files are read once per process
+_fingerprint_cache = {}
+
+
+def file_fingerprint(path: str) -> list:
+    """
+    [size, hash of the first and last FINGERPRINT_BYTES]: a cheap check that a file
+    still has the content the manifest recorded.
+    """
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    fingerprint = _fingerprint_cache.get(key)
+    if fingerprint is None:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            h.update(f.read(FINGERPRINT_BYTES))
+            if stat.st_size > FINGERPRINT_BYTES:
+                f.seek(max(stat.st_size - FINGERPRINT_BYTES, FINGERPRINT_BYTES))
+                h.update(f.read())
+        fingerprint = [stat.st_size, h.hexdigest()[:16]]
+        _fingerprint_cache[key] = fingerprint
+    return fingerprint
+
+
+def dedupe_blobs(blobs: dict) -> int:
+    """
+    Replace every alias of a blob with a hard link to its canonical file, so the
+    duplicate content is stored once on disk. Returns the number of bytes freed.
+    """
+    freed = 0
+    for blob in blobs.values():
+        canonical = os.stat(blob["path"])
+        for alias in blob["aliases"]:
+            if os.path.samefile(alias, blob["path"]):
+                continue
+            tmp = f"{alias}.{os.getpid()}.tmp"
+            os.link(blob["path"], tmp)
+            os.replace(tmp, alias)
+            freed += canonical.st_size
+    return freed
+
+
+def build_manifest(root: str = ASSET_ROOT, manifest_path: str = MANIFEST_PATH, dedupe: bool = False) -> dict:
+    """
+    Hash every file under `root` and write the manifest. With `dedupe`, duplicate
+    files are replaced by hard links to their canonical copy. Returns the manifest.
+    """
+    manifest_path = _normalize(manifest_path)
+    files = {}
+    groups = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            path = _normalize(os.path.join(dirpath, name))
+            if path == manifest_path:
+                continue
+            digest = file_hash(path)
+            files[path] = digest
+            groups.setdefault(digest, []).append(path)
+
+    # The canonical copy of a duplicated blob is a path the pages reference, if any
+    referenced = {_normalize(p) for p in referenced_assets()}
+    blobs = {}
+    for digest, paths in groups.items():
+        paths = sorted(paths, key=lambda p: (p not in referenced, p))
+        blobs[digest] = {"path": paths[0], "size": os.path.getsize(paths[0]), "aliases": paths[1:]}
+
+    freed = dedupe_blobs(blobs) if dedupe else 0
+    stats = {path: file_fingerprint(path) for path in files}
+
+    manifest = {"version": 3, "files": files, "blobs": blobs, "stats": stats}
+    if dedupe:
+        manifest["deduped_bytes"] = freed
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    return manifest
+
+
+def load_manifest() -> dict:
+    """Return the parsed manifest (empty if none was built), reloaded when it changes."""
+    try:
+        mtime = os.stat(MANIFEST_PATH).st_mtime_ns
+    except OSError:
+        return {"files": {}, "blobs": {}, "stats": {}}
+    if _manifest_cache["mtime"] != mtime:
+        with open(MANIFEST_PATH, "r") as f:
+            _manifest_cache["data"] = json.load(f)
+        _manifest_cache["mtime"] = mtime
+    return _manifest_cache["data"]
+
+
+def _manifest_digest(path: str):
+    """The manifest's hash of `path`, or None when the file changed (size or fingerprint) since it was hashed."""
+    manifest = load_manifest()
+    key = _normalize(path)
+    digest = manifest["files"].get(key)
+    recorded = manifest.get("stats", {}).get(key)
+    if digest is None or recorded is None:
+        return None
+    try:
+        return digest if file_fingerprint(path) == recorded else None
+    except OSError:
+        return None
+
+
+def asset_hash(path: str) -> str:
+    """
+    Content hash of an asset: taken from the manifest when the recorded size and
+    fingerprint still match the file on disk, otherwise computed (and memoized) from the file.
+    """
+    return _manifest_digest(path) or file_hash(path)
+
+
+def resolve_asset(path: str) -> str:
+    """Return the canonical file for `path`'s content (itself if unique, changed or not in the manifest)."""
+    digest = _manifest_digest(path)
+    blob = load_manifest()["blobs"].get(digest) if digest else None
+    if blob is not None and os.path.exists(blob["path"]):
+        return blob["path"]
+    return path
+
+
+def derivative_path(path: str, max_width: int = DEFAULT_MAX_WIDTH, fmt: str = "JPEG") -> str:
+    """Return the cache path of the derivative for `path` at `max_width` in `fmt`."""
+    stem = os.path.splitext(os.path.basename(path))[0].strip() or "image"
+    name = f"{stem}-{asset_hash(path)[:16]}-{max_width}{_FORMATS[fmt]}"
+    return os.path.join(CACHE_DIR, name)
+
+
+def build_derivative(path: str, target: str, max_width: int, fmt: str):
+    """Write an EXIF-orientation-corrected copy of `path`, scaled down to `max_width`."""
+    from PIL import Image, ImageOps
+
+    with Image.open(path) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.width > max_width:
+            height = round(image.height * max_width / image.width)
+            image = image.resize((max_width, height), Image.LANCZOS)
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp = f"{target}.{os.getpid()}.tmp"
+        try:
+            if fmt == "WEBP":
+                image.save(tmp, "WEBP", quality=80, method=4)
+            else:
+                image.save(tmp, "JPEG", quality=82, optimize=True, progressive=True)
+        except BaseException:
+            # don't leave a partial file behind in the cache
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+    os.replace(tmp, target)
+
+
+def webp_supported() -> bool:
+    """True if this Pillow build can write WebP."""
+    try:
+        from PIL import features
+        return bool(features.check("webp"))
+    except (ImportError, ValueError):
+        return False
+
+
+def _derivative(path: str, max_width: int, fmt: str) -> str:
+    target = derivative_path(path, max_width, fmt)
+    if not os.path.exists(target):
+        build_derivative(path, target, max_width, fmt)
+    return target
+
+
+def image_derivative(path: str, max_width: int = DEFAULT_MAX_WIDTH, fmt: str = None) -> str:
+    """
+    Return the path of an orientation-corrected, width-bounded derivative of `path`,
+    generating it on first use. Without `fmt`, both JPEG and (if Pillow supports it)
+    WebP are built and the smaller file is served. Falls back to the original if it
+    cannot be processed.
+    """
+    try:
+        path = resolve_asset(path)
+        if fmt is not None:
+            return _derivative(path, max_width, fmt)
+        target = _derivative(path, max_width, "JPEG")
+        if webp_supported():
+            webp = _derivative(path, max_width, "WEBP")
+            if os.path.getsize(webp) < os.path.getsize(target):
+                target = webp
+        return target
+    except (OSError, ValueError):
+        return path
+
+
+def pregenerate_derivatives(paths=None, widths=(DEFAULT_MAX_WIDTH,), formats=(None,)):
+    """
+    Generate all derivatives up front (e.g. at deploy time) and print the savings.
+    The default format (None) builds what image_derivative serves.
+    """
+    for path in paths or PAGE_IMAGES:
+        if not os.path.exists(path):
+            print(f"missing: {path}")
+            continue
+        for width in widths:
+            for fmt in formats:
+                target = image_derivative(path, width, fmt)
+                before, after = os.path.getsize(path), os.path.getsize(target)
+                print(f"{path} -> {target}: {before:,} -> {after:,} bytes")
+
+
+# ------------------- LOTTIE ANIMATIONS -------------------
+# Every animation referenced by a page, checked once at startup
+LOTTIE_ASSETS = [
+    # Phase 1 plan
+    "input/arrive.json",
+    "input/inventory.json",
+    "input/store.json",
+    "input/order.json",
+    "input/postsell.json",
+    # Phase 2 plan
+    "input/phase2/monitoring.json",
+    "input/phase2/security.json",
+    "input/phase2/datacollection.json",
+    "input/phase2/Automation.json",
+    "input/phase2/helpdesk.json",
+    "input/phase2/stock.json",
+    "input/phase2/server.json",
+    "input/phase2/migration.json",
+]
+
+# abspath -> (mtime_ns, parsed animation); shared by all sessions of the process
+_lottie_cache = {}
+_lottie_lock = threading.Lock()
+_missing_reported = False
+
+
+def _lottie_variant(path: str) -> str:
+    """
+    Prefer the minified variant written by lottie_optimizer.py ("<name>.min.json")
+    as long as it is at least as new as the source file.
+    """
+    minified = path[:-len(".json")] + ".min.json"
+    try:
+        if os.stat(minified).st_mtime_ns >= os.stat(path).st_mtime_ns:
+            return minified
+    except OSError:
+        pass
+    return path
+
+
+def load_lottie(path: str):
+    """
+    Return the parsed Lottie animation at `path`, or None if the file is missing.
+    Each file is parsed once per process and re-read only when its mtime changes.
+    """
+    key = os.path.abspath(_lottie_variant(resolve_asset(path)))
+    try:
+        mtime = os.stat(key).st_mtime_ns
+    except OSError:
+        return None
+
+    cached = _lottie_cache.get(key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    with _lottie_lock:
+        cached = _lottie_cache.get(key)
+        if cached is None or cached[0] != mtime:
+            with open(key, "r") as f:
+                cached = (mtime, json.load(f))
+            _lottie_cache[key] = cached
+    return cached[1]
+
+
+# Other assets referenced directly by the pages
+OTHER_ASSETS = ["input/logo.jpg"]
+
+
+def referenced_assets() -> list:
+    """Every asset path the pages reference."""
+    return PAGE_IMAGES + LOTTIE_ASSETS + OTHER_ASSETS
+
+
+def missing_assets(paths=None) -> list:
+    """Return the referenced asset paths that do not exist on disk."""
+    return [path for path in (paths or referenced_assets()) if not os.path.exists(path)]
+
+
+def unindexed_assets(paths=None) -> list:
+    """Return referenced assets that exist but are absent from the manifest (stale manifest)."""
+    files = load_manifest()["files"]
+    return [
+        path for path in (paths or referenced_assets())
+        if os.path.exists(path) and _normalize(path) not in files
+    ]
+
+
+def report_missing_assets() -> list:
+    """
+    Validate referenced assets once per process (called at app startup):
+    log files that are missing and files the manifest does not know about.
+    Returns the missing paths.
+    """
+    global _missing_reported
+    missing = missing_assets()
+    if not _missing_reported:
+        _missing_reported = True
+        for path in missing:
+            logger.warning("Referenced asset is missing: %s", path)
+        if os.path.exists(MANIFEST_PATH):
+            for path in unindexed_assets():
+                logger.warning("Asset is not in %s (rebuild with `python assets.py manifest`): %s", MANIFEST_PATH, path)
+    return missing
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build static asset artifacts.")
+    parser.add_argument("command", nargs="?", default="images", choices=["images", "manifest"])
+    parser.add_argument("--dedupe", action="store_true", help="Hard-link duplicate files to their canonical copy")
+    args = parser.parse_args()
+
+    if args.command == "manifest":
+        manifest = build_manifest(dedupe=args.dedupe)
+        duplicates = {d: b for d, b in manifest["blobs"].items() if b["aliases"]}
+        print(f"{len(manifest['files'])} files, {len(manifest['blobs'])} unique blobs -> {MANIFEST_PATH}")
+        for blob in duplicates.values():
+            print(f"  {blob['path']} == {', '.join(blob['aliases'])} ({blob['size']:,} bytes)")
+        if args.dedupe:
+            print(f"Freed {manifest['deduped_bytes']:,} bytes by hard-linking duplicates")
+    else:
+        pregenerate_derivatives()
@@ -2,54 +2,24 @@ import streamlit as st
 import pandas as pd
 import sqlite3
 import datetime
-import base64
 import json
-import requests
+import math
+import os
+from instrumentation import timed_read_sql
 
 from subtasks import (
     initialize_subtasks_database,
     upload_csv_subtasks,
     delete_subtask_from_db,
+    push_db_to_github,
 )
 
-from database_phases import render_database_phases_page  # Existing Database Phases functionality
-
-
-# ------------------- GITHUB UPLOAD FUNCTION -------------------
-def upload_file_to_github(
-    github_user: str,
-    github_repo: str,
-    github_pat: str,
-    file_path: str,
-    local_file_path: str,
-    commit_message: str,
-):
-    """
-    Upload or update a file (e.g., 'subtasks.db') in the given GitHub repo.
-    """
-    url = f"https://api.github.com/repos/{github_user}/{github_repo}/contents/{file_path}"
-    headers = {"Authorization": f"Bearer {github_pat}"}
-
-    with open(local_file_path, "rb") as file:
-        content = file.read()
-
-    b64_content = base64.b64encode(content).decode("utf-8")
-
-    # Check if file exists on GitHub to get its 'sha'
-    response = requests.get(url, headers=headers)
-    sha = response.json()["sha"] if response.status_code == 200 else None
-
-    payload = {
-        "message": commit_message,
-        "content": b64_content,
-        "sha": sha,
-    }
-
-    response = requests.put(url, headers=headers, data=json.dumps(payload))
-    if response.status_code in [200, 201]:
-        st.success("Database successfully pushed to GitHub.")
-    else:
-        st.error(f"Failed to upload file to GitHub: {response.status_code}\n{response.text}")
+from database_phases import (  # Existing Database Phases functionality
+    render_database_phases_page,
+    quote_identifier,
+    ensure_version_triggers,
+    get_table_version,
+)
 
 
 # ------------------- DB HELPERS -------------------
@@ -67,8 +37,202 @@ def fetch_data_from_table(conn: sqlite3.Connection, table_name: str) -> pd.DataF
     """
     Fetch all data from a specified table as a pandas DataFrame.
     """
-    query = f"SELECT * FROM {table_name}"
-    return pd.read_sql_query(query, conn)
+    query = f"SELECT * FROM {quote_identifier(table_name)}"
+    return timed_read_sql(query, conn, label=f"backend.fetch_table:{table_name}")
+
+
+def get_table_columns(conn: sqlite3.Connection, table_name: str) -> list:
+    """
+    Return the column names of a table (empty list if the table does not exist).
+    """
+    rows = conn.execute(f"PRAGMA table_info({quote_identifier(table_name)})").fetchall()
+    return [row[1] for row in rows]
+
+
+def database_file_stamp(conn: sqlite3.Connection) -> tuple:
+    """
+    Return (path, mtime_ns, size) of the main database file and of its `-wal` file.
+    Any committed write changes the stamp (in WAL mode commits only touch the
+    `-wal` file until a checkpoint), so it can key cached results.
+    """
+    path = conn.execute("PRAGMA database_list").fetchone()[2]
+    stamp = [path]
+    for file in (path, f"{path}-wal") if path else ():
+        try:
+            stat = os.stat(file)
+            stamp += [stat.st_mtime_ns, stat.st_size]
+        except OSError:
+            stamp += [0, 0]
+    return tuple(stamp)
+
+
+def build_filter_clause(filters: dict) -> tuple:
+    """
+    Build a WHERE clause from {column: text} "contains" filters.
+    Returns (sql, params); sql is empty when there are no active filters.
+    """
+    clauses = []
+    params = []
+    for col, text in filters.items():
+        if text:
+            clauses.append(f"CAST({quote_identifier(col)} AS TEXT) LIKE ?")
+            params.append(f"%{text}%")
+    if not clauses:
+        return "", []
+    return " WHERE " + " AND ".join(clauses), params
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def count_table_rows(_conn: sqlite3.Connection, table_name: str, filters: dict, stamp: tuple) -> int:
+    """
+    COUNT(*) of a table under the given filters, cached until the database file changes.
+    """
+    where, params = build_filter_clause(filters)
+    query = f"SELECT COUNT(*) FROM {quote_identifier(table_name)}{where}"
+    return _conn.execute(query, params).fetchone()[0]
+
+
+def fetch_table_page(
+    conn: sqlite3.Connection,
+    table_name: str,
+    columns: list,
+    filters: dict,
+    sort_column: str = None,
+    descending: bool = False,
+    page: int = 1,
+    page_size: int = 50,
+) -> pd.DataFrame:
+    """
+    Fetch a single page of a table, projecting only `columns`.
+    Filtering, sorting and paging are all done by SQLite (LIMIT/OFFSET).
+    """
+    projection = ", ".join(quote_identifier(c) for c in columns)
+    where, params = build_filter_clause(filters)
+    query = f"SELECT {projection} FROM {quote_identifier(table_name)}{where}"
+    if sort_column:
+        query += f" ORDER BY {quote_identifier(sort_column)} {'DESC' if descending else 'ASC'}"
+    query += " LIMIT ? OFFSET ?"
+    params += [page_size, (page - 1) * page_size]
+    return timed_read_sql(query, conn, params=params, label=f"backend.table_page:{table_name}")
+
+
+# ------------------- TABLE PROFILING -------------------
+PROFILE_TABLE = "_table_profiles"
+
+
+def ensure_profile_table(conn: sqlite3.Connection):
+    """
+    Create the cache table holding per-column statistics.
+    Each row is keyed on the row count and data-version stamp it was computed for.
+    """
+    conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {PROFILE_TABLE} (
+            table_name TEXT NOT NULL,
+            column_name TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            row_count INTEGER NOT NULL,
+            data_version INTEGER NOT NULL,
+            stats TEXT NOT NULL,
+            computed_at TEXT NOT NULL,
+            PRIMARY KEY (table_name, column_name)
+        )
+        """
+    )
+
+
+def compute_column_stats(conn: sqlite3.Connection, table_name: str, columns: list, top_n: int = 5) -> dict:
+    """
+    Compute null count, distinct count, min and max for all `columns` in one
+    aggregate scan, plus the `top_n` most frequent values per column.
+    """
+    table = quote_identifier(table_name)
+    aggregates = []
+    for col in columns:
+        c = quote_identifier(col)
+        aggregates += [f"COUNT(*) - COUNT({c})", f"COUNT(DISTINCT {c})", f"MIN({c})", f"MAX({c})"]
+    row = conn.execute(f"SELECT {', '.join(aggregates)} FROM {table}").fetchone()
+
+    stats = {}
+    for i, col in enumerate(columns):
+        nulls, distinct, min_value, max_value = row[i * 4:(i + 1) * 4]
+        c = quote_identifier(col)
+        top = conn.execute(
+            f"SELECT {c}, COUNT(*) AS n FROM {table} WHERE {c} IS NOT NULL GROUP BY {c} ORDER BY n DESC LIMIT ?",
+            (top_n,),
+        ).fetchall()
+        stats[col] = {
+            "nulls": nulls,
+            "distinct": distinct,
+            "min": min_value,
+            "max": max_value,
+            "top": [[value, count] for value, count in top],
+        }
+    return stats
+
+
+def profile_table(conn: sqlite3.Connection, table_name: str, force: bool = False) -> pd.DataFrame:
+    """
+    Return per-column statistics for a table, one row per column.
+    Cached statistics are reused while the row count and data-version stamp
+    are unchanged; only stale or new columns are recomputed. Triggers bump the
+    stamp on every write to the table, so edits that keep the row count count too.
+    """
+    ensure_profile_table(conn)
+    with conn:
+        ensure_version_triggers(conn, table_name)
+    columns = get_table_columns(conn, table_name)
+    row_count = conn.execute(f"SELECT COUNT(*) FROM {quote_identifier(table_name)}").fetchone()[0]
+    version = get_table_version(conn, table_name)
+
+    cached = {
+        name: (cached_rows, cached_version, json.loads(stats), computed_at)
+        for name, cached_rows, cached_version, stats, computed_at in conn.execute(
+            f"SELECT column_name, row_count, data_version, stats, computed_at FROM {PROFILE_TABLE} WHERE table_name = ?",
+            (table_name,),
+        )
+    }
+    stale = [
+        col for col in columns
+        if force or col not in cached or cached[col][0] != row_count or cached[col][1] != version
+    ]
+
+    if stale:
+        computed_at = datetime.datetime.now().isoformat(timespec="seconds")
+        fresh = compute_column_stats(conn, table_name, stale)
+        with conn:
+            conn.execute(
+                f"DELETE FROM {PROFILE_TABLE} WHERE table_name = ? AND column_name NOT IN ({', '.join('?' for _ in columns)})",
+                (table_name, *columns),
+            )
+            conn.executemany(
+                f"""
+                INSERT OR REPLACE INTO {PROFILE_TABLE}
+                (table_name, column_name, position, row_count, data_version, stats, computed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (table_name, col, columns.index(col), row_count, version, json.dumps(fresh[col], default=str), computed_at)
+                    for col in stale
+                ],
+            )
+        for col in stale:
+            cached[col] = (row_count, version, fresh[col], computed_at)
+
+    records = []
+    for col in columns:
+        _, _, stats, computed_at = cached[col]
+        records.append({
+            "column": col,
+            "nulls": stats["nulls"],
+            "null %": round(100.0 * stats["nulls"] / row_count, 1) if row_count else 0.0,
+            "distinct": stats["distinct"],
+            "min": stats["min"],
+            "max": stats["max"],
+            "top values": ", ".join(f"{str(value)[:40]} ({count})" for value, count in stats["top"]),
+            "computed_at": computed_at,
+        })
+    return pd.DataFrame(records)
 
 
 # ------------------- BUDGET & TIMELINE FUNCTIONS -------------------
@@ -87,7 +251,7 @@ def fetch_tasks_for_budget_timeline(conn: sqlite3.Connection) -> pd.DataFrame:
         deadline
     FROM subtasks
     """
-    return pd.read_sql_query(query, conn)
+    return timed_read_sql(query, conn, label="backend.budget_timeline")
 
 
 def update_task_budget_and_timeline(
@@ -173,16 +337,9 @@ def render_budget_page(conn: sqlite3.Connection, github_user: str, github_repo:
         update_task_budget_and_timeline(conn, selected_id, new_budget, new_start_date, new_end_date)
         st.success(f"Task ID {selected_id} updated with new budget, start time, and end time.")
 
-        # Push changes to GitHub
+        # Push changes to GitHub (queued; runs in the background worker)
         commit_msg = f"Updated budget/timeline for Task {selected_id} at {datetime.datetime.now()}"
-        upload_file_to_github(
-            github_user=github_user,
-            github_repo=github_repo,
-            github_pat=github_pat,
-            file_path="subtasks.db",
-            local_file_path="subtasks.db",
-            commit_message=commit_msg
-        )
+        push_db_to_github(commit_message=commit_msg)
 
         # No st.experimental_rerun() call. Just show a success message.
         st.info("Changes saved. You may revisit this page to see updated data.")
@@ -210,13 +367,72 @@ def render_view_database_page(conn: sqlite3.Connection, github_user, github_repo
         return
 
     selected_table = st.selectbox("Select a table to view", options=tables)
-    if selected_table:
-        df = fetch_data_from_table(conn, selected_table)
-        if not df.empty:
-            st.write(f"### Table: {selected_table}")
-            st.dataframe(df)
-        else:
-            st.write(f"'{selected_table}' is empty.")
+    if not selected_table:
+        return
+
+    all_columns = get_table_columns(conn, selected_table)
+    columns = st.multiselect("Columns", options=all_columns, default=all_columns, key=f"cols_{selected_table}")
+    if not columns:
+        st.info("Select at least one column to display.")
+        return
+
+    c1, c2, c3 = st.columns([2, 1, 1])
+    with c1:
+        sort_choice = st.selectbox("Sort by", ["(table order)"] + all_columns, key=f"sort_{selected_table}")
+    with c2:
+        descending = st.checkbox("Descending", value=False, key=f"desc_{selected_table}")
+    with c3:
+        page_size = st.selectbox("Rows per page", [25, 50, 100, 500], index=1, key=f"size_{selected_table}")
+    sort_column = None if sort_choice == "(table order)" else sort_choice
+
+    filters = {}
+    with st.expander("Filters"):
+        filter_columns = st.multiselect("Filter columns", options=all_columns, key=f"fcols_{selected_table}")
+        for col in filter_columns:
+            filters[col] = st.text_input(f"{col} contains", key=f"filter_{selected_table}_{col}")
+
+    total_rows = count_table_rows(conn, selected_table, filters, database_file_stamp(conn))
+    if total_rows == 0:
+        st.write(f"'{selected_table}' is empty." if not any(filters.values()) else "No rows match the filters.")
+        return
+
+    total_pages = max(1, math.ceil(total_rows / page_size))
+    # Filters may have shrunk the result below the page kept in the widget state
+    page_key = f"page_{selected_table}"
+    if st.session_state.get(page_key, 1) > total_pages:
+        st.session_state[page_key] = total_pages
+    # No value=: the widget starts at min_value and is otherwise driven by its session state key
+    page = st.number_input("Page", min_value=1, max_value=total_pages, step=1, key=page_key)
+
+    df = fetch_table_page(conn, selected_table, columns, filters, sort_column, descending, int(page), page_size)
+    first_row = (int(page) - 1) * page_size + 1
+    st.write(f"### Table: {selected_table}")
+    st.caption(f"Rows {first_row:,}–{first_row + len(df) - 1:,} of {total_rows:,} (page {int(page)} of {total_pages:,})")
+    st.dataframe(df, use_container_width=True)
+
+
+# ------------------- TABLE PROFILE PAGE -------------------
+def render_table_profile_page(conn: sqlite3.Connection):
+    """
+    Page showing cached per-column statistics for a table.
+    """
+    st.title("Table Profile")
+    tables = [t for t in get_table_names(conn) if not t.startswith(("_", "sqlite_"))]
+    if not tables:
+        st.write("No tables found in the database.")
+        return
+
+    selected_table = st.selectbox("Select a table to profile", options=tables)
+    force = st.button("Recompute")
+
+    profile = profile_table(conn, selected_table, force=force)
+    if profile.empty:
+        st.write(f"'{selected_table}' has no columns.")
+        return
+
+    row_count = conn.execute(f"SELECT COUNT(*) FROM {quote_identifier(selected_table)}").fetchone()[0]
+    st.caption(f"{row_count:,} rows · data version {get_table_version(conn, selected_table)}")
+    st.dataframe(profile.astype({"min": str, "max": str}), use_container_width=True, hide_index=True)
 
 
 # ------------------- MAIN BACKEND RENDER -------------------
@@ -236,6 +452,7 @@ def render_backend():
     pages = {
         "Add Subtasks": lambda c: render_add_subtasks_page(c),
         "View Database": lambda c: render_view_database_page(c, github_user, github_repo, github_pat),
+        "Table Profile": lambda c: render_table_profile_page(c),
         "Database Phases": lambda _: render_database_phases_page(),
         # Budget & Timeline management
         "Budget & Timeline": lambda c: render_budget_page(c, github_user, github_repo, github_pat),
@@ -0,0 +1,76 @@
+import threading
+import time
+
+# ========================= CIRCUIT BREAKER =========================
+# closed  -> calls go through; `threshold` consecutive failures open the breaker
+# open    -> calls are refused (callers serve cached data); a background thread
+#            runs `probe` every `probe_interval` seconds and closes the breaker on
+#            the first success
+CLOSED = "closed"
+OPEN = "open"
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, probe=None, threshold: int = 3, probe_interval: float = 15.0):
+        self.name = name
+        self.probe = probe
+        self.threshold = threshold
+        self.probe_interval = probe_interval
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._prober = None
+
+    def allow(self) -> bool:
+        """True if calls may go to the protected resource."""
+        with self._lock:
+            return self.state == CLOSED
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.state = CLOSED
+            self.opened_at = None
+            self.last_error = None
+
+    def record_failure(self, error=None):
+        """Count a failure (timeout / unreachable); opens the breaker at the threshold."""
+        with self._lock:
+            self.failures += 1
+            self.last_error = str(error) if error is not None else None
+            if self.state == CLOSED and self.failures >= self.threshold:
+                self.state = OPEN
+                self.opened_at = time.time()
+                self._start_prober()
+
+    def _start_prober(self):
+        if self.probe is None or (self._prober is not None and self._prober.is_alive()):
+            return
+        self._prober = threading.Thread(target=self._probe_loop, name=f"{self.name}-probe", daemon=True)
+        self._prober.start()
+
+    def _probe_loop(self):
+        while True:
+            time.sleep(self.probe_interval)
+            with self._lock:
+                if self.state == CLOSED:
+                    return
+            try:
+                self.probe()
+            except Exception as e:
+                with self._lock:
+                    self.last_error = str(e)
+                continue
+            self.record_success()
+            return
+
+    def status(self) -> dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "failures": self.failures,
+                "opened_at": self.opened_at,
+                "last_error": self.last_error,
+            }
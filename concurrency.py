@@ -0,0 +1,82 @@
+import pandas as pd
+
+# ========================= OPTIMISTIC CONCURRENCY =========================
+# Editable rows carry a version number. An edit is written with a
+# compare-and-swap UPDATE (`... WHERE id = ? AND version = ?`) that also bumps
+# the version; when no row matches, someone else saved first and the editor
+# gets a ConcurrencyConflict with the row as it is now, to merge or discard.
+
+
+class ConcurrencyConflict(Exception):
+    """Raised when a row changed (or was deleted) since the editor loaded it."""
+
+    def __init__(self, row_id, current=None):
+        self.row_id = row_id
+        self.current = current  # dict of the row as stored now, or None if deleted
+        reason = "was deleted" if current is None else "was changed by someone else"
+        super().__init__(f"Row {row_id} {reason} since you started editing.")
+
+
+def _blank(v) -> bool:
+    """None, NaN/NaT and empty text all mean "no value" (widgets return "" for a NULL column)."""
+    if isinstance(v, str):
+        return v.strip() == ""
+    return v is None or bool(pd.isna(v))
+
+
+def _same(a, b) -> bool:
+    if _blank(a) or _blank(b):
+        return _blank(a) and _blank(b)
+    return str(a) == str(b)
+
+
+def changed_fields(base: dict, edited: dict, fields) -> list:
+    """Fields whose value in `edited` differs from `base`."""
+    return [f for f in fields if not _same(base.get(f), edited.get(f))]
+
+
+def three_way_merge(base: dict, mine: dict, theirs: dict, fields):
+    """
+    Merge two edits of the same row made from `base`.
+    Returns (merged, conflicts): fields only I changed take my value, fields only
+    they changed keep theirs, and fields we both changed differently are conflicts
+    (kept at their value in `merged`).
+    """
+    mine_changed = set(changed_fields(base, mine, fields))
+    theirs_changed = set(changed_fields(base, theirs, fields))
+    merged, conflicts = {}, []
+    for f in fields:
+        if f in mine_changed and f in theirs_changed and not _same(mine.get(f), theirs.get(f)):
+            conflicts.append(f)
+            merged[f] = theirs.get(f)
+        elif f in mine_changed:
+            merged[f] = mine.get(f)
+        else:
+            merged[f] = theirs.get(f)
+    return merged, conflicts
+
+
+def merge_view(base: dict, mine: dict, theirs: dict, fields) -> pd.DataFrame:
+    """Side-by-side table of the fields that differ between the original, my edit and the saved row."""
+    rows = []
+    for f in fields:
+        if _same(base.get(f), mine.get(f)) and _same(base.get(f), theirs.get(f)):
+            continue
+        mine_changed = not _same(base.get(f), mine.get(f))
+        theirs_changed = not _same(base.get(f), theirs.get(f))
+        if mine_changed and theirs_changed and not _same(mine.get(f), theirs.get(f)):
+            status = "conflict"
+        elif mine_changed:
+            status = "mine"
+        else:
+            status = "theirs"
+        rows.append({
+            "Field": f,
+            "Original": base.get(f),
+            "My Edit": mine.get(f),
+            "Saved Now": theirs.get(f),
+            "Status": status,
+        })
+    view = pd.DataFrame(rows, columns=["Field", "Original", "My Edit", "Saved Now", "Status"])
+    # Mixed value types per column; show everything as text
+    return view.astype(str)
@@ -4,94 +4,498 @@ import pandas as pd
 import csv
 import io
 import datetime
-import base64
 import json
-import requests
+import os
+import re
 
-# ------------------- GITHUB PUSH HELPER -------------------
-def upload_file_to_github(
-    github_user: str,
-    github_repo: str,
-    github_pat: str,
-    file_path: str,
-    local_file_path: str,
-    commit_message: str,
-):
+# ------------------- DATABASE HELPERS -------------------
+def initialize_database(db_name: str = "subtasks.db") -> sqlite3.Connection:
+    """Create/connect to the 'subtasks.db' database."""
+    return sqlite3.connect(db_name)
+
+def quote_identifier(name: str) -> str:
+    """Quote a table/column name for safe interpolation into SQLite statements."""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def detect_delimiter(s: str) -> str:
+    """Sniff the delimiter from the first 2KB of text, falling back to a comma."""
+    sniffer = csv.Sniffer()
+    sample = s[:min(len(s), 2048)]
+    try:
+        return sniffer.sniff(sample, delimiters=[",", "\t", ";", "|"]).delimiter
+    except csv.Error:
+        return ","
+
+
+# ------------------- SCHEMA INFERENCE & INDEXING -------------------
+SCHEMA_TABLE = "_table_schemas"
+VERSION_TABLE = "_table_versions"
+
+# Columns we always consider for an index when they are present in an import.
+KEY_COLUMN_HINTS = {"category", "aspect", "phase", "status"}
+
+# CSV types whole-valued floats as INTEGER while Parquet/Arrow keep the declared
+# float type, so the two numeric types are interchangeable when re-importing
+NUMERIC_TYPES = {"INTEGER", "REAL"}
+
+ISO_DATE_PATTERN = r"^\d{4}-\d{2}-\d{2}$"
+ISO_TIMESTAMP_PATTERN = r"^\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}(:\d{2}(\.\d+)?)?$"
+
+
+def infer_column_type(series: pd.Series) -> str:
     """
-    Upload or update a file (e.g., 'subtasks.db') in the given GitHub repo.
+    Infer the SQLite column type for a pandas Series:
+    INTEGER, REAL, DATE (ISO 'YYYY-MM-DD'), TIMESTAMP (ISO date + time) or TEXT.
     """
-    url = f"https://api.github.com/repos/{github_user}/{github_repo}/contents/{file_path}"
-    headers = {"Authorization": f"Bearer {github_pat}"}
+    values = series.dropna()
+    if values.empty:
+        return "TEXT"
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_integer_dtype(series):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(series):
+        # Integer columns with gaps are read as float by pandas
+        return "INTEGER" if (values == values.round()).all() else "REAL"
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return "TIMESTAMP"
 
-    # Read local file
-    with open(local_file_path, "rb") as file:
-        content = file.read()
+    text = values.astype(str).str.strip()
+    if text.str.match(ISO_DATE_PATTERN).all():
+        if pd.to_datetime(text, format="%Y-%m-%d", errors="coerce").notna().all():
+            return "DATE"
+    if text.str.match(ISO_TIMESTAMP_PATTERN).all():
+        if pd.to_datetime(text, format="ISO8601", errors="coerce").notna().all():
+            return "TIMESTAMP"
+    return "TEXT"
 
-    b64_content = base64.b64encode(content).decode("utf-8")
 
-    # Check if file exists on GitHub to get its 'sha'
-    response = requests.get(url, headers=headers)
-    sha = response.json()["sha"] if response.status_code == 200 else None
+def infer_schema(df: pd.DataFrame) -> list:
+    """Return the inferred schema as a list of (column_name, sql_type) tuples."""
+    return [(str(col), infer_column_type(df[col])) for col in df.columns]
 
-    payload = {
-        "message": commit_message,
-        "content": b64_content,
-        "sha": sha,
-    }
 
-    response = requests.put(url, headers=headers, data=json.dumps(payload))
-    if response.status_code in [200, 201]:
-        st.success("Database successfully pushed to GitHub.")
-    else:
-        st.error(f"Failed to upload file to GitHub: {response.status_code}\n{response.text}")
+def suggest_index_columns(df: pd.DataFrame, schema: list, max_ratio: float = 0.2) -> list:
+    """
+    Suggest columns worth indexing: known key columns (Category, Aspect, ...)
+    plus short, low-cardinality TEXT columns.
+    """
+    stats = {}
+    update_index_stats(stats, df, schema)
+    return suggest_from_index_stats(stats, schema, len(df), max_ratio)
 
 
-# ------------------- DATABASE HELPERS -------------------
-def initialize_database(db_name: str = "subtasks.db") -> sqlite3.Connection:
-    """Create/connect to the 'subtasks.db' database."""
-    return sqlite3.connect(db_name)
+# Distinct values tracked per candidate column before it is considered high-cardinality
+INDEX_STATS_MAX_DISTINCT = 50_000
 
-def create_table_from_file(conn: sqlite3.Connection, table_name: str, file_content: bytes, delimiter: str = None):
+
+def update_index_stats(stats: dict, df: pd.DataFrame, schema: list):
     """
-    Create (or replace) a table in 'subtasks.db' by reading the uploaded file_content.
+    Accumulate, per TEXT column, (non-null count, total text length, distinct values)
+    over successive chunks of a table; see suggest_from_index_stats.
     """
-    # Convert bytes to string
-    s = file_content.decode("utf-8", errors="ignore")
+    for col, sql_type in schema:
+        if sql_type != "TEXT" or col.lower() in KEY_COLUMN_HINTS or col not in df.columns:
+            continue
+        values = df[col].dropna().astype(str)
+        count, length, distinct = stats.get(col, (0, 0, set()))
+        if distinct is not None:
+            distinct.update(values.unique())
+            if len(distinct) > INDEX_STATS_MAX_DISTINCT:
+                distinct = None
+        stats[col] = (count + len(values), length + int(values.str.len().sum()), distinct)
+
+
+def suggest_from_index_stats(stats: dict, schema: list, n_rows: int, max_ratio: float = 0.2) -> list:
+    """Key columns plus short, low-cardinality TEXT columns, judged over all rows seen."""
+    suggestions = []
+    for col, sql_type in schema:
+        if col.lower() in KEY_COLUMN_HINTS:
+            suggestions.append(col)
+            continue
+        if sql_type != "TEXT" or n_rows < 20 or col not in stats:
+            continue
+        count, length, distinct = stats[col]
+        if not count or distinct is None or length / count > 64:
+            continue
+        if len(distinct) <= max(1, int(n_rows * max_ratio)):
+            suggestions.append(col)
+    return suggestions
+
+
+def coerce_to_schema(df: pd.DataFrame, schema: list) -> pd.DataFrame:
+    """Convert DataFrame columns into values matching the declared SQL types."""
+    out = pd.DataFrame(index=df.index)
+    for col, sql_type in schema:
+        series = df[col]
+        if sql_type == "INTEGER":
+            out[col] = pd.to_numeric(series, errors="coerce").astype("Int64")
+        elif sql_type == "REAL":
+            out[col] = pd.to_numeric(series, errors="coerce").astype("Float64")
+        elif sql_type == "DATE":
+            out[col] = pd.to_datetime(series, errors="coerce").dt.strftime("%Y-%m-%d")
+        elif sql_type == "TIMESTAMP":
+            out[col] = pd.to_datetime(series, format="ISO8601", errors="coerce").dt.strftime("%Y-%m-%dT%H:%M:%S")
+        else:
+            out[col] = series.astype("string")
+    return out
+
+
+def ensure_schema_table(conn: sqlite3.Connection):
+    """Create the metadata table that remembers the schema of every imported table."""
+    conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {SCHEMA_TABLE} (
+            table_name TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            column_name TEXT NOT NULL,
+            sql_type TEXT NOT NULL,
+            indexed INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (table_name, column_name)
+        )
+        """
+    )
+
+
+def ensure_version_table(conn: sqlite3.Connection):
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {VERSION_TABLE} (table_name TEXT PRIMARY KEY, version INTEGER NOT NULL, updated_at TEXT)"
+    )
+
+
+def ensure_version_triggers(conn: sqlite3.Connection, table_name: str):
+    """
+    Bump the data-version stamp of `table_name` on every INSERT, UPDATE and DELETE,
+    whichever page or job writes it (imports drop the table and its triggers, and
+    bump the version themselves).
+    """
+    ensure_version_table(conn)
+    name = str(table_name).replace("'", "''")
+    table = quote_identifier(table_name)
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        trigger = quote_identifier(f"_version_{table_name}_{event.lower()}")
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {trigger} AFTER {event} ON {table}
+            BEGIN
+                INSERT OR IGNORE INTO {VERSION_TABLE} (table_name, version) VALUES ('{name}', 0);
+                UPDATE {VERSION_TABLE} SET version = version + 1, updated_at = datetime('now', 'localtime')
+                WHERE table_name = '{name}';
+            END
+            """
+        )
+
+
+def bump_table_version(conn: sqlite3.Connection, table_name: str) -> int:
+    """Increment and return the data-version stamp of `table_name`."""
+    ensure_version_table(conn)
+    conn.execute(
+        f"""
+        INSERT INTO {VERSION_TABLE} (table_name, version, updated_at) VALUES (?, 1, ?)
+        ON CONFLICT(table_name) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at
+        """,
+        (table_name, datetime.datetime.now().isoformat(timespec="seconds")),
+    )
+    return get_table_version(conn, table_name)
+
+
+def get_table_version(conn: sqlite3.Connection, table_name: str) -> int:
+    """Return the data-version stamp of `table_name` (0 if it was never imported)."""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (VERSION_TABLE,)
+    ).fetchone()
+    if not exists:
+        return 0
+    row = conn.execute(f"SELECT version FROM {VERSION_TABLE} WHERE table_name = ?", (table_name,)).fetchone()
+    return row[0] if row else 0
+
+
+def load_table_schema(conn: sqlite3.Connection, table_name: str) -> list:
+    """Return the stored schema of a previously imported table (empty if unknown)."""
+    ensure_schema_table(conn)
+    rows = conn.execute(
+        f"SELECT column_name, sql_type FROM {SCHEMA_TABLE} WHERE table_name = ? ORDER BY position",
+        (table_name,),
+    ).fetchall()
+    return [(name, sql_type) for name, sql_type in rows]
+
+
+def validate_against_schema(conn: sqlite3.Connection, table_name: str, schema: list) -> list:
+    """
+    Compare an inferred schema with the stored metadata of the table.
+    Returns a list of human-readable differences (empty when compatible or new).
+    """
+    stored = load_table_schema(conn, table_name)
+    if not stored:
+        return []
+
+    stored_types = dict(stored)
+    new_types = dict(schema)
+    problems = []
+    for col, sql_type in stored:
+        if col not in new_types:
+            problems.append(f"Column '{col}' ({sql_type}) is missing from the new file.")
+        elif new_types[col] != sql_type and {new_types[col], sql_type} != NUMERIC_TYPES:
+            problems.append(f"Column '{col}' changed type: {sql_type} → {new_types[col]}.")
+    for col, sql_type in schema:
+        if col not in stored_types:
+            problems.append(f"New column '{col}' ({sql_type}).")
+    return problems
+
+
+def _create_typed_table(conn: sqlite3.Connection, table_name: str, schema: list):
+    """Drop and recreate `table_name` with the declared column types."""
+    table = quote_identifier(table_name)
+    column_defs = ", ".join(f"{quote_identifier(col)} {sql_type}" for col, sql_type in schema)
+    conn.execute(f"DROP TABLE IF EXISTS {table}")
+    conn.execute(f"CREATE TABLE {table} ({column_defs})")
+
+
+def _insert_rows(conn: sqlite3.Connection, table_name: str, schema: list, rows):
+    """Bulk insert an iterable of row tuples into `table_name`."""
+    placeholders = ", ".join("?" for _ in schema)
+    conn.executemany(f"INSERT INTO {quote_identifier(table_name)} VALUES ({placeholders})", rows)
+
+
+def _finish_import(conn: sqlite3.Connection, table_name: str, schema: list, index_columns):
+    """Build the requested indexes and record the schema metadata of `table_name`."""
+    index_columns = [c for c in (index_columns or []) if c in dict(schema)]
+    table = quote_identifier(table_name)
+    for col in index_columns:
+        index_name = quote_identifier(f"idx_{table_name}_{col}")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} ({quote_identifier(col)})")
+
+    ensure_schema_table(conn)
+    conn.execute(f"DELETE FROM {SCHEMA_TABLE} WHERE table_name = ?", (table_name,))
+    conn.executemany(
+        f"INSERT INTO {SCHEMA_TABLE} (table_name, position, column_name, sql_type, indexed) VALUES (?, ?, ?, ?, ?)",
+        [
+            (table_name, pos, col, sql_type, int(col in index_columns))
+            for pos, (col, sql_type) in enumerate(schema)
+        ],
+    )
+    bump_table_version(conn, table_name)
+
+
+def write_table(conn: sqlite3.Connection, table_name: str, df: pd.DataFrame, schema: list, index_columns=None):
+    """
+    Create (or replace) a typed table, bulk insert the rows, build indexes
+    and record the schema metadata, all in a single transaction.
+    """
+    typed = coerce_to_schema(df, schema).astype(object)
+    typed = typed.where(typed.notna(), None)
+    rows = (
+        tuple(v.item() if hasattr(v, "item") else v for v in row)
+        for row in typed.itertuples(index=False, name=None)
+    )
+
+    with conn:
+        _create_typed_table(conn, table_name, schema)
+        _insert_rows(conn, table_name, schema, rows)
+        _finish_import(conn, table_name, schema, index_columns)
+
+
+# ------------------- PARQUET / ARROW INGESTION -------------------
+ARROW_FORMATS = ("parquet", "arrow")
+ARROW_BATCH_SIZE = 50_000
+
+
+def detect_file_format(file_content: bytes, filename: str = None) -> str:
+    """Return 'parquet', 'arrow' or 'csv' based on magic bytes (or the file extension)."""
+    if file_content[:4] == b"PAR1":
+        return "parquet"
+    if file_content[:6] == b"ARROW1" or file_content[:4] == b"\xff\xff\xff\xff":
+        return "arrow"
+    if filename:
+        ext = filename.rsplit(".", 1)[-1].lower()
+        if ext == "parquet":
+            return "parquet"
+        if ext in ("arrow", "feather", "ipc"):
+            return "arrow"
+    return "csv"
+
+
+def arrow_type_to_sql(arrow_type) -> str:
+    """Map a pyarrow DataType onto the SQLite column types used by the importer."""
+    import pyarrow.types as pat
+
+    if pat.is_boolean(arrow_type) or pat.is_integer(arrow_type):
+        return "INTEGER"
+    if pat.is_floating(arrow_type) or pat.is_decimal(arrow_type):
+        return "REAL"
+    if pat.is_date(arrow_type):
+        return "DATE"
+    if pat.is_timestamp(arrow_type):
+        return "TIMESTAMP"
+    if pat.is_binary(arrow_type) or pat.is_large_binary(arrow_type):
+        return "BLOB"
+    return "TEXT"
+
+
+def is_index_field(name: str) -> bool:
+    """True for the `__index_level_N__` columns pandas writes for a non-range index."""
+    return re.match(r"^__index_level_\d+__$", str(name)) is not None
+
+
+def arrow_table_schema(arrow_schema) -> list:
+    """(column, sql_type) of an Arrow schema, without pandas index columns."""
+    return [(field.name, arrow_type_to_sql(field.type)) for field in arrow_schema if not is_index_field(field.name)]
+
+
+def open_arrow_batches(file_content: bytes, file_format: str, batch_size: int = ARROW_BATCH_SIZE):
+    """
+    Open Parquet or Arrow IPC (file or stream) bytes without converting to text.
+    Returns (arrow_schema, iterator of RecordBatches).
+    """
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+
+    source = pa.BufferReader(file_content)
+    if file_format == "parquet":
+        parquet_file = pq.ParquetFile(source)
+        return parquet_file.schema_arrow, parquet_file.iter_batches(batch_size=batch_size)
+
+    if file_content[:6] == b"ARROW1":
+        reader = ipc.open_file(source)
+        return reader.schema, (reader.get_batch(i) for i in range(reader.num_record_batches))
+    reader = ipc.open_stream(source)
+    return reader.schema, iter(reader)
+
+
+def arrow_batch_rows(batch) -> list:
+    """
+    Convert a RecordBatch into row tuples of native Python values.
+    Dates and timestamps are formatted as ISO text to match the DATE/TIMESTAMP columns,
+    times as ISO text and durations/intervals as text, decimals become the nearest
+    float of their exact value, and nested values (lists, structs, maps) are stored
+    as JSON text.
+    """
+    import pyarrow.compute as pc
+    import pyarrow.types as pat
+
+    columns = []
+    for column in batch.columns:
+        if pat.is_date(column.type):
+            values = pc.strftime(column, format="%Y-%m-%d").to_pylist()
+        elif pat.is_timestamp(column.type):
+            values = pc.strftime(column.cast("timestamp[s]", safe=False), format="%Y-%m-%dT%H:%M:%S").to_pylist()
+        elif pat.is_decimal(column.type):
+            # float(Decimal) rounds once; an Arrow cast to float64 can be off in the last digit
+            values = [None if v is None else float(v) for v in column.to_pylist()]
+        elif pat.is_nested(column.type):
+            values = [None if v is None else json.dumps(v, default=str) for v in column.to_pylist()]
+        elif pat.is_time(column.type):
+            values = [None if v is None else v.isoformat() for v in column.to_pylist()]
+        elif pat.is_duration(column.type) or pat.is_interval(column.type):
+            # sqlite3 cannot bind timedelta / interval values
+            values = [None if v is None else str(v) for v in column.to_pylist()]
+        else:
+            values = column.to_pylist()
+        columns.append(values)
+    return list(zip(*columns))
+
+
+def create_table_from_arrow(
+    conn: sqlite3.Connection,
+    table_name: str,
+    file_content: bytes,
+    file_format: str,
+    index_columns=None,
+) -> list:
+    """
+    Create (or replace) a table from Parquet/Arrow bytes, loading one column
+    batch at a time with native types. Returns the schema that was written.
+    """
+    import pyarrow.types as pat
 
-    # Auto-detect delimiter if none is provided
+    arrow_schema, batches = open_arrow_batches(file_content, file_format)
+    schema = arrow_table_schema(arrow_schema)
+    names = [col for col, _ in schema]
+    # Nested columns (stored as JSON) are not index candidates
+    text_columns = [
+        col for col, sql_type in schema
+        if sql_type == "TEXT" and not pat.is_nested(arrow_schema.field(col).type)
+    ]
+
+    stats, n_rows = {}, 0
+    with conn:
+        _create_typed_table(conn, table_name, schema)
+        for batch in batches:
+            batch = batch.select(names)
+            if index_columns is None:
+                # Index suggestions are judged over all batches
+                update_index_stats(stats, batch.select(text_columns).to_pandas(), schema)
+                n_rows += batch.num_rows
+            _insert_rows(conn, table_name, schema, arrow_batch_rows(batch))
+        if index_columns is None:
+            index_columns = suggest_from_index_stats(stats, schema, n_rows)
+        _finish_import(conn, table_name, schema, index_columns)
+    return schema
+
+
+def read_uploaded_table(file_content: bytes, delimiter: str = None, file_format: str = "csv") -> pd.DataFrame:
+    """
+    Parse uploaded bytes into a DataFrame (delimiter auto-detected if None).
+    For Parquet/Arrow only the first batch is read, which is enough for a preview.
+    """
+    if file_format in ARROW_FORMATS:
+        arrow_schema, batches = open_arrow_batches(file_content, file_format, batch_size=1_000)
+        first = next(iter(batches), None)
+        if first is None:
+            return pd.DataFrame()
+        return first.select([col for col, _ in arrow_table_schema(arrow_schema)]).to_pandas()
+
+    s = file_content.decode("utf-8", errors="ignore")
     if delimiter is None:
-        sniffer = csv.Sniffer()
-        sample_size = min(len(s), 2048)  # up to 2KB
-        sample = s[:sample_size]
-        try:
-            dialect = sniffer.sniff(sample, delimiters=[",", "\t", ";", "|"])
-            delimiter = dialect.delimiter
-        except:
-            # fallback
-            delimiter = ","
+        delimiter = detect_delimiter(s)
+    return pd.read_csv(io.StringIO(s), sep=delimiter)
 
-    # Read into DataFrame
-    df = pd.read_csv(io.StringIO(s), sep=delimiter)
 
-    # Create or replace the table
-    df.to_sql(table_name, conn, if_exists="replace", index=False)
+def infer_upload_schema(file_content: bytes, df_preview: pd.DataFrame, file_format: str) -> list:
+    """Schema of an upload: declared Arrow types when available, else inferred from the data."""
+    if file_format in ARROW_FORMATS:
+        arrow_schema, _ = open_arrow_batches(file_content, file_format)
+        return arrow_table_schema(arrow_schema)
+    return infer_schema(df_preview)
+
+
+def create_table_from_file(
+    conn: sqlite3.Connection,
+    table_name: str,
+    file_content: bytes,
+    delimiter: str = None,
+    index_columns=None,
+    file_format: str = None,
+) -> list:
+    """
+    Create (or replace) a table in 'subtasks.db' by reading the uploaded file_content.
+    CSV/TXT column types are inferred, Parquet/Arrow types are taken from the file.
+    Indexes are created on `index_columns` (or on suggested key columns when None)
+    and the schema is recorded. Returns the schema that was written.
+    """
+    if file_format is None:
+        file_format = detect_file_format(file_content)
+    if file_format in ARROW_FORMATS:
+        return create_table_from_arrow(conn, table_name, file_content, file_format, index_columns)
+
+    df = read_uploaded_table(file_content, delimiter)
+    schema = infer_schema(df)
+    if index_columns is None:
+        index_columns = suggest_index_columns(df, schema)
+    write_table(conn, table_name, df, schema, index_columns)
+    return schema
 
 
 # ------------------- STREAMLIT PAGE -------------------
 def render_database_phases_page():
     """
     Streamlit page to:
-    1) Upload a CSV or TXT.
+    1) Upload a CSV, TXT, Parquet or Arrow IPC file.
     2) Create/replace a table in subtask.db.
     3) Push subtask.db to GitHub.
     """
     st.title("Import Data into Database (Phases)")
-    st.write("Use this page to import data (CSV/TXT) into a new table in `subtasks.db` and push to GitHub.")
-
-    # GitHub details (please ensure these are correct or in st.secrets)
-    github_user = "habdulhaq87"  
-    github_repo = "amasdatadriven"
-    github_pat = st.secrets["github"]["pat"]  # Make sure this is set in your Streamlit secrets
+    st.write("Use this page to import data (CSV/TXT/Parquet/Arrow) into a new table in `subtasks.db` and push to GitHub.")
 
     # Database name and default table name
     db_name = "subtasks.db"
@@ -115,64 +519,119 @@ def render_database_phases_page():
     chosen_delimiter = delimiter_map[delimiter_choice]
 
     # File uploader
-    file = st.file_uploader("Upload CSV or TXT file", type=["csv", "txt", "tsv"])
+    file = st.file_uploader(
+        "Upload CSV, TXT, Parquet or Arrow file",
+        type=["csv", "txt", "tsv", "parquet", "arrow", "feather"],
+    )
 
     if file is not None:
+        df_preview = None
+        schema = []
+        file_format = "csv"
         # We'll attempt a quick preview
         try:
             file_content = file.read()
-            s = file_content.decode("utf-8", errors="ignore")
-
-            # If auto-detect requested
-            if chosen_delimiter is None:
-                sniffer = csv.Sniffer()
-                sample_size = min(len(s), 2048)
-                sample = s[:sample_size]
-                try:
-                    dialect = sniffer.sniff(sample, delimiters=[",", "\t", ";", "|"])
-                    autodetected = dialect.delimiter
-                except:
-                    autodetected = ","
-            else:
-                autodetected = chosen_delimiter
-
-            # Attempt preview
-            df_preview = pd.read_csv(io.StringIO(s), sep=autodetected)
+            file_format = detect_file_format(file_content, file.name)
+            df_preview = read_uploaded_table(file_content, chosen_delimiter, file_format)
+            schema = infer_upload_schema(file_content, df_preview, file_format)
             st.write("**Preview** of the first few rows:")
             st.dataframe(df_preview.head())
         except Exception as e:
             st.warning(f"Could not preview the file: {e}")
             file.seek(0)  # reset pointer in case we still want to import
 
-        # Import to DB
-        if st.button("Import & Push to GitHub"):
+        index_columns = None
+        schema_ok = True
+        if schema:
+            st.write("**Inferred schema:**")
+            st.dataframe(pd.DataFrame(schema, columns=["Column", "Type"]), hide_index=True)
+
+            index_columns = st.multiselect(
+                "Columns to index",
+                options=[col for col, _ in schema],
+                default=suggest_index_columns(df_preview, schema),
+                help="Indexes speed up lookups by these columns (e.g. Category, Aspect).",
+            )
+
+            conn = initialize_database(db_name)
+            problems = validate_against_schema(conn, table_name, schema)
+            conn.close()
+            if problems:
+                st.warning(
+                    f"The file does not match the stored schema of '{table_name}':\n\n"
+                    + "\n".join(f"- {p}" for p in problems)
+                )
+                schema_ok = st.checkbox("Replace the table with the new schema anyway", value=False)
+
+        # Import to DB in the background; the page polls the job's progress
+        if st.button("Import & Push to GitHub", disabled=not schema_ok):
             try:
-                # Re-establish file content pointer if needed
+                from jobs import stage_upload, submit
+
                 file.seek(0)
-                file_content = file.read()
-
-                # 1) Initialize local DB
-                conn = initialize_database(db_name)
-                
-                # 2) Create or replace table
-                create_table_from_file(conn, table_name, file_content, delimiter=chosen_delimiter)
-                st.success(f"Table '{table_name}' created or replaced in '{db_name}'.")
-
-                conn.commit()
-                conn.close()
-
-                # 3) Push to GitHub
-                commit_msg = f"Create or update table '{table_name}' at {datetime.datetime.now()}"
-                upload_file_to_github(
-                    github_user=github_user,
-                    github_repo=github_repo,
-                    github_pat=github_pat,
-                    file_path=db_name,       # on GitHub, same name
-                    local_file_path=db_name, # local name
-                    commit_message=commit_msg
+                staged = stage_upload(file.read(), file.name)
+                st.session_state["import_job"] = submit(
+                    "import.table",
+                    {
+                        "path": staged,
+                        "table_name": table_name,
+                        "db_name": db_name,
+                        "delimiter": chosen_delimiter,
+                        "index_columns": index_columns,
+                        "file_format": file_format,
+                    },
                 )
             except Exception as e:
-                st.error(f"An error occurred during import or push: {e}")
+                st.error(f"Could not queue the import: {e}")
+
+    if "import_job" in st.session_state:
+        from jobs_ui import render_job_progress
+        render_job_progress(st.session_state["import_job"], key="database_phases_import")
+
+
+def import_table_job(job, path: str, table_name: str, db_name: str = "subtasks.db", delimiter: str = None,
+                     index_columns=None, file_format: str = None, push: bool = True):
+    """
+    Background job ("import.table"): create or replace `table_name` from a staged
+    upload, refresh its column profile, then queue the GitHub push.
+    """
+    job.progress(0.05, f"Reading {os.path.basename(path)}")
+    with open(path, "rb") as f:
+        file_content = f.read()
+
+    job.progress(0.1, f"Importing into '{table_name}'")
+    conn = initialize_database(db_name)
+    try:
+        schema = create_table_from_file(
+            conn, table_name, file_content,
+            delimiter=delimiter, index_columns=index_columns,
+            file_format=file_format,
+        )
+        job.progress(0.8, "Profiling columns")
+
+        # Refresh the cached column profile of the imported table only
+        from backend import profile_table
+        profile_table(conn, table_name)
+        conn.commit()
+    finally:
+        conn.close()
+
+    result = {"table": table_name, "columns": len(schema)}
+    if push:
+        from jobs import enqueue
+        commit_msg = f"Create or update table '{table_name}' at {datetime.datetime.now()}"
+        result["push_job"] = enqueue(
+            "github.push",
+            {"local_file_path": db_name, "file_path": db_name, "commit_message": commit_msg},
+            dedupe_key=f"github.push:{db_name}",
+        )
+    job.progress(1.0, f"Table '{table_name}' imported" + ("; GitHub push queued" if push else ""))
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+    return result
+
 
 if __name__ == "__main__":
     st.set_page_config(page_title="Phases Database Import", layout="wide")
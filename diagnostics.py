@@ -0,0 +1,37 @@
+import streamlit as st
+import instrumentation
+
+
+def render_diagnostics():
+    """
+    Hidden page (open the app with ?page=diagnostics) showing where time goes:
+    module import times, page and tab render times, and SQL query timings.
+    """
+    st.title("Diagnostics")
+    st.caption(f"Timings from `{instrumentation.LOG_PATH}` (rotating JSONL log).")
+
+    events = instrumentation.load_events()
+    if events.empty:
+        st.info("No timings recorded yet. Browse a few pages first.")
+        return
+
+    st.metric("Events recorded", f"{len(events):,}")
+
+    st.subheader("Page render time (ms)")
+    st.dataframe(instrumentation.summarize(events, "render"), use_container_width=True, hide_index=True)
+
+    st.subheader("Tab / section render time (ms)")
+    st.dataframe(instrumentation.summarize(events, "section"), use_container_width=True, hide_index=True)
+
+    st.subheader("SQL queries (ms)")
+    st.dataframe(instrumentation.summarize(events, "sql"), use_container_width=True, hide_index=True)
+
+    st.subheader("Module import time (ms)")
+    st.dataframe(instrumentation.summarize(events, "import"), use_container_width=True, hide_index=True)
+
+    with st.expander("Latest events"):
+        st.dataframe(events.tail(200).iloc[::-1], use_container_width=True, hide_index=True)
+
+
+if __name__ == "__main__":
+    render_diagnostics()
@@ -1,77 +1,401 @@
+import os
+import sqlite3
+import threading
 import streamlit as st
 import pandas as pd
 import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, pooling
 from datetime import date, datetime
+from circuit_breaker import CircuitBreaker
+from concurrency import merge_view
+from finance_migrations import has_column
+from finance_replica import ReplicaConnection, note_write, replica_connection, replica_status
+from forecast import forecast_budgets, forecast_by_line
+from instrumentation import query_timer, section, timed_read_sql
+from query_pool import MAX_PARALLEL_QUERIES, submit_queries
+from sql_stream import StreamSummary, export_path, prune_exports, stream_sql
+
+# ---------------------------------------
+# Connection, time budgets and circuit breaker
+# ---------------------------------------
+CONNECT_TIMEOUT = 5         # seconds to connect (also the socket read timeout)
+QUERY_TIMEOUT_MS = 10000    # server-side limit per SELECT
+PROBE_TIMEOUT = 3
+# can't connect, server gone away, lost connection, read timeout, statement timeout
+# (MySQL 3024 / MariaDB 1969)
+UNAVAILABLE_ERRNOS = {2003, 2006, 2013, 2055, 3024, 1969}
+# MySQL errors, replica errors (e.g. no local copy yet) on the read path, and
+# pd.read_sql's wrapper around either
+DB_ERRORS = (Error, sqlite3.Error, pd.errors.DatabaseError)
+
+
+def get_connection(connect_timeout: int = None, query_timeout_ms: int = None):
+    """
+    Open a MySQL connection using the credentials in st.secrets. Connecting and
+    each statement are bounded (`connect_timeout` / `query_timeout_ms`, overridable
+    in the [mysql] secrets), so a slow server fails fast instead of hanging the page.
+    """
+    cfg = st.secrets["mysql"]
+    conn = mysql.connector.connect(**_connect_args(cfg, connect_timeout))
+    _set_statement_timeout(conn, int(query_timeout_ms or cfg.get("query_timeout_ms", QUERY_TIMEOUT_MS)))
+    return conn
 
-def render_finance():
-    st.title("💼 Finance")
 
-    # ---------------------------------------
-    # DB connection (from st.secrets)
-    # ---------------------------------------
-    cfg = st.secrets["mysql"]
-    conn = mysql.connector.connect(
+def _connect_args(cfg, connect_timeout: int = None) -> dict:
+    return dict(
         host=cfg["host"],
         port=int(cfg["port"]),
         user=cfg["user"],
         password=cfg["password"],
         database=cfg["database"],
         autocommit=True,
+        connection_timeout=int(connect_timeout or cfg.get("connect_timeout", CONNECT_TIMEOUT)),
     )
 
-    tab_budgets, tab_transactions, tab_summary, tab_entry, tab_edit = st.tabs(
-        ["📊 Budgets", "📜 Transactions", "📈 Phase Summary", "➕ New Transaction", "📝 Edit Budgets"]
+
+def _set_statement_timeout(conn, ms: int):
+    cur = conn.cursor()
+    try:
+        cur.execute(f"SET SESSION MAX_EXECUTION_TIME = {ms}")
+    except Error:
+        # MariaDB names it differently (in seconds)
+        cur.execute(f"SET SESSION max_statement_time = {ms / 1000:.3f}")
+    finally:
+        cur.close()
+
+
+# ---------------------------------------
+# Parallel reads: query cap and connection pool
+# ---------------------------------------
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def max_parallel_queries() -> int:
+    """Concurrent finance queries (process-wide), from [finance] max_parallel_queries in st.secrets."""
+    try:
+        return max(int(st.secrets["finance"]["max_parallel_queries"]), 1)
+    except (KeyError, TypeError, ValueError):
+        return MAX_PARALLEL_QUERIES
+
+
+def pooled_connector():
+    """
+    Connection factory for parallel reads against MySQL: a pool sized to the query
+    cap, created here (in the script thread, where st.secrets is read).
+    """
+    global _pool
+    cfg = st.secrets["mysql"]
+    ms = int(cfg.get("query_timeout_ms", QUERY_TIMEOUT_MS))
+    size = max_parallel_queries()
+    with _pool_lock:
+        if _pool is None or _pool.pool_size != size:
+            _pool = pooling.MySQLConnectionPool(pool_name="finance", pool_size=size, **_connect_args(cfg))
+    pool = _pool
+
+    def connect():
+        conn = pool.get_connection()
+        # the pool resets session variables when a connection is returned
+        _set_statement_timeout(conn, ms)
+        return conn
+
+    return connect
+
+
+def read_connector(rconn):
+    """Per-query connection factory for the read path chosen by open_finance()."""
+    if isinstance(rconn, ReplicaConnection):
+        return ReplicaConnection
+    try:
+        return pooled_connector()
+    except Error as e:
+        note_db_failure(e)
+        return get_connection
+
+
+def _probe_mysql():
+    conn = get_connection(connect_timeout=PROBE_TIMEOUT, query_timeout_ms=PROBE_TIMEOUT * 1000)
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT 1")
+        cur.fetchall()
+        cur.close()
+    finally:
+        conn.close()
+
+
+FINANCE_BREAKER = CircuitBreaker("mysql", probe=_probe_mysql, threshold=3, probe_interval=15)
+
+
+def is_unavailable(e) -> bool:
+    """True for timeouts and lost/refused connections (as opposed to e.g. SQL errors)."""
+    if isinstance(e, pd.errors.DatabaseError) and e.__cause__ is not None:
+        e = e.__cause__
+    return getattr(e, "errno", None) in UNAVAILABLE_ERRNOS or isinstance(
+        e, (mysql.connector.errors.OperationalError, mysql.connector.errors.InterfaceError)
     )
 
-    def money(x):
-        try:
-            return f"${float(x):,.2f}"
-        except Exception:
-            return x
 
-    # ======================================================
-    # 📊 Budgets tab — VERTICAL PHASE CARDS
-    # ======================================================
-    with tab_budgets:
-        st.subheader("Budgets by Phase")
+def note_db_failure(e):
+    """Count timeouts and connection failures toward the breaker."""
+    if is_unavailable(e):
+        FINANCE_BREAKER.record_failure(e)
+
+
+def db_error(where: str, e):
+    note_db_failure(e)
+    st.error(f"Database error ({where}): {e}")
 
+
+def open_finance():
+    """
+    (conn, rconn): the MySQL connection for writes and the replica connection for
+    reads (synced from MySQL when due). conn is None while the breaker is open or
+    MySQL is unreachable; reads are then served from the last synced replica.
+    """
+    if not FINANCE_BREAKER.allow():
+        return None, ReplicaConnection()
+    conn = None
+    try:
+        conn = get_connection()
+        rconn = replica_connection(conn)
+        if rconn.synced:
+            FINANCE_BREAKER.record_success()
+        return conn, rconn
+    except (Error, sqlite3.Error) as e:
+        # sqlite3.Error: the local replica (locked, corrupt, disk full) failed to sync
+        note_db_failure(e)
+        if conn is not None and not is_unavailable(e):
+            st.warning(f"Local finance replica could not sync, reading from MySQL: {e}")
+            return conn, conn
         try:
-            q_phase_budget = """
-                SELECT
-                    b.budget_line AS phase,
-                    COALESCE(SUM(b.budget_usd), 0) AS budget_total
-                FROM budgets b
-                GROUP BY b.budget_line
-                ORDER BY b.budget_line
-            """
-            df_phase_budget = pd.read_sql(q_phase_budget, conn)
+            if conn is not None:
+                conn.close()
+        except:
+            pass
+        return None, ReplicaConnection()
 
-            q_phase_spent = """
-                SELECT
-                    b.budget_line AS phase,
-                    COALESCE(SUM(t.amount_usd), 0) AS spent_total
-                FROM transactions t
-                JOIN budgets b ON b.budget_id = t.budget_id
-                GROUP BY b.budget_line
-                ORDER BY b.budget_line
-            """
-            df_phase_spent = pd.read_sql(q_phase_spent, conn)
 
-            df_cards = pd.merge(df_phase_budget, df_phase_spent, on="phase", how="left").fillna({"spent_total": 0})
-            df_cards["remaining_total"] = df_cards["budget_total"] - df_cards["spent_total"]
+def render_stale_banner():
+    """Shown when MySQL is unavailable: data comes from the last replica sync."""
+    synced_at = replica_status()["synced_at"]
+    status = FINANCE_BREAKER.status()
+    reason = status["last_error"] or "database unreachable"
+    if synced_at:
+        st.warning(
+            f"⚠️ MySQL is not responding ({reason}). Showing data **stale as of {synced_at}**. "
+            "Adding and editing are disabled until the database recovers (checked in the background)."
+        )
+    else:
+        st.error(f"MySQL is not responding ({reason}) and no local copy of the finance data exists yet.")
+
+
+# Transactions tab: rows per page, and fixed column types of the streamed chunks
+TX_PAGE_SIZE = 200
+TX_DTYPES = {"transaction_id": "Int64", "budget_id": "Int64", "amount_usd": "float64"}
+
 
-            q_items = """
+def money(x):
+    try:
+        return f"${float(x):,.2f}"
+    except Exception:
+        return x
+
+
+# ---------------------------------------
+# Edit Budgets: optimistic concurrency
+# ---------------------------------------
+BUDGET_FIELDS = ["budget_line", "task", "sub_tasks", "start_date", "end_date", "budget_usd", "justification"]
+
+_budget_versioning_ready = False
+
+
+def budget_versioning_ready(conn) -> bool:
+    """True once `budgets` has its `row_version` column (added by `python finance_migrations.py`)."""
+    global _budget_versioning_ready
+    if not _budget_versioning_ready:
+        _budget_versioning_ready = has_column(conn, "budgets", "row_version")
+    return _budget_versioning_ready
+
+
+def load_budget_rows(conn):
+    """Budgets with their current spent and row_version."""
+    return timed_read_sql(
+        """
+        SELECT
+            b.budget_id,
+            b.budget_line,
+            b.task,
+            b.sub_tasks,
+            b.start_date,
+            b.end_date,
+            b.budget_usd,
+            COALESCE(x.spent, 0) AS spent,
+            b.justification,
+            b.row_version
+        FROM budgets b
+        LEFT JOIN (
+            SELECT budget_id, SUM(amount_usd) AS spent
+            FROM transactions
+            GROUP BY budget_id
+        ) x ON x.budget_id = b.budget_id
+        ORDER BY b.budget_id ASC
+        """,
+        conn,
+        label="edit.budgets",
+    )
+
+
+def reset_budget_editor():
+    """Drop the Edit Budgets snapshot, pending edits and conflicts."""
+    for key in ["edit_budgets_base", "edit_budgets_editor", "edit_budgets_conflicts"]:
+        st.session_state.pop(key, None)
+
+
+def _norm(v):
+    if pd.isna(v) or (isinstance(v, str) and v.strip() == ""):
+        return None
+    return v
+
+
+def _current_budget_row(cur, bid):
+    cur.execute(
+        """
+        SELECT b.*, (SELECT COALESCE(SUM(amount_usd), 0) FROM transactions WHERE budget_id = b.budget_id) AS spent
+        FROM budgets b WHERE b.budget_id = %s
+        """,
+        (bid,),
+    )
+    row = cur.fetchone()
+    return dict(zip([c[0] for c in cur.description], row)) if row else None
+
+
+def _apply_budget_edit(cur, bid, fields_changed, vals, old, snapshot_spent, delta):
+    """One budget row's compare-and-swap update and spent adjustment; False on conflict."""
+    # --- Compare-and-swap on the version read with the snapshot ---
+    set_clause = "".join([f"{c}=%s, " for c in fields_changed])
+    with query_timer("edit.update_budget") as event:
+        cur.execute(
+            f"UPDATE budgets SET {set_clause}row_version = row_version + 1 "
+            "WHERE budget_id=%s AND row_version=%s",
+            (*vals, bid, int(old["row_version"])),
+        )
+        event["rows"] = cur.rowcount
+    ok = cur.rowcount == 1
+
+    # --- Adjust 'spent' only against the spent the editor saw ---
+    if ok and abs(delta) > 0.00001:
+        with query_timer("edit.live_spent"):
+            cur.execute(
+                "SELECT COALESCE(SUM(amount_usd), 0) FROM transactions WHERE budget_id=%s FOR UPDATE",
+                (bid,),
+            )
+            live_spent = float(cur.fetchone()[0])
+        ok = abs(live_spent - snapshot_spent) <= 0.005
+        if ok:
+            with query_timer("edit.insert_adjustment"):
+                cur.execute(
+                    """
+                    INSERT INTO transactions
+                    (budget_id, transaction_date, description, amount_usd, notes)
+                    VALUES (%s, %s, %s, %s, %s)
+                    """,
+                    (
+                        bid,
+                        date.today(),
+                        "Adjustment via Edit Budgets",
+                        delta,  # may be positive or negative
+                        f"Auto-adjust on {datetime.now().isoformat(timespec='seconds')}"
+                    )
+                )
+    return ok
+
+
+def save_budget_edits(conn, base, edited):
+    """
+    Write the rows of `edited` that differ from the `base` snapshot.
+    Each row is a compare-and-swap on row_version, and a 'spent' edit is only turned
+    into an adjustment if the live spent (recomputed at save time) still equals the
+    snapshot's. Returns (rows_updated, adjustments_inserted, conflicts) where each
+    conflict is (budget_id, base_row, my_row, current_row or None).
+    """
+    cur = conn.cursor()
+    rows_updated = 0
+    tx_inserted = 0
+    conflicts = []
+    try:
+        for i in range(len(edited)):
+            new = edited.iloc[i]
+            old = base.iloc[i]
+            bid = int(new["budget_id"])
+
+            fields_changed = []
+            vals = []
+            for col in BUDGET_FIELDS:
+                v_new = _norm(new[col])
+                v_old = _norm(old[col])
+                if str(v_new) != str(v_old):
+                    fields_changed.append(col)
+                    if col == "budget_usd" and v_new is not None:
+                        vals.append(float(v_new))
+                    else:
+                        vals.append(v_new)
+
+            snapshot_spent = float(old["spent"]) if not pd.isna(old["spent"]) else 0.0
+            desired_spent = float(new["spent"]) if not pd.isna(new["spent"]) else 0.0
+            delta = round(desired_spent - snapshot_spent, 2)
+            if not fields_changed and abs(delta) <= 0.00001:
+                continue
+
+            conn.start_transaction()
+            try:
+                ok = _apply_budget_edit(cur, bid, fields_changed, vals, old, snapshot_spent, delta)
+            except Error:
+                conn.rollback()
+                raise
+
+            if ok:
+                conn.commit()
+                rows_updated += 1
+                tx_inserted += int(abs(delta) > 0.00001)
+            else:
+                conn.rollback()
+                conflicts.append((bid, old.to_dict(), new.to_dict(), _current_budget_row(cur, bid)))
+    finally:
+        try:
+            cur.close()
+        except:
+            pass
+    return rows_updated, tx_inserted, conflicts
+
+
+@st.fragment
+def render_transaction_entry():
+    """
+    ➕ New Transaction tab: budget picker, entry form and recent transactions.
+    Runs as a fragment, so ticking a budget or editing a field only reruns this
+    block; the full page reruns after a successful save. Reads come from the
+    replica the page already synced; MySQL is only connected to for the insert.
+    """
+    flash = st.session_state.pop("finance_tx_saved", None)
+    if flash:
+        st.success(flash)
+
+    rconn = ReplicaConnection()
+    try:
+        st.subheader("Add New Transaction")
+        if not FINANCE_BREAKER.allow():
+            st.info("Adding transactions is disabled while MySQL is unavailable.")
+            return
+
+        try:
+            q_budget_table = """
                 SELECT
                     b.budget_id,
-                    b.budget_line AS phase,
+                    b.budget_line,
                     b.task,
-                    b.start_date,
-                    b.end_date,
-                    b.budget_usd,
-                    COALESCE(x.spent, 0) AS spent,
-                    (COALESCE(b.budget_usd,0) - COALESCE(x.spent,0)) AS remaining,
-                    b.justification
+                    COALESCE(b.budget_usd, 0) AS budget_usd,
+                    COALESCE(x.spent, 0) AS spent
                 FROM budgets b
                 LEFT JOIN (
                     SELECT budget_id, SUM(amount_usd) AS spent
@@ -80,8 +404,196 @@ def render_finance():
                 ) x ON x.budget_id = b.budget_id
                 ORDER BY b.budget_line, b.budget_id
             """
-            df_items = pd.read_sql(q_items, conn)
+            preview_q = """
+                SELECT t.transaction_id, b.budget_line, t.transaction_date, t.description, t.amount_usd, t.notes
+                FROM transactions t
+                JOIN budgets b ON b.budget_id = t.budget_id
+                ORDER BY t.transaction_id DESC
+                LIMIT 20
+            """
+            reads = submit_queries({
+                "budget_table": (q_budget_table, None, "entry.budget_table"),
+                "recent": (preview_q, None, "entry.recent_transactions"),
+            }, read_connector(rconn), max_parallel_queries())
+            df_budgets = reads["budget_table"].result()
 
+            if df_budgets.empty:
+                st.info("No budgets available. Please add budgets first.")
+            else:
+                df_budgets["Select"] = False
+                show = df_budgets.copy()
+                show["Budget (USD)"] = show["budget_usd"].apply(money)
+                show["Spent"] = show["spent"].apply(money)
+                show = show[["Select", "budget_id", "budget_line", "task", "Budget (USD)", "Spent"]]
+
+                st.caption("Select ONE budget (phase/task):")
+                edited = st.data_editor(
+                    show,
+                    use_container_width=True,
+                    hide_index=True,
+                    column_config={
+                        "Select": st.column_config.CheckboxColumn(default=False, help="Tick to select this budget"),
+                        "budget_id": st.column_config.NumberColumn("Budget ID", disabled=True),
+                        "budget_line": st.column_config.TextColumn("Phase", disabled=True),
+                        "task": st.column_config.TextColumn("Task", disabled=True),
+                        "Budget (USD)": st.column_config.TextColumn(disabled=True),
+                        "Spent": st.column_config.TextColumn(disabled=True),
+                    }
+                )
+
+                selected_rows = edited[edited["Select"] == True]
+                selected_count = len(selected_rows)
+                selected_budget_id = int(selected_rows["budget_id"].iloc[0]) if selected_count == 1 else None
+
+                if selected_count == 0:
+                    st.info("No budget selected yet.")
+                elif selected_count > 1:
+                    st.warning("Please select **only one** budget to proceed.")
+                else:
+                    st.success(f"Selected Budget ID: {selected_budget_id}")
+
+                st.markdown("---")
+
+                c1, c2 = st.columns(2)
+                with c1:
+                    tx_date = st.date_input("Transaction date", value=date.today())
+                    amount = st.number_input("Amount (USD)", min_value=0.00, step=0.01, format="%.2f")
+                with c2:
+                    description = st.text_input("Description", value="", placeholder="e.g., Food & transport")
+                    notes = st.text_input("Notes (optional)", value="", placeholder="Method: Cash; IQD: 1,000,000")
+
+                if st.button("Save Transaction", type="primary"):
+                    if selected_count != 1:
+                        st.error("Please select exactly one budget in the table above.")
+                    elif amount <= 0:
+                        st.error("Amount must be greater than 0.")
+                    else:
+                        saved = False
+                        conn = cur = None
+                        try:
+                            conn = get_connection()
+                            cur = conn.cursor()
+                            with query_timer("entry.insert_transaction") as event:
+                                cur.execute(
+                                    """
+                                    INSERT INTO transactions
+                                    (budget_id, transaction_date, description, amount_usd, notes)
+                                    VALUES (%s, %s, %s, %s, %s)
+                                    """,
+                                    (selected_budget_id, tx_date, description or None, amount, notes or None)
+                                )
+                                event["rows"] = cur.rowcount
+                            note_write(cur.lastrowid)
+                            saved = True
+                        except Error as e:
+                            note_db_failure(e)
+                            st.error(f"Insert failed: {e}")
+                        finally:
+                            for c in (cur, conn):
+                                try:
+                                    if c is not None:
+                                        c.close()
+                                except:
+                                    pass
+
+                        if saved:
+                            # Refresh the whole page so the other tabs reflect the new transaction
+                            st.session_state["finance_tx_saved"] = "Transaction saved ✅"
+                            st.rerun()
+
+                with st.expander("Recent Transactions"):
+                    df_recent = reads["recent"].result()
+                    if not df_recent.empty:
+                        show_recent = df_recent.copy()
+                        show_recent["amount_usd"] = show_recent["amount_usd"].apply(money)
+                        st.dataframe(show_recent, use_container_width=True)
+                    else:
+                        st.caption("No transactions yet.")
+
+        except DB_ERRORS as e:
+            db_error("New Transaction tab", e)
+    finally:
+        rconn.close()
+
+
+def render_finance():
+    st.title("💼 Finance")
+
+    # ---------------------------------------
+    # DB connection (from st.secrets)
+    # ---------------------------------------
+    conn, rconn = open_finance()
+    if conn is None:
+        render_stale_banner()
+
+    # ---------------------------------------
+    # Independent reads, dispatched together on the query pool
+    # (each tab waits only for the results it uses)
+    # ---------------------------------------
+    q_phase_budget = """
+        SELECT
+            b.budget_line AS phase,
+            COALESCE(SUM(b.budget_usd), 0) AS budget_total
+        FROM budgets b
+        GROUP BY b.budget_line
+        ORDER BY b.budget_line
+    """
+    q_phase_spent = """
+        SELECT
+            b.budget_line AS phase,
+            COALESCE(SUM(t.amount_usd), 0) AS spent_total
+        FROM transactions t
+        JOIN budgets b ON b.budget_id = t.budget_id
+        GROUP BY b.budget_line
+        ORDER BY b.budget_line
+    """
+    q_items = """
+        SELECT
+            b.budget_id,
+            b.budget_line AS phase,
+            b.task,
+            b.start_date,
+            b.end_date,
+            b.budget_usd,
+            COALESCE(x.spent, 0) AS spent,
+            (COALESCE(b.budget_usd,0) - COALESCE(x.spent,0)) AS remaining,
+            b.justification
+        FROM budgets b
+        LEFT JOIN (
+            SELECT budget_id, SUM(amount_usd) AS spent
+            FROM transactions
+            GROUP BY budget_id
+        ) x ON x.budget_id = b.budget_id
+        ORDER BY b.budget_line, b.budget_id
+    """
+    reads = submit_queries({
+        "phase_budget": (q_phase_budget, None, "budgets.phase_budget"),
+        "phase_spent": (q_phase_spent, None, "budgets.phase_spent"),
+        "items": (q_items, None, "budgets.items"),
+        "budget_lookup": (
+            "SELECT budget_id, budget_line, task FROM budgets ORDER BY budget_line, budget_id ASC",
+            None,
+            "transactions.budget_lookup",
+        ),
+    }, read_connector(rconn), max_parallel_queries())
+
+    tab_budgets, tab_transactions, tab_summary, tab_forecast, tab_entry, tab_edit = st.tabs(
+        ["📊 Budgets", "📜 Transactions", "📈 Phase Summary", "🔮 Forecast", "➕ New Transaction", "📝 Edit Budgets"]
+    )
+
+    # ======================================================
+    # 📊 Budgets tab — VERTICAL PHASE CARDS
+    # ======================================================
+    with tab_budgets, section("Budgets"):
+        st.subheader("Budgets by Phase")
+
+        try:
+            df_phase_budget = reads["phase_budget"].result()
+            df_phase_spent = reads["phase_spent"].result()
+            df_cards = pd.merge(df_phase_budget, df_phase_spent, on="phase", how="left").fillna({"spent_total": 0})
+            df_cards["remaining_total"] = df_cards["budget_total"] - df_cards["spent_total"]
+
+            df_items = reads["items"].result()
             if df_cards.empty:
                 st.info("No budgets found yet.")
             else:
@@ -128,17 +640,17 @@ def render_finance():
                 g2.metric("Total Spending (All Phases)", money(total_spent))
                 g3.metric("Total Remaining (All Phases)", money(total_remaining))
 
-        except Error as e:
-            st.error(f"Database error (Budgets tab): {e}")
+        except DB_ERRORS as e:
+            db_error("Budgets tab", e)
 
     # ======================================================
     # 📜 Transactions tab — filterable list
     # ======================================================
-    with tab_transactions:
+    with tab_transactions, section("Transactions"):
         st.subheader("Transactions")
 
         try:
-            budget_lookup = pd.read_sql("SELECT budget_id, budget_line, task FROM budgets ORDER BY budget_line, budget_id ASC", conn)
+            budget_lookup = reads["budget_lookup"].result()
             options = ["(All)"] + budget_lookup["budget_line"].tolist()
             sel_budget_name = st.selectbox("Filter by Budget Line", options, index=0)
 
@@ -167,12 +679,32 @@ def render_finance():
                 params.append(sel_budget_name)
             base_q += " ORDER BY t.transaction_date ASC, t.transaction_id ASC"
 
-            df_tx = pd.read_sql(base_q, conn, params=params)
-
-            tx_total = float(df_tx["amount_usd"].sum()) if not df_tx.empty else 0.0
-            st.metric("Total in view", money(tx_total))
-
-            show_tx = df_tx.copy()
+            # One streamed pass computes the total and keeps only the shown page, so
+            # memory stays at one chunk for any date range. The result is kept in the
+            # session per (filters, page, replica data version), so reruns that change
+            # nothing here (other widgets, tabs) don't stream again.
+            view_key = (sel_budget_name, str(start_date), str(end_date))
+            if st.session_state.get("tx_view_key") != view_key:
+                st.session_state["tx_view_key"] = view_key
+                st.session_state["tx_page"] = 1
+            version = replica_status()["data_version"] if isinstance(rconn, ReplicaConnection) else None
+            cache_key = (view_key, int(st.session_state.get("tx_page", 1)), version)
+            cached = st.session_state.get("tx_view_cache")
+            if version is not None and cached is not None and cached[0] == cache_key:
+                view = cached[1]
+            else:
+                view = StreamSummary(
+                    sum_columns=["amount_usd"],
+                    page=st.session_state.get("tx_page", 1),
+                    page_size=TX_PAGE_SIZE,
+                ).consume(stream_sql(
+                    base_q, rconn, params=params, dtypes=TX_DTYPES, label="transactions.list"
+                ))
+                st.session_state["tx_view_cache"] = (cache_key, view)
+
+            st.metric("Total in view", money(view.totals["amount_usd"]))
+
+            show_tx = view.page()
             if not show_tx.empty:
                 show_tx["amount_usd"] = show_tx["amount_usd"].apply(money)
 
@@ -182,45 +714,50 @@ def render_finance():
                 ]] if not show_tx.empty else show_tx,
                 use_container_width=True
             )
-
-            st.download_button(
-                "⬇️ Download Transactions CSV",
-                data=df_tx.to_csv(index=False).encode("utf-8"),
-                file_name="transactions_view.csv",
-                mime="text/csv"
-            )
-
-        except Error as e:
-            st.error(f"Database error (Transactions tab): {e}")
+            if view.pages() > 1:
+                st.session_state["tx_page"] = min(int(st.session_state.get("tx_page", 1)), view.pages())
+                p1, p2 = st.columns([1, 3])
+                with p1:
+                    st.number_input("Page", min_value=1, max_value=view.pages(), step=1, key="tx_page")
+                with p2:
+                    st.caption(f"{view.rows:,} transactions · {TX_PAGE_SIZE} per page · {view.pages()} pages")
+
+            # The CSV is only written when asked for (once per filters and data version)
+            export_key = (view_key, version)
+            if st.button("Prepare CSV export"):
+                csv_path = export_path("transactions", base_q, view_key, version)
+                if version is None or not os.path.exists(csv_path):
+                    StreamSummary(csv_path=csv_path).consume(stream_sql(
+                        base_q, rconn, params=params, dtypes=TX_DTYPES, label="transactions.export"
+                    ))
+                prune_exports(keep=csv_path)
+                st.session_state["tx_export"] = (export_key, csv_path)
+
+            export = st.session_state.get("tx_export")
+            if export is not None and export[0] == export_key and os.path.exists(export[1]):
+                # Handed over as an open file, not read into a bytes copy here
+                with open(export[1], "rb") as f:
+                    st.download_button(
+                        "⬇️ Download Transactions CSV",
+                        data=f,
+                        file_name="transactions_view.csv",
+                        mime="text/csv",
+                        on_click=lambda: st.session_state.pop("tx_export", None),
+                    )
+
+        except DB_ERRORS as e:
+            db_error("Transactions tab", e)
 
     # ======================================================
     # 📈 Phase Summary tab — totals row included
     # ======================================================
-    with tab_summary:
+    with tab_summary, section("Phase Summary"):
         st.subheader("Phase Summary (Budget vs. Spent vs. Remain)")
 
         try:
-            phase_budget_q = """
-                SELECT
-                    b.budget_line AS phase,
-                    COALESCE(SUM(b.budget_usd), 0) AS budget_total
-                FROM budgets b
-                GROUP BY b.budget_line
-                ORDER BY b.budget_line
-            """
-            df_budget = pd.read_sql(phase_budget_q, conn)
-
-            phase_spend_q = """
-                SELECT
-                    b.budget_line AS phase,
-                    COALESCE(SUM(t.amount_usd), 0) AS spent_total
-                FROM transactions t
-                JOIN budgets b ON b.budget_id = t.budget_id
-                GROUP BY b.budget_line
-                ORDER BY b.budget_line
-            """
-            df_spend = pd.read_sql(phase_spend_q, conn)
-
+            # Same totals as the Budgets tab (one shared query each)
+            df_budget = reads["phase_budget"].result()
+            df_spend = reads["phase_spent"].result()
             df_phase = pd.merge(df_budget, df_spend, on="phase", how="left").fillna({"spent_total": 0})
             df_phase["remain"] = df_phase["budget_total"] - df_phase["spent_total"]
 
@@ -250,246 +787,162 @@ def render_finance():
                 mime="text/csv"
             )
 
-        except Error as e:
-            st.error(f"Database error (Summary tab): {e}")
+        except DB_ERRORS as e:
+            db_error("Summary tab", e)
 
     # ======================================================
-    # ➕ New Transaction tab — checkbox table + form
+    # 🔮 Forecast tab — projected end-of-period spend
     # ======================================================
-    with tab_entry:
-        st.subheader("Add New Transaction")
+    with tab_forecast, section("Forecast"):
+        st.subheader("Spend Forecast (projected at each budget's end date)")
 
         try:
-            q_budget_table = """
-                SELECT
-                    b.budget_id,
-                    b.budget_line,
-                    b.task,
-                    COALESCE(b.budget_usd, 0) AS budget_usd,
-                    COALESCE(x.spent, 0) AS spent
-                FROM budgets b
-                LEFT JOIN (
-                    SELECT budget_id, SUM(amount_usd) AS spent
-                    FROM transactions
-                    GROUP BY budget_id
-                ) x ON x.budget_id = b.budget_id
-                ORDER BY b.budget_line, b.budget_id
-            """
-            df_budgets = pd.read_sql(q_budget_table, conn)
+            df_fc = forecast_budgets(rconn)
+            df_lines = forecast_by_line(df_fc)
+            overrunning = df_fc[df_fc["overrun"]]
 
-            if df_budgets.empty:
-                st.info("No budgets available. Please add budgets first.")
-            else:
-                df_budgets["Select"] = False
-                show = df_budgets.copy()
-                show["Budget (USD)"] = show["budget_usd"].apply(money)
-                show["Spent"] = show["spent"].apply(money)
-                show = show[["Select", "budget_id", "budget_line", "task", "Budget (USD)", "Spent"]]
+            f1, f2, f3 = st.columns(3)
+            f1.metric("Projected Spend", money(df_fc["projected_spend"].sum()))
+            f2.metric("Total Budget", money(df_fc["budget_usd"].sum()))
+            f3.metric("Items Projected to Overrun", len(overrunning))
 
-                st.caption("Select ONE budget (phase/task):")
-                edited = st.data_editor(
-                    show,
-                    use_container_width=True,
-                    hide_index=True,
-                    column_config={
-                        "Select": st.column_config.CheckboxColumn(default=False, help="Tick to select this budget"),
-                        "budget_id": st.column_config.NumberColumn("Budget ID", disabled=True),
-                        "budget_line": st.column_config.TextColumn("Phase", disabled=True),
-                        "task": st.column_config.TextColumn("Task", disabled=True),
-                        "Budget (USD)": st.column_config.TextColumn(disabled=True),
-                        "Spent": st.column_config.TextColumn(disabled=True),
-                    }
-                )
-
-                selected_rows = edited[edited["Select"] == True]
-                selected_count = len(selected_rows)
-                selected_budget_id = int(selected_rows["budget_id"].iloc[0]) if selected_count == 1 else None
-
-                if selected_count == 0:
-                    st.info("No budget selected yet.")
-                elif selected_count > 1:
-                    st.warning("Please select **only one** budget to proceed.")
-                else:
-                    st.success(f"Selected Budget ID: {selected_budget_id}")
-
-                st.markdown("---")
+            if overrunning.empty:
+                st.success("No budget item is projected to overrun before its end date.")
+            else:
+                st.warning(f"{len(overrunning)} budget items are projected to overrun before their end date.")
+                view = overrunning[[
+                    "budget_id", "budget_line", "task", "end_date", "budget_usd", "spent",
+                    "rate", "projected_spend", "projected_overrun", "overrun_date"
+                ]].copy()
+                view["overrun_date"] = view["overrun_date"].dt.date
+                for col in ["budget_usd", "spent", "rate", "projected_spend", "projected_overrun"]:
+                    view[col] = view[col].apply(money)
+                st.dataframe(view.rename(columns={"rate": "burn/day"}), use_container_width=True)
+
+            st.markdown("**By budget line**")
+            show = df_lines.copy()
+            for col in ["budget_usd", "spent", "rate", "projected_spend", "projected_overrun"]:
+                show[col] = show[col].apply(money)
+            st.dataframe(show.rename(columns={"rate": "burn/day"}), use_container_width=True)
 
-                c1, c2 = st.columns(2)
-                with c1:
-                    tx_date = st.date_input("Transaction date", value=date.today())
-                    amount = st.number_input("Amount (USD)", min_value=0.00, step=0.01, format="%.2f")
-                with c2:
-                    description = st.text_input("Description", value="", placeholder="e.g., Food & transport")
-                    notes = st.text_input("Notes (optional)", value="", placeholder="Method: Cash; IQD: 1,000,000")
+        except DB_ERRORS as e:
+            db_error("Forecast tab", e)
 
-                if st.button("Save Transaction", type="primary"):
-                    if selected_count != 1:
-                        st.error("Please select exactly one budget in the table above.")
-                    elif amount <= 0:
-                        st.error("Amount must be greater than 0.")
-                    else:
-                        try:
-                            cur = conn.cursor()
-                            cur.execute(
-                                """
-                                INSERT INTO transactions
-                                (budget_id, transaction_date, description, amount_usd, notes)
-                                VALUES (%s, %s, %s, %s, %s)
-                                """,
-                                (selected_budget_id, tx_date, description or None, amount, notes or None)
-                            )
-                            st.success("Transaction saved ✅")
-                        except Error as e:
-                            st.error(f"Insert failed: {e}")
-                        finally:
-                            try:
-                                cur.close()
-                            except:
-                                pass
-
-                with st.expander("Recent Transactions"):
-                    preview_q = """
-                        SELECT t.transaction_id, b.budget_line, t.transaction_date, t.description, t.amount_usd, t.notes
-                        FROM transactions t
-                        JOIN budgets b ON b.budget_id = t.budget_id
-                        ORDER BY t.transaction_id DESC
-                        LIMIT 20
-                    """
-                    df_recent = pd.read_sql(preview_q, conn)
-                    if not df_recent.empty:
-                        show_recent = df_recent.copy()
-                        show_recent["amount_usd"] = show_recent["amount_usd"].apply(money)
-                        st.dataframe(show_recent, use_container_width=True)
-                    else:
-                        st.caption("No transactions yet.")
+    # ======================================================
+    # ➕ New Transaction tab — checkbox table + form
+    # ======================================================
+    with tab_entry, section("New Transaction"):
+        render_transaction_entry()
 
-        except Error as e:
-            st.error(f"Database error (New Transaction tab): {e}")
 
     # ======================================================
     # 📝 Edit Budgets tab — edit Budget & Spent
     # ======================================================
-    with tab_edit:
+    with tab_edit, section("Edit Budgets"):
         st.subheader("Edit Budgets (Budget & Spent)")
+        flash = st.session_state.pop("edit_budgets_saved", None)
+        if flash:
+            st.success(flash)
+        ready = False
+        if conn is None:
+            st.info("Editing budgets is disabled while MySQL is unavailable.")
+        else:
+            try:
+                ready = budget_versioning_ready(conn)
+            except DB_ERRORS as e:
+                db_error("Edit Budgets", e)
+            else:
+                if not ready:
+                    st.error(
+                        "Editing budgets needs the `row_version` column on `budgets`. "
+                        "Run `python finance_migrations.py` once to add it."
+                    )
+        if ready:
+            try:
+                # Read from the primary: the save compares against these live row versions
+                live = load_budget_rows(conn)
+
+                # Edits are made against the snapshot taken when editing started; its
+                # row_version and spent guard the save against concurrent changes.
+                if "edit_budgets_base" not in st.session_state:
+                    st.session_state["edit_budgets_base"] = live
+                base = st.session_state["edit_budgets_base"]
+
+                stale = base.merge(live[["budget_id", "row_version"]], on="budget_id", how="outer",
+                                   suffixes=("", "_live"), indicator=True)
+                n_stale = int(((stale["_merge"] != "both") | (stale["row_version"] != stale["row_version_live"])).sum())
+                if n_stale:
+                    st.info(f"{n_stale} budget row(s) changed since you started editing.")
+                    if st.button("Reload latest budgets"):
+                        reset_budget_editor()
+                        st.rerun()
+
+                st.caption(
+                    "Edit **budget_usd** directly. "
+                    "Editing **spent** will create an automatic *Adjustment* transaction "
+                    "for the difference (can be positive or negative)."
+                )
 
-        try:
-            # Load budgets with current spent
-            src = pd.read_sql(
-                """
-                SELECT
-                    b.budget_id,
-                    b.budget_line,
-                    b.task,
-                    b.sub_tasks,
-                    b.start_date,
-                    b.end_date,
-                    b.budget_usd,
-                    COALESCE(x.spent, 0) AS spent,
-                    b.justification
-                FROM budgets b
-                LEFT JOIN (
-                    SELECT budget_id, SUM(amount_usd) AS spent
-                    FROM transactions
-                    GROUP BY budget_id
-                ) x ON x.budget_id = b.budget_id
-                ORDER BY b.budget_id ASC
-                """,
-                conn
-            )
-
-            st.caption(
-                "Edit **budget_usd** directly. "
-                "Editing **spent** will create an automatic *Adjustment* transaction "
-                "for the difference (can be positive or negative)."
-            )
-
-            edited = st.data_editor(
-                src,
-                use_container_width=True,
-                hide_index=True,
-                column_config={
-                    "budget_id": st.column_config.NumberColumn("budget_id", disabled=True, help="Primary key"),
-                    "budget_line": st.column_config.TextColumn("budget_line"),
-                    "task": st.column_config.TextColumn("task"),
-                    "sub_tasks": st.column_config.TextColumn("sub_tasks", help="Optional"),
-                    "start_date": st.column_config.DateColumn("start_date", help="YYYY-MM-DD"),
-                    "end_date": st.column_config.DateColumn("end_date", help="YYYY-MM-DD"),
-                    "budget_usd": st.column_config.NumberColumn("budget_usd", step=0.01, format="%.2f"),
-                    "spent": st.column_config.NumberColumn("spent", step=0.01, format="%.2f"),
-                    "justification": st.column_config.TextColumn("justification", help="Optional"),
-                }
-            )
-
-            def _norm(v):
-                if pd.isna(v) or (isinstance(v, str) and v.strip() == ""):
-                    return None
-                return v
-
-            if st.button("Save Changes", type="primary"):
-                try:
-                    cur = conn.cursor()
-                    rows_updated = 0
-                    tx_inserted = 0
-                    for i in range(len(edited)):
-                        new = edited.iloc[i]
-                        old = src.iloc[i]
-                        bid = int(new["budget_id"])
-
-                        # --- Update budgets fields if changed ---
-                        fields_changed = []
-                        vals = []
-                        for col in ["budget_line", "task", "sub_tasks", "start_date", "end_date", "budget_usd", "justification"]:
-                            v_new = _norm(new[col])
-                            v_old = _norm(old[col])
-                            if str(v_new) != str(v_old):
-                                fields_changed.append(col)
-                                if col == "budget_usd" and v_new is not None:
-                                    vals.append(float(v_new))
-                                else:
-                                    vals.append(v_new)
-
-                        if fields_changed:
-                            set_clause = ", ".join([f"{c}=%s" for c in fields_changed])
-                            cur.execute(f"UPDATE budgets SET {set_clause} WHERE budget_id=%s", (*vals, bid))
-                            rows_updated += cur.rowcount
-
-                        # --- Adjust 'spent' via transactions if changed ---
-                        current_spent = float(old["spent"]) if not pd.isna(old["spent"]) else 0.0
-                        desired_spent = float(new["spent"]) if not pd.isna(new["spent"]) else 0.0
-                        delta = round(desired_spent - current_spent, 2)
-                        if abs(delta) > 0.00001:  # need adjustment
-                            cur.execute(
-                                """
-                                INSERT INTO transactions
-                                (budget_id, transaction_date, description, amount_usd, notes)
-                                VALUES (%s, %s, %s, %s, %s)
-                                """,
-                                (
-                                    bid,
-                                    date.today(),
-                                    "Adjustment via Edit Budgets",
-                                    delta,  # may be positive or negative
-                                    f"Auto-adjust on {datetime.now().isoformat(timespec='seconds')}"
-                                )
-                            )
-                            tx_inserted += 1
+                edited = st.data_editor(
+                    base,
+                    key="edit_budgets_editor",
+                    use_container_width=True,
+                    hide_index=True,
+                    column_config={
+                        "budget_id": st.column_config.NumberColumn("budget_id", disabled=True, help="Primary key"),
+                        "budget_line": st.column_config.TextColumn("budget_line"),
+                        "task": st.column_config.TextColumn("task"),
+                        "sub_tasks": st.column_config.TextColumn("sub_tasks", help="Optional"),
+                        "start_date": st.column_config.DateColumn("start_date", help="YYYY-MM-DD"),
+                        "end_date": st.column_config.DateColumn("end_date", help="YYYY-MM-DD"),
+                        "budget_usd": st.column_config.NumberColumn("budget_usd", step=0.01, format="%.2f"),
+                        "spent": st.column_config.NumberColumn("spent", step=0.01, format="%.2f"),
+                        "justification": st.column_config.TextColumn("justification", help="Optional"),
+                        "row_version": None,
+                    }
+                )
 
-                    st.success(f"Saved changes for {rows_updated} budget row(s), added {tx_inserted} adjustment transaction(s) ✅")
+                if st.button("Save Changes", type="primary"):
                     try:
-                        cur.close()
-                    except:
-                        pass
-
-                except Error as e:
-                    st.error(f"Save failed: {e}")
-
-        except Error as e:
-            st.error(f"Database error (Edit Budgets): {e}")
+                        rows_updated, tx_inserted, conflicts = save_budget_edits(conn, base, edited)
+                        if rows_updated:
+                            note_write()
+                        message = f"Saved changes for {rows_updated} budget row(s), added {tx_inserted} adjustment transaction(s) ✅"
+                        if conflicts:
+                            st.session_state["edit_budgets_conflicts"] = conflicts
+                            st.success(message)
+                        else:
+                            # Reload the editor (and the other tabs) with the saved rows
+                            reset_budget_editor()
+                            st.session_state["edit_budgets_saved"] = message
+                            st.rerun()
+                    except Error as e:
+                        note_db_failure(e)
+                        st.error(f"Save failed: {e}")
+
+                conflicts = st.session_state.get("edit_budgets_conflicts") or []
+                if conflicts:
+                    st.warning(
+                        f"{len(conflicts)} budget row(s) were changed by someone else and were not saved. "
+                        "Review the differences, then reload and re-apply your edits."
+                    )
+                    for bid, base_row, mine, theirs in conflicts:
+                        st.markdown(f"**budget_id {bid}**" + ("" if theirs else " — deleted"))
+                        if theirs:
+                            st.dataframe(merge_view(base_row, mine, theirs, BUDGET_FIELDS + ["spent"]),
+                                         use_container_width=True)
+                    if st.button("Reload latest budgets", key="edit_budgets_reload_conflicts"):
+                        reset_budget_editor()
+                        st.rerun()
+
+            except DB_ERRORS as e:
+                db_error("Edit Budgets", e)
 
     # ---------------------------------------
-    # Close connection
+    # Close connections
     # ---------------------------------------
-    try:
-        conn.close()
-    except:
-        pass
+    for c in {conn, rconn} - {None}:
+        try:
+            c.close()
+        except:
+            pass
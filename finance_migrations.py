@@ -0,0 +1,52 @@
+# ========================= FINANCE SCHEMA MIGRATIONS =========================
+# Schema changes of the MySQL finance tables. They are applied once per
+# deployment, never from a page render (ALTER TABLE locks the table):
+#
+#   python finance_migrations.py
+#
+# Each migration adds a column when it is missing, so running it again is a no-op.
+MIGRATIONS = [
+    # Edit Budgets: optimistic concurrency on budget rows
+    ("budgets", "row_version", "ALTER TABLE budgets ADD COLUMN row_version INT NOT NULL DEFAULT 1"),
+]
+
+
+def has_column(conn, table: str, column: str) -> bool:
+    cur = conn.cursor()
+    try:
+        cur.execute(f"SHOW COLUMNS FROM {table} LIKE %s", (column,))
+        return bool(cur.fetchall())
+    finally:
+        cur.close()
+
+
+def pending_migrations(conn) -> list:
+    """The (table, column, statement) migrations not applied yet."""
+    return [m for m in MIGRATIONS if not has_column(conn, m[0], m[1])]
+
+
+def apply_migrations(conn) -> list:
+    """Apply the pending migrations; returns the applied ones."""
+    applied = []
+    for table, column, statement in pending_migrations(conn):
+        cur = conn.cursor()
+        try:
+            cur.execute(statement)
+        finally:
+            cur.close()
+        applied.append((table, column, statement))
+    return applied
+
+
+if __name__ == "__main__":
+    from finance import get_connection
+
+    # Schema changes can take longer than the per-query limit of page reads
+    conn = get_connection(query_timeout_ms=600000)
+    try:
+        applied = apply_migrations(conn)
+    finally:
+        conn.close()
+    for table, column, _ in applied:
+        print(f"Added {table}.{column}")
+    print(f"{len(applied)} migration(s) applied" if applied else "Schema is up to date")
@@ -0,0 +1,385 @@
+import datetime
+import decimal
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from instrumentation import query_timer
+
+# ========================= FINANCE READ REPLICA =========================
+# A local SQLite copy of the MySQL `budgets` and `transactions` tables. Reads of
+# the finance page go to the replica; writes still go to MySQL.
+#
+# Changes are found with row checksums computed on the primary
+# (SUM(CRC32(CONCAT_WS(...))) over every column), so inserts, deletes and
+# UPDATEs of any column are all picked up:
+#   - transactions: checksums per block of TX_BLOCK ids; only blocks whose checksum
+#     differs from the last sync (new rows land in new or changed blocks) are
+#     re-pulled.
+#   - budgets: one checksum over the (small) table; reloaded when it differs.
+# Replica columns are declared with the type of the source values (DATE, DATETIME,
+# INTEGER, REAL, TEXT), so dates read back as date objects as they do from MySQL.
+# The primary is checked at most every SYNC_INTERVAL seconds, except for a session
+# that just wrote (note_write), which syncs before its next read (read-your-writes).
+#
+# The source is any DB-API connection with %s placeholders (mysql.connector or a
+# local stand-in, see register_mysql_functions), so sync_replica can be exercised
+# without the production server.
+REPLICA_PATH = os.path.join(".cache", "finance_replica.db")
+SYNC_INTERVAL = 15
+FETCH_BATCH = 5000
+TX_BLOCK = 1000
+
+KEYS = {"budgets": "budget_id", "transactions": "transaction_id"}
+INDEXES = {"transactions": ["budget_id", "transaction_date"]}
+
+_SESSION_KEY = "finance_replica_pending"
+
+_sync_lock = threading.Lock()
+_last_sync = {}
+
+
+# ========================= CHECKSUMS =========================
+def row_checksum(columns, alias: str = "") -> str:
+    """
+    SQL expression (MySQL) summing a CRC32 of every row's `columns`. NULLs are
+    spelled out because CONCAT_WS skips them.
+    """
+    prefix = f"{alias}." if alias else ""
+    parts = ", ".join(f"IFNULL({prefix}{c}, '<null>')" for c in columns)
+    return f"COALESCE(SUM(CRC32(CONCAT_WS('|', {parts}))), 0)"
+
+
+def _mysql_text(v):
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    return str(v)
+
+
+def register_mysql_functions(conn: sqlite3.Connection):
+    """Add CRC32 and CONCAT_WS to a SQLite connection used as a stand-in for the primary."""
+    conn.create_function("CRC32", 1, lambda v: None if v is None else zlib.crc32(_mysql_text(v).encode("utf-8")))
+    conn.create_function(
+        "CONCAT_WS", -1,
+        lambda sep, *vals: None if sep is None else sep.join(_mysql_text(v) for v in vals if v is not None),
+    )
+
+
+# ========================= REPLICA STORAGE =========================
+def _parse_date(b):
+    try:
+        return datetime.date.fromisoformat(b.decode())
+    except ValueError:
+        return b.decode()
+
+
+def _parse_datetime(b):
+    try:
+        return datetime.datetime.fromisoformat(b.decode())
+    except ValueError:
+        return b.decode()
+
+
+sqlite3.register_converter("DATE", _parse_date)
+sqlite3.register_converter("DATETIME", _parse_datetime)
+
+
+def replica_connect(path: str = REPLICA_PATH) -> sqlite3.Connection:
+    """Open the replica (created on first use). DATE/DATETIME columns read back as date objects."""
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False, detect_types=sqlite3.PARSE_DECLTYPES)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE IF NOT EXISTS replica_meta (key TEXT PRIMARY KEY, value TEXT)")
+    register_mysql_functions(conn)  # row_checksum() queries also run on the replica
+    return conn
+
+
+def _get_meta(rconn, key, default=None):
+    row = rconn.execute("SELECT value FROM replica_meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else default
+
+
+def _set_meta(rconn, key, value):
+    rconn.execute("INSERT OR REPLACE INTO replica_meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+
+def _to_sqlite(v):
+    """MySQL values (Decimal, date, datetime, timedelta) as SQLite-storable values."""
+    if isinstance(v, decimal.Decimal):
+        return float(v)
+    if isinstance(v, datetime.datetime):
+        return v.isoformat(sep=" ")
+    if isinstance(v, datetime.date):
+        return v.isoformat()
+    if isinstance(v, datetime.timedelta):
+        return v.total_seconds()
+    return v
+
+
+def _replica_columns(rconn, table):
+    return [r[1] for r in rconn.execute(f'PRAGMA table_info("{table}")')]
+
+
+def _declared_type(value) -> str:
+    """SQLite column type for a source value (first non-null value of the column)."""
+    if isinstance(value, datetime.datetime):
+        return "DATETIME"
+    if isinstance(value, datetime.date):
+        return "DATE"
+    if isinstance(value, bool) or isinstance(value, int):
+        return "INTEGER"
+    if isinstance(value, (float, decimal.Decimal, datetime.timedelta)):
+        return "REAL"
+    if isinstance(value, str):
+        return "TEXT"
+    return ""
+
+
+def _create_table(rconn, table, columns, rows=()):
+    """(Re)create `table` with column types taken from the first non-null value in `rows`."""
+    key = KEYS[table]
+    types = {}
+    for row in rows:
+        for col, v in zip(columns, row):
+            if v is not None and col not in types:
+                types[col] = _declared_type(v)
+        if len(types) == len(columns):
+            break
+    cols = ", ".join(
+        f'"{c}" INTEGER PRIMARY KEY' if c == key else f'"{c}" {types.get(c, "")}'.rstrip()
+        for c in columns
+    )
+    rconn.execute(f'DROP TABLE IF EXISTS "{table}"')
+    rconn.execute(f'CREATE TABLE "{table}" ({cols})')
+    for col in INDEXES.get(table, []):
+        if col in columns:
+            rconn.execute(f'CREATE INDEX "ix_{table}_{col}" ON "{table}" ("{col}")')
+
+
+def _insert_rows(rconn, table, columns, rows):
+    sql = f'INSERT OR REPLACE INTO "{table}" ({", ".join(columns)}) VALUES ({", ".join("?" * len(columns))})'
+    rconn.executemany(sql, [tuple(_to_sqlite(v) for v in row) for row in rows])
+
+
+# ========================= SYNC =========================
+def _scalar_row(source, query, params=()):
+    cur = source.cursor()
+    try:
+        cur.execute(query, params)
+        return tuple(cur.fetchone())
+    finally:
+        cur.close()
+
+
+def _source_columns(source, table):
+    cur = source.cursor()
+    try:
+        cur.execute(f"SELECT * FROM {table} WHERE 1 = 0")
+        columns = [d[0] for d in cur.description]
+        cur.fetchall()
+        return columns
+    finally:
+        cur.close()
+
+
+def _load_table(source, rconn, table, where="", params=()):
+    """
+    Copy `SELECT * FROM table [where]` into the replica; without `where` the table
+    is (re)created. Returns the row count, or None if the columns differ from the
+    replica's (a full reload is needed).
+    """
+    key = KEYS[table]
+    cur = source.cursor()
+    try:
+        cur.execute(f"SELECT * FROM {table} {where} ORDER BY {key}", params)
+        columns = [d[0] for d in cur.description]
+        if where and columns != _replica_columns(rconn, table):
+            cur.fetchall()
+            return None
+        rows = cur.fetchmany(FETCH_BATCH)
+        if not where:
+            _create_table(rconn, table, columns, rows)
+        n = 0
+        while rows:
+            _insert_rows(rconn, table, columns, rows)
+            n += len(rows)
+            rows = cur.fetchmany(FETCH_BATCH)
+        return n
+    finally:
+        cur.close()
+
+
+def _budgets_marker(source):
+    """Row count and checksum over every column of budgets."""
+    columns = _source_columns(source, "budgets")
+    row = _scalar_row(source, f"SELECT COUNT(*), {row_checksum(columns)} FROM budgets")
+    return ":".join(str(int(v)) for v in row)
+
+
+def _transaction_blocks(source, columns) -> dict:
+    """{block number: "count:checksum"} of the primary's transactions, per TX_BLOCK ids."""
+    cur = source.cursor()
+    try:
+        cur.execute(
+            f"SELECT FLOOR(transaction_id / {TX_BLOCK}) AS blk, COUNT(*), {row_checksum(columns)} "
+            f"FROM transactions GROUP BY FLOOR(transaction_id / {TX_BLOCK})"
+        )
+        return {str(int(blk)): f"{int(n)}:{int(crc)}" for blk, n, crc in cur.fetchall()}
+    finally:
+        cur.close()
+
+
+def sync_replica(source, path: str = REPLICA_PATH) -> dict:
+    """
+    Bring the replica up to date with `source`. Returns what was done:
+    {"budgets": reloaded?, "transactions": rows pulled, "blocks": id blocks re-pulled,
+    "full": full reload?}.
+    """
+    result = {"budgets": False, "transactions": 0, "blocks": 0, "full": False}
+    with _sync_lock, query_timer("replica.sync") as event:
+        rconn = replica_connect(path)
+        try:
+            with rconn:
+                # --- budgets: reload on checksum change ---
+                marker = _budgets_marker(source)
+                if marker != _get_meta(rconn, "budgets_marker") or not _replica_columns(rconn, "budgets"):
+                    _load_table(source, rconn, "budgets")
+                    _set_meta(rconn, "budgets_marker", marker)
+                    result["budgets"] = True
+
+                # --- transactions: re-pull the id blocks whose checksum changed ---
+                # Checksums are taken before pulling, so a row changed in between
+                # is simply seen as changed again by the next sync.
+                columns = _source_columns(source, "transactions")
+                blocks = _transaction_blocks(source, columns)
+                known = json.loads(_get_meta(rconn, "tx_blocks", "{}"))
+                full = columns != _replica_columns(rconn, "transactions")
+                if not full:
+                    changed = sorted(
+                        (b for b in set(blocks) | set(known) if blocks.get(b) != known.get(b)), key=int
+                    )
+                    for b in changed:
+                        lo, hi = int(b) * TX_BLOCK, (int(b) + 1) * TX_BLOCK
+                        rconn.execute("DELETE FROM transactions WHERE transaction_id >= ? AND transaction_id < ?", (lo, hi))
+                        pulled = _load_table(
+                            source, rconn, "transactions",
+                            "WHERE transaction_id >= %s AND transaction_id < %s", (lo, hi),
+                        )
+                        if pulled is None:  # columns changed meanwhile
+                            full = True
+                            break
+                        result["transactions"] += pulled
+                        result["blocks"] += 1
+                if full:
+                    result["transactions"] = _load_table(source, rconn, "transactions")
+                    result["full"] = True
+                _set_meta(rconn, "tx_blocks", json.dumps(blocks, sort_keys=True))
+
+                top = rconn.execute("SELECT COALESCE(MAX(transaction_id), 0) FROM transactions").fetchone()[0]
+                _set_meta(rconn, "tx_watermark", int(top))
+                if result["budgets"] or result["blocks"] or result["full"]:
+                    _set_meta(rconn, "data_version", int(_get_meta(rconn, "data_version", 0)) + 1)
+                _set_meta(rconn, "synced_at", datetime.datetime.now().isoformat(timespec="seconds"))
+        finally:
+            rconn.close()
+        event["rows"] = result["transactions"]
+    _last_sync[path] = time.monotonic()
+    return result
+
+
+def replica_status(path: str = REPLICA_PATH) -> dict:
+    """Watermark, data version (bumped by every sync that changed something) and last sync time."""
+    rconn = replica_connect(path)
+    try:
+        return {
+            "tx_watermark": int(_get_meta(rconn, "tx_watermark", 0)),
+            "data_version": int(_get_meta(rconn, "data_version", 0)),
+            "synced_at": _get_meta(rconn, "synced_at"),
+        }
+    finally:
+        rconn.close()
+
+
+# ========================= READS =========================
+class ReplicaCursor:
+    """DB-API cursor over the replica accepting the MySQL %s placeholders used in finance queries."""
+
+    def __init__(self, cur):
+        self._cur = cur
+
+    def execute(self, query, params=None):
+        query = query.replace("%s", "?")
+        self._cur.execute(query, tuple(_to_sqlite(v) for v in (params or ())))
+        return self
+
+    def fetchone(self):
+        return self._cur.fetchone()
+
+    def fetchmany(self, size=FETCH_BATCH):
+        return self._cur.fetchmany(size)
+
+    def fetchall(self):
+        return self._cur.fetchall()
+
+    @property
+    def description(self):
+        return self._cur.description
+
+    @property
+    def rowcount(self):
+        return self._cur.rowcount
+
+    def close(self):
+        self._cur.close()
+
+
+class ReplicaConnection:
+    """Read-only stand-in for the MySQL connection (pd.read_sql and cursor() work unchanged)."""
+
+    def __init__(self, path: str = REPLICA_PATH, synced: dict = None):
+        self._conn = replica_connect(path)
+        self.synced = synced  # result of the sync done when opening, if any
+
+    def cursor(self):
+        return ReplicaCursor(self._conn.cursor())
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self._conn.close()
+
+
+def note_write(transaction_id: int = None):
+    """Record that this session wrote to the primary, so its next read syncs first."""
+    import streamlit as st
+
+    pending = st.session_state.get(_SESSION_KEY) or {"transaction_id": 0}
+    pending["transaction_id"] = max(pending["transaction_id"], int(transaction_id or 0))
+    st.session_state[_SESSION_KEY] = pending
+
+
+def replica_connection(source, path: str = REPLICA_PATH, max_age: float = SYNC_INTERVAL) -> ReplicaConnection:
+    """
+    Replica connection for this session's reads. Syncs from `source` first when the
+    last sync is older than `max_age` seconds or this session has a pending write.
+    """
+    import streamlit as st
+
+    pending = st.session_state.get(_SESSION_KEY)
+    last = _last_sync.get(path)
+    synced = None
+    if pending or last is None or time.monotonic() - last > max_age:
+        synced = sync_replica(source, path)
+        if pending and replica_status(path)["tx_watermark"] < pending["transaction_id"]:
+            # the write is committed on the primary, so one more pull must see it
+            synced = sync_replica(source, path)
+        st.session_state.pop(_SESSION_KEY, None)
+    return ReplicaConnection(path, synced)
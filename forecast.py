@@ -0,0 +1,184 @@
+import threading
+from datetime import date
+
+import numpy as np
+import pandas as pd
+from finance_replica import row_checksum
+from instrumentation import query_timer, timed_read_sql
+
+# ========================= SPEND FORECAST =========================
+# Each budget item (budget_id) gets a burn rate: the least-squares slope of its
+# cumulative spend over time, fitted for all items at once with bincount sums.
+# Items that spent on a single day have no slope; their rate is the amount spread
+# over the days since the item started (at least MIN_RATE_DAYS).
+# Projected spend at end_date = spent so far + burn rate * days remaining.
+#
+# Fits are cached per budget_id together with a signature of its transactions
+# (count and row checksum); only items whose signature changed are re-fetched and refitted.
+MIN_RATE_DAYS = 30
+SIGNATURE_COLUMNS = ["transaction_id", "budget_id", "transaction_date", "amount_usd"]
+
+# budget_id -> (signature, {"spent", "rate", "first", "last", "n"})
+_fit_cache = {}
+_fit_lock = threading.Lock()
+
+
+def transaction_signatures(conn) -> dict:
+    """budget_id -> (count, row checksum) of its transactions; any insert, delete or edit changes it."""
+    with query_timer("forecast.signatures") as event:
+        cur = conn.cursor()
+        try:
+            cur.execute(
+                f"""
+                SELECT budget_id, COUNT(*), {row_checksum(SIGNATURE_COLUMNS)}
+                FROM transactions
+                GROUP BY budget_id
+                """
+            )
+            rows = cur.fetchall()
+        finally:
+            cur.close()
+        event["rows"] = len(rows)
+    return {int(b): (int(n), int(c)) for b, n, c in rows if b is not None}
+
+
+def load_transactions(conn, budget_ids) -> pd.DataFrame:
+    """Dated amounts of the given budget items."""
+    placeholders = ", ".join(["%s"] * len(budget_ids))
+    return timed_read_sql(
+        f"""
+        SELECT budget_id, transaction_date, amount_usd
+        FROM transactions
+        WHERE budget_id IN ({placeholders})
+        """,
+        conn,
+        params=[int(b) for b in budget_ids],
+        label="forecast.transactions",
+    )
+
+
+def fit_burn_rates(tx: pd.DataFrame) -> pd.DataFrame:
+    """
+    Least-squares slope (USD/day) of cumulative spend per budget_id, vectorized
+    over all items. Items with a single spending day get a NaN rate (see forecast_budgets).
+    """
+    tx = tx.dropna(subset=["transaction_date"]).copy()
+    tx["transaction_date"] = pd.to_datetime(tx["transaction_date"])
+    tx["amount_usd"] = pd.to_numeric(tx["amount_usd"], errors="coerce").fillna(0.0)
+    tx = tx.sort_values(["budget_id", "transaction_date"], kind="stable")
+
+    codes, ids = pd.factorize(tx["budget_id"])
+    k = len(ids)
+    first = tx.groupby(codes)["transaction_date"].transform("min")
+    x = ((tx["transaction_date"] - first) / pd.Timedelta(days=1)).to_numpy(dtype=float)
+    y = tx.groupby(codes)["amount_usd"].cumsum().to_numpy(dtype=float)
+
+    n = np.bincount(codes, minlength=k).astype(float)
+    sx = np.bincount(codes, x, minlength=k)
+    sy = np.bincount(codes, y, minlength=k)
+    sxx = np.bincount(codes, x * x, minlength=k)
+    sxy = np.bincount(codes, x * y, minlength=k)
+    denom = n * sxx - sx * sx
+
+    spent = np.bincount(codes, tx["amount_usd"].to_numpy(dtype=float), minlength=k)
+    dates = tx.groupby(codes)["transaction_date"].agg(["min", "max"])
+
+    # denom is 0 when all of an item's spend falls on one day
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = np.where(denom > 1e-9, (n * sxy - sx * sy) / denom, np.nan)
+
+    return pd.DataFrame({
+        "budget_id": np.asarray(ids).astype(int),
+        "spent": spent,
+        "rate": np.maximum(slope, 0.0),
+        "first": dates["min"].to_numpy(),
+        "last": dates["max"].to_numpy(),
+        "n": n.astype(int),
+    })
+
+
+def refresh_fits(conn) -> pd.DataFrame:
+    """
+    Burn-rate fits for every budget item with transactions, refitting only the
+    items whose transactions changed since the last call.
+    """
+    signatures = transaction_signatures(conn)
+    with _fit_lock:
+        for budget_id in list(_fit_cache):
+            if budget_id not in signatures:
+                del _fit_cache[budget_id]
+        stale = [b for b, sig in signatures.items()
+                 if b not in _fit_cache or _fit_cache[b][0] != sig]
+
+    if stale:
+        with query_timer("forecast.fit") as event:
+            fits = fit_burn_rates(load_transactions(conn, stale))
+            event["rows"] = len(stale)
+        fitted = {fit["budget_id"]: fit for fit in fits.to_dict("records")}
+        with _fit_lock:
+            for budget_id in stale:
+                # Items whose transactions are all undated have no fit; cache that too
+                fit = fitted.get(budget_id) or {
+                    "budget_id": budget_id, "spent": 0.0, "rate": np.nan,
+                    "first": pd.NaT, "last": pd.NaT, "n": 0,
+                }
+                _fit_cache[budget_id] = (signatures[budget_id], fit)
+
+    with _fit_lock:
+        records = [fit for _, fit in _fit_cache.values()]
+    return pd.DataFrame(records, columns=["budget_id", "spent", "rate", "first", "last", "n"])
+
+
+def forecast_budgets(conn, today=None) -> pd.DataFrame:
+    """
+    Projected end-of-period spend per budget item and whether (and when) it
+    is projected to exceed its budget before end_date.
+    """
+    today = pd.Timestamp(today or date.today())
+    budgets = timed_read_sql(
+        "SELECT budget_id, budget_line, task, start_date, end_date, budget_usd FROM budgets",
+        conn,
+        label="forecast.budgets",
+    )
+    fits = refresh_fits(conn)
+    df = budgets.merge(fits, on="budget_id", how="left")
+    df["spent"] = df["spent"].fillna(0.0)
+    df["budget_usd"] = pd.to_numeric(df["budget_usd"], errors="coerce").fillna(0.0)
+
+    # Single spending day: spread it over the days since the item started
+    start = pd.to_datetime(df["start_date"], errors="coerce").fillna(pd.to_datetime(df["first"]))
+    elapsed = ((today - start) / pd.Timedelta(days=1)).clip(lower=MIN_RATE_DAYS).fillna(MIN_RATE_DAYS)
+    single_day = df["rate"].isna() & (df["spent"] > 0)
+    df.loc[single_day, "rate"] = df.loc[single_day, "spent"] / elapsed[single_day]
+    df["rate"] = df["rate"].fillna(0.0)
+
+    end = pd.to_datetime(df["end_date"], errors="coerce")
+    remaining_days = ((end - today) / pd.Timedelta(days=1)).clip(lower=0).fillna(0.0)
+    df["projected_spend"] = df["spent"] + df["rate"] * remaining_days
+    df["projected_overrun"] = df["projected_spend"] - df["budget_usd"]
+
+    # Date the budget runs out at the current burn rate
+    headroom = df["budget_usd"] - df["spent"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        days_left = np.where(df["rate"] > 0, headroom / df["rate"], np.inf)
+    exhausted = today + pd.to_timedelta(np.clip(days_left, 0, 36500), unit="D")
+    df["overrun_date"] = pd.Series(exhausted, index=df.index).where(
+        (headroom <= 0) | (df["rate"] > 0)
+    ).dt.normalize()
+    df["overrun"] = (df["projected_overrun"] > 0) & (
+        end.isna() | (df["overrun_date"] <= end)
+    )
+    return df.sort_values(["overrun", "projected_overrun"], ascending=[False, False]).reset_index(drop=True)
+
+
+def forecast_by_line(forecast: pd.DataFrame) -> pd.DataFrame:
+    """Budget-line totals of a per-item forecast."""
+    lines = forecast.groupby("budget_line", dropna=False).agg(
+        budget_usd=("budget_usd", "sum"),
+        spent=("spent", "sum"),
+        rate=("rate", "sum"),
+        projected_spend=("projected_spend", "sum"),
+        items_overrunning=("overrun", "sum"),
+    ).reset_index()
+    lines["projected_overrun"] = lines["projected_spend"] - lines["budget_usd"]
+    return lines.sort_values("projected_overrun", ascending=False).reset_index(drop=True)
@@ -0,0 +1,51 @@
+import base64
+import json
+
+import requests
+
+# Repository the app's database is mirrored to
+GITHUB_USER = "habdulhaq87"
+GITHUB_REPO = "amasdatadriven"
+
+REQUEST_TIMEOUT = 60
+
+
+def github_pat() -> str:
+    """Personal access token from the Streamlit secrets (also readable from a worker process)."""
+    import streamlit as st
+
+    return st.secrets["github"]["pat"]
+
+
+def put_file_to_github(
+    github_user: str,
+    github_repo: str,
+    github_pat: str,
+    file_path: str,
+    local_file_path: str,
+    commit_message: str,
+) -> requests.Response:
+    """
+    Upload or update a file (e.g., 'subtasks.db') in the given GitHub repo.
+    Returns the response of the PUT (200/201 on success); does not touch the UI.
+    """
+    url = f"https://api.github.com/repos/{github_user}/{github_repo}/contents/{file_path}"
+    headers = {"Authorization": f"Bearer {github_pat}"}
+
+    # Read local file into memory
+    with open(local_file_path, "rb") as file:
+        content = file.read()
+
+    b64_content = base64.b64encode(content).decode("utf-8")
+
+    # Check if file already exists on GitHub to get its 'sha'
+    response = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+    sha = response.json()["sha"] if response.status_code == 200 else None
+
+    payload = {
+        "message": commit_message,
+        "content": b64_content,
+        "sha": sha,
+    }
+
+    return requests.put(url, headers=headers, data=json.dumps(payload), timeout=REQUEST_TIMEOUT)
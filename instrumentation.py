@@ -0,0 +1,177 @@
+import json
+import logging
+import logging.handlers
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Timing events are appended as JSON lines to a rotating log:
+#   {"ts": ..., "kind": "import|render|section|sql", "name": ..., "page": ..., "duration_ms": ..., "rows": ...}
+LOG_DIR = ".cache"
+LOG_PATH = os.path.join(LOG_DIR, "timings.jsonl")
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 3
+
+_logger_lock = threading.Lock()
+_logger = None
+
+# Streamlit runs each session's script in its own thread, so the page being
+# rendered is tracked per thread and attached to section/sql events.
+_context = threading.local()
+
+
+def _get_logger() -> logging.Logger:
+    global _logger
+    if _logger is None:
+        with _logger_lock:
+            if _logger is None:
+                os.makedirs(LOG_DIR, exist_ok=True)
+                logger = logging.getLogger("amas.timings")
+                logger.setLevel(logging.INFO)
+                logger.propagate = False
+                handler = logging.handlers.RotatingFileHandler(
+                    LOG_PATH, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8"
+                )
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                logger.addHandler(handler)
+                _logger = logger
+    return _logger
+
+
+def current_page() -> str:
+    """Name of the page being rendered by this thread (None outside a page)."""
+    return getattr(_context, "page", None)
+
+
+def record(kind: str, name: str, duration_ms: float, **fields):
+    """Append one timing event to the JSONL log. Never raises."""
+    event = {
+        "ts": round(time.time(), 3),
+        "kind": kind,
+        "name": name,
+        "page": fields.pop("page", None) or current_page(),
+        "duration_ms": round(duration_ms, 2),
+        **fields,
+    }
+    try:
+        _get_logger().info(json.dumps(event, default=str))
+    except Exception:
+        pass
+
+
+@contextmanager
+def timed(kind: str, name: str, **fields):
+    """
+    Time the enclosed block and record it. Yields a dict; keys set on it
+    (e.g. `rows`) are stored with the event.
+    """
+    extra = dict(fields)
+    start = time.perf_counter()
+    try:
+        yield extra
+    finally:
+        record(kind, name, (time.perf_counter() - start) * 1000, **extra)
+
+
+@contextmanager
+def render_page(name: str):
+    """Time a whole page render and attribute nested events to it."""
+    previous = current_page()
+    _context.page = name
+    try:
+        with timed("render", name, page=name):
+            yield
+    finally:
+        _context.page = previous
+
+
+@contextmanager
+def attributed_to(page: str):
+    """Attribute events recorded by this thread (e.g. a query worker) to `page`."""
+    previous = current_page()
+    _context.page = page
+    try:
+        yield
+    finally:
+        _context.page = previous
+
+
+def section(name: str):
+    """Time one tab/section of the current page: `with tab, section("Budgets"): ...`"""
+    return timed("section", name)
+
+
+def import_module(module_name: str):
+    """Import a module, recording the import time the first time it is loaded."""
+    import importlib
+
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    with timed("import", module_name):
+        return importlib.import_module(module_name)
+
+
+def query_label(query: str, limit: int = 80) -> str:
+    """Compact one-line label for a SQL statement."""
+    label = " ".join(str(query).split())
+    return label if len(label) <= limit else label[:limit - 1] + "…"
+
+
+def query_timer(label: str):
+    """Time a SQL statement executed by hand; set `rows` on the yielded dict."""
+    return timed("sql", label)
+
+
+def timed_read_sql(query: str, conn, params=None, label: str = None):
+    """pandas.read_sql with the duration and row count recorded."""
+    import pandas as pd
+
+    with query_timer(label or query_label(query)) as event:
+        df = pd.read_sql(query, conn, params=params)
+        event["rows"] = len(df)
+    return df
+
+
+# ------------------- REPORTING -------------------
+def load_events(path: str = LOG_PATH):
+    """Load all timing events (current log plus rotated backups) as a DataFrame."""
+    import pandas as pd
+
+    records = []
+    for candidate in [f"{path}.{i}" for i in range(LOG_BACKUPS, 0, -1)] + [path]:
+        if not os.path.exists(candidate):
+            continue
+        with open(candidate, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    return pd.DataFrame(records)
+
+
+def summarize(events, kind: str):
+    """Count, p50, p95 and max duration per name (and page) for one kind of event."""
+    import pandas as pd
+
+    if events.empty or "kind" not in events:
+        return pd.DataFrame()
+    subset = events[events["kind"] == kind].copy()
+    if subset.empty:
+        return pd.DataFrame()
+    subset["page"] = subset["page"].fillna("")
+    grouped = subset.groupby(["page", "name"])["duration_ms"]
+    summary = grouped.agg(
+        count="count",
+        p50=lambda s: s.quantile(0.50),
+        p95=lambda s: s.quantile(0.95),
+        max="max",
+    ).reset_index()
+    if "rows" in subset:
+        summary = summary.merge(
+            subset.groupby(["page", "name"])["rows"].mean().rename("avg_rows").reset_index(),
+            on=["page", "name"], how="left",
+        )
+    return summary.sort_values("p95", ascending=False).round(2)
@@ -0,0 +1,449 @@
+import importlib
+import json
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import traceback
+
+# ========================= BACKGROUND JOBS =========================
+# Long operations (imports, GitHub pushes, report builds) are queued in a small
+# SQLite table and run by a worker pool in a separate process:
+#
+#   python jobs.py worker [--processes 2]
+#
+# Pages call enqueue() and poll get_job(); the app also starts a worker on
+# demand (ensure_worker) when none is running.
+JOBS_DIR = ".cache"
+JOBS_DB = os.path.join(JOBS_DIR, "jobs.db")
+WORKER_PID_PATH = os.path.join(JOBS_DIR, "jobs-worker.pid")
+UPLOAD_DIR = os.path.join(JOBS_DIR, "uploads")
+
+DEFAULT_PROCESSES = 2
+DEFAULT_MAX_ATTEMPTS = 3
+RETRY_BASE_SECONDS = 5     # retry n waits RETRY_BASE_SECONDS * 2 ** (n - 1)
+POLL_SECONDS = 1.0
+HEARTBEAT_SECONDS = 30     # a running job's heartbeat is refreshed this often while its handler runs
+STALE_SECONDS = 300        # a running job without a heartbeat for this long is requeued (or failed)
+
+STATUSES = ("queued", "running", "succeeded", "failed", "cancelled")
+FINISHED = ("succeeded", "failed", "cancelled")
+
+# Job kind -> "module:function". Handlers are imported in the worker on first use
+# and called as handler(job, **payload).
+HANDLERS = {
+    "github.push": "jobs:push_file_job",
+    "import.table": "database_phases:import_table_job",
+    "report.build": "report_engine:report_build_job",
+    "snapshot.run": "snapshots:snapshot_job",
+}
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when its job has been cancelled."""
+
+
+# ========================= QUEUE =========================
+def connect(db_path: str = JOBS_DB) -> sqlite3.Connection:
+    """Open the job database (WAL, so pages can read while workers write)."""
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued',
+            progress REAL NOT NULL DEFAULT 0,
+            message TEXT,
+            result TEXT,
+            error TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL DEFAULT 3,
+            cancel_requested INTEGER NOT NULL DEFAULT 0,
+            dedupe_key TEXT,
+            worker TEXT,
+            created_at REAL NOT NULL,
+            run_after REAL NOT NULL,
+            started_at REAL,
+            heartbeat_at REAL,
+            finished_at REAL
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, run_after)")
+    return conn
+
+
+def _row(row):
+    if row is None:
+        return None
+    job = dict(row)
+    job["payload"] = json.loads(job["payload"])
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
+
+
+def enqueue(kind: str, payload: dict = None, max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+            dedupe_key: str = None, db_path: str = JOBS_DB) -> int:
+    """
+    Queue a job and return its id. With `dedupe_key`, an identical job that is
+    still queued is reused instead of adding another (e.g. repeated pushes of one file).
+    """
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind '{kind}'")
+    conn = connect(db_path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        if dedupe_key:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE dedupe_key = ? AND status = 'queued' AND attempts = 0",
+                (dedupe_key,),
+            ).fetchone()
+            if row is not None:
+                conn.execute("COMMIT")
+                return row["id"]
+        now = time.time()
+        cur = conn.execute(
+            """
+            INSERT INTO jobs (kind, payload, max_attempts, dedupe_key, created_at, run_after)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (kind, json.dumps(payload or {}, default=str), max_attempts, dedupe_key, now, now),
+        )
+        conn.execute("COMMIT")
+        return cur.lastrowid
+    finally:
+        conn.close()
+
+
+def get_job(job_id: int, db_path: str = JOBS_DB) -> dict:
+    """Current state of one job (None if unknown)."""
+    conn = connect(db_path)
+    try:
+        return _row(conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+    finally:
+        conn.close()
+
+
+def list_jobs(limit: int = 50, db_path: str = JOBS_DB) -> list:
+    """Most recent jobs first."""
+    conn = connect(db_path)
+    try:
+        rows = conn.execute("SELECT * FROM jobs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [_row(r) for r in rows]
+    finally:
+        conn.close()
+
+
+def cancel_job(job_id: int, db_path: str = JOBS_DB) -> bool:
+    """
+    Cancel a job: queued jobs stop immediately, running ones at their next
+    progress report. Returns False if the job had already finished.
+    """
+    conn = connect(db_path)
+    try:
+        now = time.time()
+        cur = conn.execute(
+            "UPDATE jobs SET status = 'cancelled', finished_at = ?, message = 'Cancelled' "
+            "WHERE id = ? AND status = 'queued'",
+            (now, job_id),
+        )
+        if cur.rowcount:
+            return True
+        cur = conn.execute(
+            "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = 'running'", (job_id,)
+        )
+        return cur.rowcount > 0
+    finally:
+        conn.close()
+
+
+def retry_job(job_id: int, db_path: str = JOBS_DB) -> bool:
+    """Queue a failed or cancelled job again with a fresh attempt budget."""
+    conn = connect(db_path)
+    try:
+        cur = conn.execute(
+            """
+            UPDATE jobs SET status = 'queued', attempts = 0, progress = 0, error = NULL,
+                cancel_requested = 0, run_after = ?, finished_at = NULL, message = 'Requeued'
+            WHERE id = ? AND status IN ('failed', 'cancelled')
+            """,
+            (time.time(), job_id),
+        )
+        return cur.rowcount > 0
+    finally:
+        conn.close()
+
+
+def claim_next(conn: sqlite3.Connection, worker: str):
+    """
+    Atomically take the oldest runnable job. Stale running jobs (worker lost) are
+    requeued first, or failed if they have used up their attempts.
+    """
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(
+            "UPDATE jobs SET status = 'failed', worker = NULL, finished_at = ?, "
+            "error = 'Worker lost during the last attempt', message = 'Failed after worker loss' "
+            "WHERE status = 'running' AND heartbeat_at < ? AND attempts >= max_attempts",
+            (now, now - STALE_SECONDS),
+        )
+        conn.execute(
+            "UPDATE jobs SET status = 'queued', worker = NULL, message = 'Requeued after worker loss' "
+            "WHERE status = 'running' AND heartbeat_at < ?",
+            (now - STALE_SECONDS,),
+        )
+        row = conn.execute(
+            "SELECT * FROM jobs WHERE status = 'queued' AND run_after <= ? ORDER BY run_after, id LIMIT 1",
+            (now,),
+        ).fetchone()
+        if row is None:
+            conn.execute("COMMIT")
+            return None
+        conn.execute(
+            """
+            UPDATE jobs SET status = 'running', attempts = attempts + 1, worker = ?,
+                started_at = ?, heartbeat_at = ?, error = NULL
+            WHERE id = ?
+            """,
+            (worker, now, now, row["id"]),
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    job = _row(row)
+    job["attempts"] += 1
+    return job
+
+
+# ========================= RUNNING JOBS =========================
+class Job:
+    """Handle passed to handlers for progress reporting and cancellation checks."""
+
+    def __init__(self, conn: sqlite3.Connection, record: dict):
+        self.conn = conn
+        self.id = record["id"]
+        self.kind = record["kind"]
+        self.attempt = record["attempts"]
+
+    def progress(self, fraction: float, message: str = None):
+        """Record progress (0..1) and a status line; raises JobCancelled if cancellation was requested."""
+        self.conn.execute(
+            "UPDATE jobs SET progress = ?, message = COALESCE(?, message), heartbeat_at = ? WHERE id = ?",
+            (max(0.0, min(1.0, float(fraction))), message, time.time(), self.id),
+        )
+        self.check_cancelled()
+
+    def check_cancelled(self):
+        row = self.conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (self.id,)).fetchone()
+        if row is not None and row["cancel_requested"]:
+            raise JobCancelled()
+
+
+def resolve_handler(kind: str):
+    module_name, func_name = HANDLERS[kind].split(":")
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def _heartbeat(job_id: int, db_path: str, stop: threading.Event):
+    """Refresh a running job's heartbeat until `stop` is set (handlers may not report progress for a while)."""
+    conn = connect(db_path)
+    try:
+        while not stop.wait(HEARTBEAT_SECONDS):
+            conn.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND status = 'running'",
+                (time.time(), job_id),
+            )
+    finally:
+        conn.close()
+
+
+def run_job(conn: sqlite3.Connection, record: dict, db_path: str = JOBS_DB):
+    """Run one claimed job and store its outcome (success, retry, failure or cancellation)."""
+    job = Job(conn, record)
+    stop = threading.Event()
+    beat = threading.Thread(target=_heartbeat, args=(job.id, db_path, stop), name=f"job-{job.id}-heartbeat",
+                            daemon=True)
+    beat.start()
+    try:
+        job.check_cancelled()
+        result = resolve_handler(record["kind"])(job, **record["payload"])
+    except JobCancelled:
+        conn.execute(
+            "UPDATE jobs SET status = 'cancelled', message = 'Cancelled', finished_at = ? WHERE id = ?",
+            (time.time(), job.id),
+        )
+    except Exception as e:
+        error = "".join(traceback.format_exception_only(type(e), e)).strip()
+        if record["attempts"] < record["max_attempts"]:
+            delay = RETRY_BASE_SECONDS * 2 ** (record["attempts"] - 1)
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', error = ?, run_after = ?, message = ? WHERE id = ?",
+                (error, time.time() + delay, f"Attempt {record['attempts']} failed; retrying in {delay}s", job.id),
+            )
+        else:
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE id = ?",
+                (error, time.time(), job.id),
+            )
+    else:
+        conn.execute(
+            "UPDATE jobs SET status = 'succeeded', progress = 1, result = ?, finished_at = ?, "
+            "message = COALESCE(message, 'Done') WHERE id = ?",
+            (json.dumps(result, default=str) if result is not None else None, time.time(), job.id),
+        )
+    finally:
+        stop.set()
+        beat.join()
+
+
+def work_loop(worker: str, db_path: str = JOBS_DB, stop_when_idle: bool = False):
+    """Claim and run jobs until interrupted (or, with stop_when_idle, until the queue is empty)."""
+    conn = connect(db_path)
+    try:
+        while True:
+            record = claim_next(conn, worker)
+            if record is None:
+                if stop_when_idle:
+                    return
+                time.sleep(POLL_SECONDS)
+                continue
+            run_job(conn, record, db_path)
+    finally:
+        conn.close()
+
+
+def _worker_main(index: int, db_path: str):
+    try:
+        work_loop(f"{socket.gethostname()}:{os.getpid()}:{index}", db_path)
+    except KeyboardInterrupt:
+        pass
+
+
+def run_worker_pool(processes: int = DEFAULT_PROCESSES, db_path: str = JOBS_DB):
+    """Run `processes` worker processes, restarting any that die, until interrupted."""
+    import multiprocessing
+
+    os.makedirs(JOBS_DIR, exist_ok=True)
+    with open(WORKER_PID_PATH, "w") as f:
+        f.write(str(os.getpid()))
+
+    pool = {}
+    try:
+        while True:
+            for index in range(processes):
+                proc = pool.get(index)
+                if proc is None or not proc.is_alive():
+                    proc = multiprocessing.Process(target=_worker_main, args=(index, db_path), daemon=True)
+                    proc.start()
+                    pool[index] = proc
+            time.sleep(POLL_SECONDS * 5)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for proc in pool.values():
+            proc.terminate()
+        try:
+            os.remove(WORKER_PID_PATH)
+        except OSError:
+            pass
+
+
+def worker_running() -> bool:
+    """True if the worker pool recorded in the pid file is alive."""
+    try:
+        with open(WORKER_PID_PATH, "r") as f:
+            pid = int(f.read().strip())
+        os.kill(pid, 0)
+        return True
+    except (OSError, ValueError):
+        return False
+
+
+def ensure_worker(processes: int = DEFAULT_PROCESSES):
+    """Start a detached worker pool for this checkout unless one is already running."""
+    if worker_running():
+        return
+    subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "worker", "--processes", str(processes)],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    # Give the pool a moment to write its pid file, so concurrent sessions do not start another
+    for _ in range(20):
+        if worker_running():
+            return
+        time.sleep(0.1)
+
+
+def submit(kind: str, payload: dict = None, **kwargs) -> int:
+    """enqueue() and make sure a worker pool is running."""
+    job_id = enqueue(kind, payload, **kwargs)
+    ensure_worker()
+    return job_id
+
+
+# ========================= UPLOAD STAGING =========================
+def stage_upload(content: bytes, name: str = "upload") -> str:
+    """Write uploaded bytes to the job staging area so a worker can read them; returns the path."""
+    import hashlib
+
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    ext = os.path.splitext(name)[1]
+    path = os.path.join(UPLOAD_DIR, hashlib.sha256(content).hexdigest()[:24] + ext)
+    if not os.path.exists(path):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(content)
+        os.replace(tmp, path)
+    return path
+
+
+# ========================= HANDLERS =========================
+def push_file_job(job: Job, local_file_path: str = "subtasks.db", file_path: str = None,
+                  commit_message: str = None):
+    """Push a local file to the GitHub mirror; a non-2xx response fails the attempt (and is retried)."""
+    import datetime
+
+    from github_sync import GITHUB_REPO, GITHUB_USER, github_pat, put_file_to_github
+
+    job.progress(0.1, f"Pushing {local_file_path} to GitHub")
+    response = put_file_to_github(
+        github_user=GITHUB_USER,
+        github_repo=GITHUB_REPO,
+        github_pat=github_pat(),
+        file_path=file_path or local_file_path,
+        local_file_path=local_file_path,
+        commit_message=commit_message or f"Update {local_file_path} at {datetime.datetime.now()}",
+    )
+    if response.status_code not in (200, 201):
+        raise RuntimeError(f"GitHub returned {response.status_code}: {response.text[:300]}")
+    job.progress(1.0, "Pushed to GitHub")
+    return {"status_code": response.status_code}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Background job worker.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    worker = sub.add_parser("worker", help="Run the worker pool")
+    worker.add_argument("--processes", type=int, default=DEFAULT_PROCESSES)
+    sub.add_parser("drain", help="Run queued jobs in this process and exit")
+    args = parser.parse_args()
+
+    if args.command == "worker":
+        run_worker_pool(args.processes)
+    else:
+        work_loop(f"{socket.gethostname()}:{os.getpid()}:drain", stop_when_idle=True)
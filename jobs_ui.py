@@ -0,0 +1,71 @@
+import datetime
+
+import pandas as pd
+import streamlit as st
+import jobs
+
+
+def _describe(job: dict) -> str:
+    label = f"Job #{job['id']} ({job['kind']}): {job['status']}"
+    if job.get("message"):
+        label += f" — {job['message']}"
+    return label
+
+
+@st.fragment(run_every=2)
+def render_job_progress(job_id: int, key: str = None):
+    """
+    Progress of one background job, refreshed every 2 seconds while it is
+    queued or running (only this block reruns, not the page).
+    """
+    job = jobs.get_job(job_id)
+    if job is None:
+        st.warning(f"Job #{job_id} not found.")
+        return
+
+    if job["status"] in ("queued", "running"):
+        st.progress(job["progress"], text=_describe(job))
+        if job["error"]:
+            st.caption(f"Last error: {job['error']}")
+        if st.button("Cancel", key=f"job_cancel_{key or job_id}"):
+            jobs.cancel_job(job_id)
+            st.rerun(scope="fragment")
+    elif job["status"] == "succeeded":
+        st.success(_describe(job))
+    elif job["status"] == "cancelled":
+        st.warning(_describe(job))
+    else:
+        st.error(f"{_describe(job)}\n\n{job['error'] or ''}")
+        if st.button("Retry", key=f"job_retry_{key or job_id}"):
+            jobs.retry_job(job_id)
+            jobs.ensure_worker()
+            st.rerun(scope="fragment")
+
+
+def render_jobs_page():
+    """Hidden page (open the app with ?page=jobs) listing recent background jobs."""
+    st.title("Background Jobs")
+    running = jobs.worker_running()
+    st.caption(f"Queue: `{jobs.JOBS_DB}` · worker pool {'running' if running else 'not running'}")
+    if not running and st.button("Start worker pool"):
+        jobs.ensure_worker()
+        st.rerun()
+
+    recent = jobs.list_jobs(limit=100)
+    if not recent:
+        st.info("No jobs yet.")
+        return
+
+    df = pd.DataFrame(recent)
+    for col in ["created_at", "started_at", "finished_at"]:
+        df[col] = df[col].map(lambda t: datetime.datetime.fromtimestamp(t) if pd.notna(t) else None)
+    st.dataframe(
+        df[["id", "kind", "status", "progress", "message", "attempts", "max_attempts",
+            "created_at", "started_at", "finished_at", "error"]],
+        use_container_width=True,
+        hide_index=True,
+    )
+
+    active = [j for j in recent if j["status"] not in jobs.FINISHED]
+    for job in active:
+        render_job_progress(job["id"], key=f"page_{job['id']}")
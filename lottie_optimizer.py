@@ -0,0 +1,179 @@
+import glob
+import json
+import os
+
+# Offline optimizer for the Lottie animations under input/.
+# Writes a minified "<name>.min.json" next to each source file; the asset
+# registry (assets.load_lottie) serves that variant while it is up to date.
+#
+#   python lottie_optimizer.py [--precision 3]
+
+SOURCE_PATTERNS = ["input/*.json", "input/phase2/*.json"]
+MIN_SUFFIX = ".min.json"
+
+# Keys that only carry authoring metadata and are ignored by the player
+METADATA_KEYS = {"meta", "mn", "cl", "ln"}
+
+# Keys whose value equals the player's default and can be omitted
+DEFAULT_VALUES = {"hd": False, "ddd": 0, "ao": 0, "bm": 0}
+
+
+def minified_path(path: str) -> str:
+    """Return the path of the optimized variant of `path`."""
+    return path[:-len(".json")] + MIN_SUFFIX
+
+
+def is_lottie(data) -> bool:
+    """Lottie documents are objects with a version string and a layer list."""
+    return isinstance(data, dict) and "v" in data and isinstance(data.get("layers"), list)
+
+
+def has_expressions(node) -> bool:
+    """True if any animated property carries an expression (which may reference names)."""
+    if isinstance(node, dict):
+        if isinstance(node.get("x"), str):
+            return True
+        return any(has_expressions(v) for v in node.values())
+    if isinstance(node, list):
+        return any(has_expressions(v) for v in node)
+    return False
+
+
+def round_floats(node, precision: int):
+    """Round every float to `precision` decimals; integral results become ints."""
+    if isinstance(node, float):
+        value = round(node, precision)
+        return int(value) if value.is_integer() else value
+    if isinstance(node, dict):
+        return {k: round_floats(v, precision) for k, v in node.items()}
+    if isinstance(node, list):
+        return [round_floats(v, precision) for v in node]
+    return node
+
+
+def strip_keys(node, keys: set):
+    """Recursively drop the given keys from every object."""
+    if isinstance(node, dict):
+        return {k: strip_keys(v, keys) for k, v in node.items() if k not in keys}
+    if isinstance(node, list):
+        return [strip_keys(v, keys) for v in node]
+    return node
+
+
+def drop_defaults(node):
+    """Recursively drop keys that are set to their default value."""
+    if isinstance(node, dict):
+        return {
+            k: drop_defaults(v) for k, v in node.items()
+            if not (k in DEFAULT_VALUES and v is not True and v == DEFAULT_VALUES[k])
+        }
+    if isinstance(node, list):
+        return [drop_defaults(v) for v in node]
+    return node
+
+
+def _referenced_indexes(items: list) -> set:
+    """Layer indexes (`ind`) used by sibling layers as parent or track matte (`tp`)."""
+    refs = set()
+    for item in items:
+        if isinstance(item, dict):
+            refs.update(item[k] for k in ("parent", "tp") if k in item)
+    return refs
+
+
+def _removable(item, refs: set) -> bool:
+    # Hidden layers still drive their children (parent) and the layers they matte (td/tp)
+    return (
+        isinstance(item, dict) and item.get("hd") is True
+        and not item.get("td") and item.get("ind", object()) not in refs
+    )
+
+
+def drop_hidden(node):
+    """Remove hidden layers and shapes (`"hd": true`) from every list, unless another layer depends on them."""
+    if isinstance(node, dict):
+        return {k: drop_hidden(v) for k, v in node.items()}
+    if isinstance(node, list):
+        refs = _referenced_indexes(node)
+        return [drop_hidden(v) for v in node if not _removable(v, refs)]
+    return node
+
+
+def drop_unused_assets(data: dict) -> dict:
+    """Drop assets (images, precomps) that no reachable layer references via refId."""
+    assets = {asset.get("id"): asset for asset in data.get("assets", [])}
+    used = set()
+    pending = list(data.get("layers", []))
+    while pending:
+        layer = pending.pop()
+        ref = layer.get("refId")
+        if ref in assets and ref not in used:
+            used.add(ref)
+            pending.extend(assets[ref].get("layers", []))
+
+    data = dict(data)
+    if "assets" in data:
+        data["assets"] = [asset for asset in data["assets"] if asset.get("id") in used]
+    return data
+
+
+def optimize_animation(data: dict, precision: int = 3) -> dict:
+    """Return an optimized copy of a parsed Lottie animation."""
+    keys = set(METADATA_KEYS)
+    if not has_expressions(data):
+        # Names and property indexes are only needed when expressions look them up
+        keys.update({"nm", "ix"})
+    data = drop_hidden(data)
+    data = drop_unused_assets(data)
+    data = strip_keys(data, keys)
+    data = drop_defaults(data)
+    return round_floats(data, precision)
+
+
+def optimize_file(path: str, precision: int = 3):
+    """
+    Optimize one file and write its minified variant.
+    Returns (before_bytes, after_bytes), or None if the file is not a Lottie document.
+    """
+    with open(path, "r") as f:
+        data = json.load(f)
+    if not is_lottie(data):
+        return None
+
+    payload = json.dumps(optimize_animation(data, precision), separators=(",", ":"))
+    target = minified_path(path)
+    with open(target, "w") as f:
+        f.write(payload)
+    return os.path.getsize(path), os.path.getsize(target)
+
+
+def optimize_all(patterns=None, precision: int = 3):
+    """Optimize every Lottie file matching `patterns` and print before/after byte counts."""
+    total_before = total_after = 0
+    for pattern in patterns or SOURCE_PATTERNS:
+        for path in sorted(glob.glob(pattern)):
+            if path.endswith(MIN_SUFFIX):
+                continue
+            result = optimize_file(path, precision)
+            if result is None:
+                continue
+            before, after = result
+            total_before += before
+            total_after += after
+            print(f"{path}: {before:,} -> {after:,} bytes ({100 - 100 * after / before:.0f}% smaller)")
+    if total_before:
+        print(f"Total: {total_before:,} -> {total_after:,} bytes")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write minified variants of the Lottie animations.")
+    parser.add_argument("--precision", type=int, default=3, help="Decimals kept for float values")
+    args = parser.parse_args()
+    optimize_all(precision=args.precision)
+
+    # The minified files are new content: refresh the asset manifest
+    from assets import MANIFEST_PATH, build_manifest
+    build_manifest()
+    print(f"Updated {MANIFEST_PATH}")
@@ -1,7 +1,8 @@
 import streamlit as st
 import pandas as pd
+from instrumentation import section
 from streamlit_lottie import st_lottie
-import json
+from assets import load_lottie
 
 # Import the three modules for tasks, summary, and budget
 import phase1_tasks
@@ -10,12 +11,6 @@ import phase1_budget
 from phase1_budget import render_budget_tab
 
 
-def load_lottie_animation(filepath):
-    """Load a Lottie animation from a JSON file."""
-    with open(filepath, "r") as f:
-        return json.load(f)
-
-
 def render_phase1():
     # Title and Introduction
     st.title("Phase 1: Early & Doable Improvements")
@@ -34,7 +29,7 @@ def render_phase1():
     tab_plan, tab_tasks, tab_summary, tab_budget = st.tabs(["Plan", "Tasks", "Summary", "Budget"])
 
     # --- PLAN TAB ---
-    with tab_plan:
+    with tab_plan, section("Plan"):
         st.subheader("Plan Overview")
         st.write("""
         Below is a **category-by-category** comparison of the **current situation** 
@@ -45,12 +40,12 @@ def render_phase1():
         # Load Data
         df = pd.read_csv("amas_data.csv", sep=",")  # Adjust if file path differs
 
-        # Load Lottie animations
-        arrive_animation   = load_lottie_animation("input/arrive.json")
-        inventory_animation = load_lottie_animation("input/inventory.json")
-        store_animation    = load_lottie_animation("input/store.json")
-        order_animation    = load_lottie_animation("input/order.json")
-        postsell_animation = load_lottie_animation("input/postsell.json")
+        # Load Lottie animations (parsed once per process by the asset registry)
+        arrive_animation   = load_lottie("input/arrive.json")
+        inventory_animation = load_lottie("input/inventory.json")
+        store_animation    = load_lottie("input/store.json")
+        order_animation    = load_lottie("input/order.json")
+        postsell_animation = load_lottie("input/postsell.json")
 
         # Identify unique categories
         categories = df["Category"].unique()
@@ -114,7 +109,7 @@ def render_phase1():
         """)
 
     # --- TASKS TAB ---
-    with tab_tasks:
+    with tab_tasks, section("Tasks"):
         st.subheader("Phase 1 Tasks")
         st.write("""
         Below are the **Phase 1 tasks** from `amas_data.csv`, detailing who is responsible, 
@@ -123,7 +118,7 @@ def render_phase1():
         phase1_tasks.render_phase1_tasks_ui()
 
     # --- SUMMARY TAB ---
-    with tab_summary:
+    with tab_summary, section("Summary"):
         st.subheader("Phase 1 Summary")
         st.write("""
         Below is a **high-level summary** of Phase 1 activities, aggregated across 
@@ -132,7 +127,7 @@ def render_phase1():
         phase1_summary.render_phase1_summary()
 
     # --- BUDGET TAB ---
-    with tab_budget:
+    with tab_budget, section("Budget"):
         phase1_budget.render_budget_tab()
 
 
@@ -1,6 +1,7 @@
 import streamlit as st
 import sqlite3
 import pandas as pd
+from instrumentation import timed_read_sql
 
 
 def fetch_budget_table_names(conn):
@@ -16,7 +17,7 @@ def fetch_budget_table_names(conn):
 def fetch_budget_data(conn, table_name):
     """Fetch data from a specific budget table."""
     query = f"SELECT * FROM {table_name};"
-    return pd.read_sql_query(query, conn)
+    return timed_read_sql(query, conn, label=f"phase1_budget.fetch:{table_name}")
 
 
 def calculate_total_budget(conn, table_name):
@@ -29,7 +30,7 @@ def calculate_total_budget(conn, table_name):
 def fetch_task_names(conn):
     """Fetch the ID and name of tasks from the 'subtasks' table."""
     query = "SELECT id, name FROM subtasks;"
-    return pd.read_sql_query(query, conn)
+    return timed_read_sql(query, conn, label="phase1_budget.task_names")
 
 
 def render_budget_tab():
@@ -1,10 +1,9 @@
+import sqlite3
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-from subtasks import (
-    initialize_subtasks_database,
-    fetch_subtasks_from_db
-)
+from phase_plans import DB_PATH, load_phase_plan
+from schedule import add_dependency, load_dependencies, remove_dependency, schedule_analysis
+from workload import OVERLOAD_TASKS, staff_workload
+from timeline_charts import SCALABLE_ROWS, aggregate_timeline, cached_timeline, scalable_timeline
 
 def render_phase1_summary():
     """
@@ -13,46 +12,174 @@ def render_phase1_summary():
     st.title("Client Dashboard: Phase 1 Summary")
     st.subheader("Time Schedule and Task Overview")
 
-    # Initialize or connect to the database
-    conn = initialize_subtasks_database()
-
-    # Fetch existing tasks from the database
-    tasks = fetch_subtasks_from_db(conn)
+    # Typed Phase 1 plan (subtasks with datetime Start/End, float Budget), cached
+    tasks = load_phase_plan("phase1")
 
     if tasks.empty:
         st.write("No tasks available in the database.")
         return
 
-    # Prepare data for visualization
-    tasks['start_time'] = pd.to_datetime(tasks['start_time'])
-    tasks['deadline'] = pd.to_datetime(tasks['deadline'])
-
-    # Gantt chart visualization
-    fig = px.timeline(
-        tasks,
-        x_start="start_time",
-        x_end="deadline",
-        y="aspect",
-        color="progress",
-        hover_data=["person_involved", "name", "budget"],
-        title="Task Schedule and Progress",
-    )
-    fig.update_layout(
-        yaxis_title="Aspect",
+    m1, m2, m3 = st.columns(3)
+    m1.metric("Subtasks", len(tasks))
+    m2.metric("Total Budget", f"${tasks['Budget'].sum():,.2f}")
+    m3.metric("Average Progress", f"{tasks['Progress'].mean():.0f}%")
+
+    # Gantt chart visualization (rebuilt only when the subtasks change).
+    # Large plans open at category level; drill down to aspects and subtasks.
+    levels = ["Category", "Aspect", "Subtask"]
+    default_level = 0 if len(tasks) > SCALABLE_ROWS else 2
+    level = st.radio("Detail level", levels, index=default_level, horizontal=True)
+
+    selected = tasks
+    if level != "Category":
+        c1, c2 = st.columns(2)
+        categories = sorted(tasks["Category"].dropna().unique())
+        category = c1.selectbox("Category", ["All"] + categories)
+        if category != "All":
+            selected = selected[selected["Category"] == category]
+        if level == "Subtask":
+            aspects = sorted(selected["Aspect"].dropna().unique())
+            aspect = c2.selectbox("Aspect", ["All"] + aspects)
+            if aspect != "All":
+                selected = selected[selected["Aspect"] == aspect]
+
+    layout = dict(
         xaxis_title="Timeline",
         coloraxis_colorbar=dict(
             title="Progress (%)",
         ),
         margin=dict(l=20, r=20, t=40, b=20),
     )
+    if level == "Subtask":
+        fig = scalable_timeline(
+            "phase1.summary",
+            selected[["Start", "End", "Aspect", "Progress", "Person", "Task", "Budget"]],
+            y="Aspect",
+            color="Progress",
+            hover_data=["Person", "Task", "Budget"],
+            title="Task Schedule and Progress",
+            layout=dict(layout, yaxis_title="Aspect"),
+        )
+    else:
+        summary = aggregate_timeline(selected[["Start", "End", level, "Progress", "Budget"]], level)
+        fig = cached_timeline(
+            "phase1.summary",
+            summary,
+            x_start="Start",
+            x_end="End",
+            y=level,
+            color="Progress",
+            hover_data=["Subtasks", "Budget"],
+            title=f"Task Schedule and Progress by {level}",
+            layout=dict(layout, yaxis_title=level),
+        )
     st.plotly_chart(fig, use_container_width=True)
 
     # Detailed Task Table
     st.subheader("Detailed Task Information")
     st.dataframe(
-        tasks[["aspect", "start_time", "deadline", "person_involved", "progress"]],
+        selected[["Aspect", "Start", "End", "Person", "Progress"]],
         use_container_width=True,
     )
 
+    render_schedule_risk(tasks)
+    render_staff_workload()
+
+
+def render_schedule_risk(tasks):
+    """
+    Critical path, slack and projected finish of the subtasks, plus the
+    dependency editor that feeds them.
+    """
+    st.subheader("Schedule Risk")
+    try:
+        schedule, summary = schedule_analysis()
+    except ValueError as e:
+        st.error(f"Cannot analyse the schedule: {e}")
+        schedule, summary = None, None
+
+    if summary and summary["subtasks"]:
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("Planned Finish", f"{summary['planned_finish']:%Y-%m-%d}")
+        delay = (summary["projected_finish"] - summary["planned_finish"]).days
+        m2.metric("Projected Finish", f"{summary['projected_finish']:%Y-%m-%d}",
+                  delta=f"{delay:+d} days", delta_color="inverse")
+        m3.metric("Critical Subtasks", summary["critical"])
+        m4.metric("Projected Late", summary["late"])
+        if summary["unscheduled"]:
+            st.caption(f"{summary['unscheduled']} subtasks without start/deadline are not analysed.")
+
+        at_risk = schedule[schedule["Critical"] | (schedule["Projected Delay"] > 0)]
+        st.dataframe(
+            at_risk.sort_values(["Slack", "Projected Delay"], ascending=[True, False])[
+                ["id", "Task", "Aspect", "Progress", "Earliest Start", "Latest Start",
+                 "Slack", "Critical", "End", "Projected Finish", "Projected Delay"]
+            ],
+            use_container_width=True,
+        )
+    elif summary is not None:
+        st.write("No scheduled subtasks to analyse.")
+
+    with st.expander("Subtask Dependencies"):
+        conn = sqlite3.connect(DB_PATH)
+        try:
+            labels = {int(r.id): f"{r.id}: {r.Task}" for r in tasks.itertuples()}
+            edges = load_dependencies(conn)
+
+            c1, c2 = st.columns(2)
+            predecessor = c1.selectbox("Predecessor", list(labels), format_func=labels.get, key="dep_pred")
+            successor = c2.selectbox("Successor", list(labels), format_func=labels.get, key="dep_succ")
+            if st.button("Add Dependency"):
+                try:
+                    add_dependency(conn, predecessor, successor)
+                    st.success("Dependency added.")
+                    st.rerun()
+                except ValueError as e:
+                    st.error(str(e))
+
+            if edges.empty:
+                st.write("No dependencies defined; each subtask is scheduled on its own dates.")
+            for row in edges.itertuples(index=False):
+                d1, d2 = st.columns([4, 1])
+                d1.write(f"{labels.get(row.predecessor_id, row.predecessor_id)} → "
+                         f"{labels.get(row.successor_id, row.successor_id)}")
+                if d2.button("Remove", key=f"dep_rm_{row.predecessor_id}_{row.successor_id}"):
+                    remove_dependency(conn, row.predecessor_id, row.successor_id)
+                    st.rerun()
+        finally:
+            conn.close()
+
+
+def render_staff_workload():
+    """Concurrent subtasks per person per day, with overload windows."""
+    st.subheader("Staff Workload")
+    limit = st.number_input(
+        "Overloaded above (concurrent subtasks)", min_value=1, value=OVERLOAD_TASKS, step=1
+    )
+    persons, dates, counts, windows = staff_workload(int(limit))
+    if not persons:
+        st.write("No assignments with start and deadline dates.")
+        return
+
+    import plotly.express as px
+    fig = px.imshow(
+        counts,
+        x=dates,
+        y=persons,
+        aspect="auto",
+        color_continuous_scale="Reds",
+        labels=dict(x="Date", y="Person", color="Subtasks"),
+        title="Concurrent Subtasks per Person",
+    )
+    fig.update_layout(margin=dict(l=20, r=20, t=40, b=20))
+    st.plotly_chart(fig, use_container_width=True)
+
+    if windows.empty:
+        st.success("Nobody is overloaded.")
+    else:
+        st.warning(f"{windows['Person'].nunique()} people overloaded in {len(windows)} windows.")
+        st.dataframe(windows, use_container_width=True)
+
+
 if __name__ == "__main__":
     render_phase1_summary()
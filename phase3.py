@@ -1,133 +1,22 @@
 import streamlit as st
 import pandas as pd
-
-# ------------ Phase 3 Workstreams (Top-Level Budget) ------------
-# NOTE: These are the budgeted lines that sum to the base total (11,200).
-phase3_workstreams = [
-    {
-        "Task": "LLM Backend (AI Layer)",
-        "Start": "2025-10-11",
-        "End": "2025-11-30",
-        "Budget": 2300,
-        "Icon": "🤖",
-        "Details": """
-- Conversational AI for founders (insights, summaries, proactive alerts)
-- Connects to finance, supply, inventory, and HR data
-- Forms the intelligence core for Phase 3 automation
-        """
-    },
-    {
-        "Task": "Supplier Backend",
-        "Start": "2025-10-11",
-        "End": "2025-11-20",
-        "Budget": 2000,
-        "Icon": "🏬",
-        "Details": """
-- Supplier accounts, POs, invoices, delivery tracking
-- Tight integration with Automated Purchase Order logic
-        """
-    },
-    {
-        "Task": "Customer Backend",
-        "Start": "2025-11-15",
-        "End": "2025-12-20",
-        "Budget": 2000,
-        "Icon": "👥",
-        "Details": """
-- Customer profiles, loyalty/credit, purchase history
-- CRM foundation and personalization data source for the LLM
-        """
-    },
-    {
-        "Task": "Bakery Integration",
-        "Start": "2025-12-10",
-        "End": "2025-12-31",
-        "Budget": 1300,
-        "Icon": "🍞",
-        "Details": """
-- Ingredient usage, production, waste tracking, and sales syncing
-- Real-time linkage to inventory and supplier ordering
-        """
-    },
-    {
-        "Task": "Butchery Integration",
-        "Start": "2025-12-10",
-        "End": "2025-12-31",
-        "Budget": 1300,
-        "Icon": "🥩",
-        "Details": """
-- Batch tracking, yield, waste, costing, and sales syncing
-- Improves stock precision and profitability analytics
-        """
-    },
-    {
-        "Task": "Enhancements (Total)",
-        "Start": "2025-10-11",
-        "End": "2025-12-31",
-        "Budget": 2300,
-        "Icon": "⚙️",
-        "Details": """
-- Targeted upgrades across: Data Room, Cashier, Automated PO, HR Monitoring
-- See detailed sub-allocation in the Enhancements section
-        """
-    },
-]
-
-# ------------ Phase 3 Enhancements (Sub-allocation; already included in "Enhancements (Total)") ------------
-phase3_enhancements = [
-    {
-        "Task": "Data Room Enhancement",
-        "Start": "2025-10-11",
-        "End": "2025-11-10",
-        "Budget": 800,
-        "Icon": "📊",
-        "Details": """
-- Improve dashboards and metrics coverage
-- Double analytic depth across existing modules
-        """
-    },
-    {
-        "Task": "Enhanced Cashier System",
-        "Start": "2025-11-01",
-        "End": "2025-12-10",
-        "Budget": 700,
-        "Icon": "💳",
-        "Details": """
-- Founder/role-aware views: balances, credits, KPIs, alerts
-- Deeper analytics, anomaly checks, and permissions
-        """
-    },
-    {
-        "Task": "Automated Purchase Order Enhancement",
-        "Start": "2025-11-15",
-        "End": "2025-12-20",
-        "Budget": 500,
-        "Icon": "🧾",
-        "Details": """
-- Refine forecasting signals, reorder rules, and approval thresholds
-- Strengthen integration with Supplier/Inventory modules
-        """
-    },
-    {
-        "Task": "HR Monitoring Enhancement",
-        "Start": "2025-12-01",
-        "End": "2025-12-20",
-        "Budget": 300,
-        "Icon": "🧑‍💼",
-        "Details": """
-- Attendance, shift analytics, and productivity insights (monitoring only)
-- Cross-links with cashier and operations data
-        """
-    },
-]
-
-df = pd.DataFrame(phase3_workstreams)
-enh_df = pd.DataFrame(phase3_enhancements)
+from instrumentation import section
+from phase_plans import format_budget, format_date, load_phase_plan
+from timeline_charts import cached_timeline
 
 # ------------ Render App ------------
 def render_phase3():
     st.title("Phase 3: Intelligent Integration & Automation")
 
+    # Typed plan from the phase-plan store: top-level workstreams and the
+    # enhancement sub-allocation (already included in "Enhancements (Total)")
+    plan = load_phase_plan("phase3")
+    df = plan[plan["Kind"] == "workstream"].reset_index(drop=True)
+    enh_df = plan[plan["Kind"] == "enhancement"].reset_index(drop=True)
+    base_total = round(float(df["Budget"].sum()), 2)
+    contingency = round(base_total * 0.15, 2)
+    grand_total = round(base_total + contingency, 2)
+
     st.write("""
 This section outlines the **Phase 3** program for AMAS Hypermarket. Five tabs are available below:
 
@@ -143,7 +32,7 @@ This section outlines the **Phase 3** program for AMAS Hypermarket. Five tabs ar
     )
 
     # -------- PLAN TAB ---------
-    with tab_plan:
+    with tab_plan, section("Plan"):
         st.subheader("Plan Overview (Top-Level Workstreams)")
         for i, row in df.iterrows():
             # Alternating columns for a balanced layout
@@ -157,51 +46,46 @@ This section outlines the **Phase 3** program for AMAS Hypermarket. Five tabs ar
 
             with col_text:
                 st.markdown(f"### {row['Task']}")
-                st.markdown(f"**Timeline:** {row['Start']} to {row['End']}")
-                st.markdown(f"**Budget:** ${row['Budget']:,}")
+                st.markdown(f"**Timeline:** {format_date(row['Start'])} to {format_date(row['End'])}")
+                st.markdown(f"**Budget:** {format_budget(row['Budget'])}")
                 st.markdown(row['Details'])
             st.write("---")
 
         st.subheader("Enhancements — Sub-allocation (rolls up to 'Enhancements (Total)')")
         for _, row in enh_df.iterrows():
             with st.expander(f"{row['Icon']}  {row['Task']}"):
-                st.markdown(f"**Timeline:** {row['Start']} to {row['End']}")
-                st.markdown(f"**Budget (part of Enhancements Total):** ${row['Budget']:,}")
+                st.markdown(f"**Timeline:** {format_date(row['Start'])} to {format_date(row['End'])}")
+                st.markdown(f"**Budget (part of Enhancements Total):** {format_budget(row['Budget'])}")
                 st.markdown("**Details:**")
                 st.markdown(row["Details"])
 
-        # Totals (base + contingency)
-        base_total = sum(item['Budget'] for item in phase3_workstreams if isinstance(item['Budget'], int))
-        contingency = round(base_total * 0.15, 2)
-        grand_total = round(base_total + contingency, 2)
-
         st.success(f"""
-**Phase 3 Window:** 2025-10-11 → 2025-12-31  
+**Phase 3 Window:** {format_date(plan['Start'].min())} → {format_date(plan['End'].max())}  
 **Base subtotal:** ${base_total:,.2f}  
 **Contingency (15%):** ${contingency:,.2f}  
 **Grand total:** ${grand_total:,.2f}
         """)
 
     # -------- TASKS TAB ---------
-    with tab_tasks:
+    with tab_tasks, section("Tasks"):
         st.subheader("Phase 3 Tasks (Top-Level)")
         for _, row in df.iterrows():
             with st.expander(f"{row['Icon']}  {row['Task']}"):
-                st.markdown(f"**Timeline:** {row['Start']} to {row['End']}")
-                st.markdown(f"**Budget:** ${row['Budget']:,}")
+                st.markdown(f"**Timeline:** {format_date(row['Start'])} to {format_date(row['End'])}")
+                st.markdown(f"**Budget:** {format_budget(row['Budget'])}")
                 st.markdown("**Details:**")
                 st.markdown(row["Details"])
 
         st.subheader("Enhancements (Breakdown)")
         for _, row in enh_df.iterrows():
             with st.expander(f"{row['Icon']}  {row['Task']}"):
-                st.markdown(f"**Timeline:** {row['Start']} to {row['End']}")
-                st.markdown(f"**Budget (included in Enhancements Total):** ${row['Budget']:,}")
+                st.markdown(f"**Timeline:** {format_date(row['Start'])} to {format_date(row['End'])}")
+                st.markdown(f"**Budget (included in Enhancements Total):** {format_budget(row['Budget'])}")
                 st.markdown("**Details:**")
                 st.markdown(row["Details"])
 
     # -------- SUMMARY TAB ---------
-    with tab_summary:
+    with tab_summary, section("Summary"):
         st.subheader("Phase 3 Summary & Schedule")
 
         # Build a combined dataframe for a timeline view (with categories)
@@ -211,16 +95,14 @@ This section outlines the **Phase 3** program for AMAS Hypermarket. Five tabs ar
         enh_sum_df["Category"] = "Enhancement"
 
         summary_df = pd.concat([ws_df, enh_sum_df], ignore_index=True)
-        summary_df["Start"] = pd.to_datetime(summary_df["Start"])
-        summary_df["End"] = pd.to_datetime(summary_df["End"])
 
         try:
-            import plotly.express as px
-            fig = px.timeline(
-                summary_df, x_start="Start", x_end="End", y="Task", color="Category",
-                title="Phase 3 Schedule", labels={'Task': 'Task'}
+            fig = cached_timeline(
+                "phase3.summary", summary_df[["Task", "Start", "End", "Category"]],
+                x_start="Start", x_end="End", y="Task", color="Category",
+                title="Phase 3 Schedule", labels={'Task': 'Task'},
+                layout=dict(yaxis_title="Task", xaxis_title="Timeline", legend_title_text="Type"),
             )
-            fig.update_layout(yaxis_title="Task", xaxis_title="Timeline", legend_title_text="Type")
             st.plotly_chart(fig, use_container_width=True)
         except Exception:
             st.info("Install plotly for an interactive timeline summary.")
@@ -228,17 +110,13 @@ This section outlines the **Phase 3** program for AMAS Hypermarket. Five tabs ar
         st.dataframe(df[["Task", "Start", "End", "Budget"]], use_container_width=True)
 
     # -------- BUDGET TAB ---------
-    with tab_budget:
+    with tab_budget, section("Budget"):
         st.subheader("Phase 3 Budget (Top-Level)")
         st.dataframe(df[["Task", "Budget"]], use_container_width=True)
 
         st.markdown("### Enhancements — Sub-allocation (Included in 'Enhancements (Total)')")
         st.dataframe(enh_df[["Task", "Budget"]], use_container_width=True)
 
-        base_total = sum(item['Budget'] for item in phase3_workstreams if isinstance(item['Budget'], int))
-        contingency = round(base_total * 0.15, 2)
-        grand_total = round(base_total + contingency, 2)
-
         st.markdown(f"### **Base subtotal:** ${base_total:,.2f}")
         st.markdown(f"### **Contingency (15%):** ${contingency:,.2f}")
         st.success(f"### **Grand total:** ${grand_total:,.2f}")
@@ -246,7 +124,7 @@ This section outlines the **Phase 3** program for AMAS Hypermarket. Five tabs ar
         st.caption("Note: Enhancement sub-budgets are already included in the 'Enhancements (Total)' line to avoid double counting.")
 
     # -------- TEAM TAB ---------
-    with tab_team:
+    with tab_team, section("Human Resource"):
         st.subheader("Human Resource Assignments — Phase 3")
 
         team_data = [
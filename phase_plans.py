@@ -0,0 +1,363 @@
+import os
+import sqlite3
+import pandas as pd
+import streamlit as st
+from instrumentation import query_timer
+
+# ========================= PHASE-PLAN STORE =========================
+# One typed table in subtasks.db holds the Phase 2 and Phase 3 plans
+# (numeric budgets, ISO dates, phase keys). Phase 1 is read from `subtasks`
+# and exposed in the same shape, so every phase page and timeline works on
+# the same columns: Task, Start, End, Budget (float, NaN = pending), Kind.
+DB_PATH = "subtasks.db"
+
+PHASE_KEYS = ("phase1", "phase2", "phase3")
+
+
+# ========================= SEED DATA =========================
+# Inserted once, when a phase has no rows yet; edit the table afterwards.
+PHASE2_TASKS = [
+    {
+        "Task": "Operational Monitoring & Visualization Dashboard",
+        "Start": "2025-06-01",
+        "End": "2025-07-31",
+        "Budget": 3200,
+        "Lottie": "input/phase2/monitoring.json",
+        "Details": """
+- Real-Time Data Room (dashboard, inventory alerts, sales analysis)
+- D3 Visualizations (stacked bar, heatmap, bullet, sunburst, bubble charts)
+- Store Map Visualization (real-time inventory map, heatmap for sales/critical items)
+        """
+    },
+    {
+        "Task": "Security, Performance Testing & Kurdish Translation",
+        "Start": "2025-06-15",
+        "End": "2025-07-31",
+        "Budget": 2300,
+        "Lottie": "input/phase2/security.json",
+        "Details": """
+- Penetration testing, load & performance tests, pilot market test
+- Implement security enhancements
+- UI and documentation Kurdish localization and validation
+        """
+    },
+    {
+        "Task": "Data Collection for Machine Learning",
+        "Start": "2025-06-15",
+        "End": "2025-07-31",
+        "Budget": 1700,
+        "Lottie": "input/phase2/datacollection.json",
+        "Details": """
+- Internal/external data acquisition (sales, inventory, supplier, weather, economic, etc)
+- ML-optimized data preparation (forecasting, dynamic pricing, demand modeling)
+        """
+    },
+    {
+        "Task": "Financial & HR Automation",
+        "Start": "2025-07-01",
+        "End": "2025-07-31",
+        "Budget": 2800,
+        "Lottie": "input/phase2/Automation.json",
+        "Details": """
+- Automate supplier payments & invoice reconciliation
+- AI-enabled HR process automation (task analysis, pilot)
+- Define progressive automation milestones
+        """
+    },
+    {
+        "Task": "Training and Capacity Building",
+        "Start": "2025-07-01",
+        "End": "2025-07-31",
+        "Budget": 1200,
+        "Lottie": "input/phase2/helpdesk.json",
+        "Details": """
+- Staff & supplier system training (usage, security, D3 dashboards)
+- Supplier onboarding, continuous feedback
+- User manuals, videos, FAQs
+        """
+    },
+    {
+        "Task": "Native and Mobile Integration",
+        "Start": "2025-08-01",
+        "End": "2025-08-31",
+        "Budget": None,  # pending
+        "Lottie": "input/phase2/stock.json",
+        "Details": """
+- Stock Received Management (Native)
+- Stock Received (Mobile)
+- Price Operation (Native)
+- Return (Native)
+        """
+    },
+    {
+        "Task": "Servers & Infrastructure Setup",
+        "Start": "2025-08-01",
+        "End": "2025-08-31",
+        "Budget": None,  # pending
+        "Lottie": "input/phase2/server.json",
+        "Details": """
+- Global Server Setup
+- Cashier Server Analysis
+        """
+    },
+    {
+        "Task": "Migration & Installation",
+        "Start": "2025-08-01",
+        "End": "2025-08-31",
+        "Budget": None,  # pending
+        "Lottie": "input/phase2/migration.json",
+        "Details": """
+- Inventory Data Migration
+- Software Installation
+- Troubleshooting & Rollback Plan
+        """
+    },
+]
+
+# Phase 3 workstreams (top-level budget)
+# NOTE: These are the budgeted lines that sum to the base total (11,200).
+PHASE3_WORKSTREAMS = [
+    {
+        "Task": "LLM Backend (AI Layer)",
+        "Start": "2025-10-11",
+        "End": "2025-11-30",
+        "Budget": 2300,
+        "Icon": "🤖",
+        "Details": """
+- Conversational AI for founders (insights, summaries, proactive alerts)
+- Connects to finance, supply, inventory, and HR data
+- Forms the intelligence core for Phase 3 automation
+        """
+    },
+    {
+        "Task": "Supplier Backend",
+        "Start": "2025-10-11",
+        "End": "2025-11-20",
+        "Budget": 2000,
+        "Icon": "🏬",
+        "Details": """
+- Supplier accounts, POs, invoices, delivery tracking
+- Tight integration with Automated Purchase Order logic
+        """
+    },
+    {
+        "Task": "Customer Backend",
+        "Start": "2025-11-15",
+        "End": "2025-12-20",
+        "Budget": 2000,
+        "Icon": "👥",
+        "Details": """
+- Customer profiles, loyalty/credit, purchase history
+- CRM foundation and personalization data source for the LLM
+        """
+    },
+    {
+        "Task": "Bakery Integration",
+        "Start": "2025-12-10",
+        "End": "2025-12-31",
+        "Budget": 1300,
+        "Icon": "🍞",
+        "Details": """
+- Ingredient usage, production, waste tracking, and sales syncing
+- Real-time linkage to inventory and supplier ordering
+        """
+    },
+    {
+        "Task": "Butchery Integration",
+        "Start": "2025-12-10",
+        "End": "2025-12-31",
+        "Budget": 1300,
+        "Icon": "🥩",
+        "Details": """
+- Batch tracking, yield, waste, costing, and sales syncing
+- Improves stock precision and profitability analytics
+        """
+    },
+    {
+        "Task": "Enhancements (Total)",
+        "Start": "2025-10-11",
+        "End": "2025-12-31",
+        "Budget": 2300,
+        "Icon": "⚙️",
+        "Details": """
+- Targeted upgrades across: Data Room, Cashier, Automated PO, HR Monitoring
+- See detailed sub-allocation in the Enhancements section
+        """
+    },
+]
+
+# Phase 3 enhancements (sub-allocation; already included in "Enhancements (Total)")
+PHASE3_ENHANCEMENTS = [
+    {
+        "Task": "Data Room Enhancement",
+        "Start": "2025-10-11",
+        "End": "2025-11-10",
+        "Budget": 800,
+        "Icon": "📊",
+        "Details": """
+- Improve dashboards and metrics coverage
+- Double analytic depth across existing modules
+        """
+    },
+    {
+        "Task": "Enhanced Cashier System",
+        "Start": "2025-11-01",
+        "End": "2025-12-10",
+        "Budget": 700,
+        "Icon": "💳",
+        "Details": """
+- Founder/role-aware views: balances, credits, KPIs, alerts
+- Deeper analytics, anomaly checks, and permissions
+        """
+    },
+    {
+        "Task": "Automated Purchase Order Enhancement",
+        "Start": "2025-11-15",
+        "End": "2025-12-20",
+        "Budget": 500,
+        "Icon": "🧾",
+        "Details": """
+- Refine forecasting signals, reorder rules, and approval thresholds
+- Strengthen integration with Supplier/Inventory modules
+        """
+    },
+    {
+        "Task": "HR Monitoring Enhancement",
+        "Start": "2025-12-01",
+        "End": "2025-12-20",
+        "Budget": 300,
+        "Icon": "🧑‍💼",
+        "Details": """
+- Attendance, shift analytics, and productivity insights (monitoring only)
+- Cross-links with cashier and operations data
+        """
+    },
+]
+
+
+SEED_PLANS = {
+    "phase2": [("workstream", PHASE2_TASKS)],
+    "phase3": [("workstream", PHASE3_WORKSTREAMS), ("enhancement", PHASE3_ENHANCEMENTS)],
+}
+
+
+# ========================= DATABASE SETUP =========================
+def initialize_phase_plans(conn: sqlite3.Connection):
+    """Create the `phase_plans` table and seed any phase that has no rows yet."""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS phase_plans (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            phase TEXT NOT NULL,
+            kind TEXT NOT NULL DEFAULT 'workstream',
+            position INTEGER NOT NULL,
+            task TEXT NOT NULL,
+            start_date DATE,
+            end_date DATE,
+            budget REAL,
+            lottie TEXT,
+            icon TEXT,
+            details TEXT
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_phase_plans_phase ON phase_plans (phase, kind, position)")
+
+    for phase, groups in SEED_PLANS.items():
+        if conn.execute("SELECT 1 FROM phase_plans WHERE phase = ? LIMIT 1", (phase,)).fetchone():
+            continue
+        rows = [
+            (
+                phase, kind, position, item["Task"], item["Start"], item["End"],
+                item["Budget"], item.get("Lottie"), item.get("Icon"), item["Details"],
+            )
+            for kind, items in groups
+            for position, item in enumerate(items)
+        ]
+        conn.executemany(
+            """
+            INSERT INTO phase_plans
+            (phase, kind, position, task, start_date, end_date, budget, lottie, icon, details)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+    conn.commit()
+
+
+_initialized = set()
+
+
+def _ensure_initialized(db_path: str):
+    """Create/seed the table once per process, before the file stamp is taken."""
+    if db_path not in _initialized:
+        conn = sqlite3.connect(db_path)
+        try:
+            initialize_phase_plans(conn)
+        finally:
+            conn.close()
+        _initialized.add(db_path)
+
+
+def _db_stamp(db_path: str) -> int:
+    """File modification time; any committed write invalidates the cached plans."""
+    return os.stat(db_path).st_mtime_ns if os.path.exists(db_path) else 0
+
+
+# ========================= CACHED ACCESSOR =========================
+@st.cache_data(show_spinner=False)
+def _load_phase_plan(phase: str, db_path: str, stamp: int) -> pd.DataFrame:
+    conn = sqlite3.connect(db_path)
+    try:
+        if phase == "phase1":
+            query = """
+                SELECT
+                    name AS Task, start_time AS Start, deadline AS End, budget AS Budget,
+                    'subtask' AS Kind, category AS Category, aspect AS Aspect,
+                    person_involved AS Person, progress AS Progress, id
+                FROM subtasks
+                ORDER BY id
+            """
+            params = ()
+        else:
+            query = """
+                SELECT
+                    task AS Task, start_date AS Start, end_date AS End, budget AS Budget,
+                    kind AS Kind, lottie AS Lottie, icon AS Icon, details AS Details
+                FROM phase_plans
+                WHERE phase = ?
+                ORDER BY kind DESC, position
+            """
+            params = (phase,)
+        with query_timer(f"phase_plans.load:{phase}") as event:
+            df = pd.read_sql_query(query, conn, params=params)
+            event["rows"] = len(df)
+    finally:
+        conn.close()
+
+    df["Start"] = pd.to_datetime(df["Start"], errors="coerce")
+    df["End"] = pd.to_datetime(df["End"], errors="coerce")
+    df["Budget"] = pd.to_numeric(df["Budget"], errors="coerce").astype("float64")
+    return df
+
+
+def load_phase_plan(phase: str, db_path: str = DB_PATH) -> pd.DataFrame:
+    """
+    Return the typed plan of a phase ('phase1', 'phase2' or 'phase3').
+    Parsed once and cached until subtasks.db changes.
+    """
+    if phase not in PHASE_KEYS:
+        raise ValueError(f"Unknown phase '{phase}'")
+    if phase != "phase1":
+        _ensure_initialized(db_path)
+    return _load_phase_plan(phase, db_path, _db_stamp(db_path))
+
+
+def format_budget(value) -> str:
+    """Budget for display: '$3,200' or 'TBD' when pending."""
+    return "TBD" if pd.isna(value) else f"${value:,.0f}"
+
+
+def format_date(value) -> str:
+    """Date for display: '2025-03-01' or 'TBD' when not scheduled (NaT)."""
+    return "TBD" if pd.isna(value) else f"{value:%Y-%m-%d}"
@@ -0,0 +1,54 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from instrumentation import attributed_to, current_page, timed_read_sql
+
+# ========================= PARALLEL READS =========================
+# Independent SELECTs of a page are dispatched together on a shared thread pool,
+# each on its own connection, so the page waits for the slowest query instead of
+# the sum of all of them. The pool is process-wide: MAX_PARALLEL_QUERIES caps the
+# concurrent queries of all sessions together (and sizes the MySQL connection pool).
+MAX_PARALLEL_QUERIES = 4
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor(max_workers: int = None) -> ThreadPoolExecutor:
+    """The shared query thread pool (recreated if the cap changes)."""
+    global _executor
+    max_workers = max(int(max_workers or MAX_PARALLEL_QUERIES), 1)
+    with _executor_lock:
+        if _executor is None or _executor._max_workers != max_workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="query")
+        return _executor
+
+
+def _run_query(connect, query, params, label, page):
+    with attributed_to(page):
+        conn = connect()
+        try:
+            return timed_read_sql(query, conn, params=params, label=label)
+        finally:
+            conn.close()
+
+
+def submit_queries(queries: dict, connect, max_workers: int = None) -> dict:
+    """
+    Start the read queries `queries` (name -> (query, params, label)) concurrently,
+    each on a connection from `connect()` that is closed (returned to its pool)
+    afterwards. Returns name -> Future; .result() gives the DataFrame or re-raises
+    the query's error. Identical queries share one execution.
+    """
+    executor = get_executor(max_workers)
+    page = current_page()
+    started = {}
+    futures = {}
+    for name, (query, params, label) in queries.items():
+        key = (query, tuple(params or ()))
+        if key not in started:
+            started[key] = executor.submit(_run_query, connect, query, params, label, page)
+        futures[name] = started[key]
+    return futures
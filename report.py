@@ -1,4 +1,6 @@
+import os
 import streamlit as st
+from assets import image_derivative
 
 def render_report():
     # Display the title
@@ -9,7 +11,7 @@ def render_report():
     st.markdown("### Report Cover")
 
     # Display the report cover image with reduced size
-    st.image("input/report.jpg", caption="AMAS Hypermarket - Data-Driven Strategy for 2025", width=400)
+    st.image(image_derivative("input/report.jpg"), caption="AMAS Hypermarket - Data-Driven Strategy for 2025", width=400)
 
     # Add a description below the cover
     st.markdown(
@@ -27,3 +29,47 @@ def render_report():
         [📄 **View Full Report**](https://docs.google.com/document/d/1RmrlmdwNbBSVWaDItfdf65bSJTIrlg29o56KmKywdto/edit?usp=sharing)
         """
     )
+
+    render_report_builder()
+
+
+def render_report_builder():
+    """
+    Consolidated HTML/PDF report built in the background from the phase plans,
+    subtasks, budget lines and finance data (see report_engine.py).
+    """
+    import report_engine
+    from jobs import submit
+    from jobs_ui import render_job_progress
+
+    st.markdown("### Generated Report")
+    st.caption(
+        "Built from the live phase plans, subtasks and finance data. "
+        "Sections whose data did not change are reused from the last build."
+    )
+
+    if st.button("Generate Report"):
+        st.session_state["report_job"] = submit(
+            "report.build", {"pdf": True}, dedupe_key="report.build"
+        )
+
+    if "report_job" in st.session_state:
+        render_job_progress(st.session_state["report_job"], key="report_build")
+
+    meta = report_engine.last_report()
+    if not meta or not os.path.exists(meta["html"]):
+        st.info("No report generated yet.")
+        return
+
+    st.write(
+        f"Last built **{meta['generated']}** — re-rendered: {', '.join(meta['rendered']) or 'none'}; "
+        f"reused: {', '.join(meta['reused']) or 'none'}."
+    )
+    c1, c2 = st.columns(2)
+    with open(meta["html"], "rb") as f:
+        c1.download_button("⬇️ Download HTML", data=f, file_name="amas-report.html", mime="text/html")
+    if meta.get("pdf") and os.path.exists(meta["pdf"]):
+        with open(meta["pdf"], "rb") as f:
+            c2.download_button("⬇️ Download PDF", data=f, file_name="amas-report.pdf", mime="application/pdf")
+    elif meta.get("pdf_error"):
+        c2.caption(meta["pdf_error"])
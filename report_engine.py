@@ -0,0 +1,332 @@
+import datetime
+import hashlib
+import html
+import json
+import os
+from string import Template
+
+import pandas as pd
+
+# ========================= REPORT ENGINE =========================
+# Builds the consolidated strategy report (HTML, plus PDF when WeasyPrint is
+# installed) from the phase plans, subtasks, budget lines and finance data.
+#
+# Each section is rendered from its own template and cached on disk under the
+# hash of its template and input data, so a new transaction only re-renders
+# the finance sections. Builds run as a "report.build" background job (jobs.py).
+REPORT_DIR = os.path.join(".cache", "report")
+SECTION_DIR = os.path.join(REPORT_DIR, "sections")
+HTML_PATH = os.path.join(REPORT_DIR, "amas-report.html")
+PDF_PATH = os.path.join(REPORT_DIR, "amas-report.pdf")
+META_PATH = os.path.join(REPORT_DIR, "amas-report.json")
+
+SECTION_TEMPLATE = Template("""
+<section id="$name">
+  <h2>$title</h2>
+  $summary
+  $body
+</section>
+""")
+
+DOCUMENT_TEMPLATE = Template("""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>$title</title>
+<style>
+  body { font-family: Helvetica, Arial, sans-serif; margin: 2em; color: #222; }
+  h1 { border-bottom: 3px solid #2c7be5; padding-bottom: .3em; }
+  h2 { color: #2c7be5; margin-top: 2em; page-break-after: avoid; }
+  table { border-collapse: collapse; width: 100%; font-size: 10pt; margin: .5em 0 1em; }
+  th, td { border: 1px solid #ddd; padding: 4px 6px; text-align: left; vertical-align: top; }
+  th { background: #f3f6fb; }
+  .metrics { display: flex; gap: 2em; margin: .5em 0; }
+  .metric b { display: block; font-size: 14pt; }
+  .note { color: #777; font-style: italic; }
+</style>
+</head>
+<body>
+<h1>$title</h1>
+<p class="note">Generated $generated</p>
+$sections
+</body>
+</html>
+""")
+
+
+# ========================= HTML HELPERS =========================
+def table_html(df: pd.DataFrame) -> str:
+    if df is None or df.empty:
+        return '<p class="note">No data.</p>'
+    return df.to_html(index=False, border=0, na_rep="", escape=True)
+
+
+def metrics_html(metrics: dict) -> str:
+    items = "".join(
+        f'<div class="metric">{html.escape(str(k))}<b>{html.escape(str(v))}</b></div>'
+        for k, v in metrics.items()
+    )
+    return f'<div class="metrics">{items}</div>'
+
+
+def money(x) -> str:
+    try:
+        return f"${float(x):,.2f}"
+    except (TypeError, ValueError):
+        return "TBD"
+
+
+def _dates(df: pd.DataFrame, cols) -> pd.DataFrame:
+    df = df.copy()
+    for col in cols:
+        if col in df:
+            df[col] = pd.to_datetime(df[col], errors="coerce").dt.strftime("%Y-%m-%d")
+    return df
+
+
+# ========================= SECTION DATA =========================
+# Each loader returns (summary metrics dict, list of DataFrames) for its section.
+def _phase_data(phase: str):
+    from phase_plans import load_phase_plan
+
+    plan = load_phase_plan(phase)
+    if phase == "phase1":
+        table = plan[["Category", "Aspect", "Task", "Person", "Start", "End", "Budget", "Progress"]]
+    else:
+        table = plan[["Kind", "Task", "Start", "End", "Budget"]]
+    table = _dates(table, ["Start", "End"])
+    table["Budget"] = table["Budget"].map(money)
+    metrics = {
+        "Items": len(plan),
+        "Budget": money(plan["Budget"].sum()),
+        "From": f"{plan['Start'].min():%Y-%m-%d}" if plan["Start"].notna().any() else "-",
+        "To": f"{plan['End'].max():%Y-%m-%d}" if plan["End"].notna().any() else "-",
+    }
+    return metrics, [table]
+
+
+def _schedule_data():
+    from schedule import schedule_analysis
+    from workload import staff_workload
+
+    schedule, summary = schedule_analysis()
+    metrics = {}
+    risk = pd.DataFrame()
+    if summary.get("subtasks"):
+        metrics = {
+            "Planned finish": f"{summary['planned_finish']:%Y-%m-%d}",
+            "Projected finish": f"{summary['projected_finish']:%Y-%m-%d}",
+            "Critical subtasks": summary["critical"],
+            "Projected late": summary["late"],
+        }
+        risk = schedule[schedule["Critical"] | (schedule["Projected Delay"] > 0)][
+            ["Task", "Aspect", "Progress", "End", "Projected Finish", "Projected Delay", "Slack"]
+        ]
+    _, _, _, windows = staff_workload()
+    return metrics, [_dates(risk, ["End", "Projected Finish"]), _dates(windows, ["From", "To"])]
+
+
+def _budget_lines_data(conn):
+    from instrumentation import timed_read_sql
+
+    lines = timed_read_sql(
+        """
+        SELECT
+            b.budget_line AS phase,
+            COALESCE(SUM(b.budget_usd), 0) AS budget,
+            COALESCE(SUM(x.spent), 0) AS spent
+        FROM budgets b
+        LEFT JOIN (
+            SELECT budget_id, SUM(amount_usd) AS spent
+            FROM transactions
+            GROUP BY budget_id
+        ) x ON x.budget_id = b.budget_id
+        GROUP BY b.budget_line
+        ORDER BY b.budget_line
+        """,
+        conn,
+        label="report.budget_lines",
+    )
+    lines["remaining"] = lines["budget"] - lines["spent"]
+    metrics = {
+        "Budget": money(lines["budget"].sum()),
+        "Spent": money(lines["spent"].sum()),
+        "Remaining": money(lines["remaining"].sum()),
+    }
+    for col in ["budget", "spent", "remaining"]:
+        lines[col] = lines[col].map(money)
+    return metrics, [lines]
+
+
+def _finance_data(conn):
+    from forecast import forecast_budgets, forecast_by_line
+    from instrumentation import timed_read_sql
+
+    fc = forecast_budgets(conn)
+    by_line = forecast_by_line(fc)[["budget_line", "budget_usd", "spent", "projected_spend", "projected_overrun"]]
+    overruns = fc[fc["overrun"]][["budget_line", "task", "end_date", "budget_usd", "spent", "projected_spend", "overrun_date"]]
+    recent = timed_read_sql(
+        """
+        SELECT t.transaction_date, b.budget_line, t.description, t.amount_usd
+        FROM transactions t
+        JOIN budgets b ON b.budget_id = t.budget_id
+        ORDER BY t.transaction_date DESC, t.transaction_id DESC
+        LIMIT 15
+        """,
+        conn,
+        label="report.recent_transactions",
+    )
+    metrics = {
+        "Projected spend": money(fc["projected_spend"].sum()),
+        "Items projected to overrun": int(fc["overrun"].sum()),
+    }
+    tables = [by_line, _dates(overruns, ["end_date", "overrun_date"]), _dates(recent, ["transaction_date"])]
+    for table in tables:
+        for col in ["budget_usd", "spent", "projected_spend", "projected_overrun", "amount_usd"]:
+            if col in table:
+                table[col] = table[col].map(money)
+    return metrics, tables
+
+
+# name -> (title, loader, needs finance connection, captions of the section's tables)
+SECTIONS = {
+    "phase1": ("Phase 1 — Subtasks", lambda conn: _phase_data("phase1"), False, ["Subtasks"]),
+    "schedule": ("Phase 1 — Schedule Risk & Workload", lambda conn: _schedule_data(), False,
+                 ["Critical or late subtasks", "Staff overload windows"]),
+    "phase2": ("Phase 2 — Plan", lambda conn: _phase_data("phase2"), False, ["Tasks"]),
+    "phase3": ("Phase 3 — Plan", lambda conn: _phase_data("phase3"), False, ["Workstreams & enhancements"]),
+    "budget_lines": ("Budget Lines", _budget_lines_data, True, ["Budget vs. spent by phase"]),
+    "finance": ("Finance Snapshot & Forecast", _finance_data, True,
+                ["Forecast by budget line", "Items projected to overrun", "Recent transactions"]),
+}
+
+
+# ========================= RENDERING =========================
+def section_hash(name: str, metrics: dict, tables: list) -> str:
+    """Hash of a section's template and input data; its rendered HTML is cached under it."""
+    h = hashlib.sha256(name.encode())
+    h.update(SECTION_TEMPLATE.template.encode())
+    h.update(json.dumps(metrics, sort_keys=True, default=str).encode())
+    for table in tables:
+        h.update(table.to_json(orient="split", date_format="iso", default_handler=str).encode())
+    return h.hexdigest()[:24]
+
+
+def render_section(name: str, metrics: dict, tables: list):
+    """Return (html, reused) for one section, rendering only if its inputs changed."""
+    title, _, _, captions = SECTIONS[name]
+    path = os.path.join(SECTION_DIR, f"{name}-{section_hash(name, metrics, tables)}.html")
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read(), True
+
+    body = "".join(
+        f"<h3>{html.escape(caption)}</h3>{table_html(table)}" for caption, table in zip(captions, tables)
+    )
+    rendered = SECTION_TEMPLATE.substitute(
+        name=name, title=html.escape(title),
+        summary=metrics_html(metrics) if metrics else "", body=body,
+    )
+    os.makedirs(SECTION_DIR, exist_ok=True)
+    # Drop this section's older renders; only the current one is kept
+    for old in os.listdir(SECTION_DIR):
+        if old.startswith(f"{name}-"):
+            os.remove(os.path.join(SECTION_DIR, old))
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(rendered)
+    os.replace(tmp, path)
+    return rendered, False
+
+
+def _unavailable(name: str, error: Exception) -> str:
+    title = SECTIONS[name][0]
+    return SECTION_TEMPLATE.substitute(
+        name=name, title=html.escape(title), summary="",
+        body=f'<p class="note">Data unavailable: {html.escape(str(error))}</p>',
+    )
+
+
+def build_report(finance_conn=None, pdf: bool = True, progress=None) -> dict:
+    """
+    Build the report and write it to HTML_PATH (and PDF_PATH when possible).
+    `finance_conn` is a MySQL connection for the finance sections (opened from
+    st.secrets when omitted). `progress(fraction, message)` is called per section.
+    """
+    progress = progress or (lambda fraction, message=None: None)
+    rendered, reused, parts = [], [], []
+
+    conn, own_conn, conn_error = finance_conn, False, None
+    if conn is None:
+        try:
+            from finance import get_connection
+            conn, own_conn = get_connection(), True
+        except Exception as e:
+            conn, conn_error = None, e
+
+    try:
+        for i, (name, (_, loader, needs_finance, _)) in enumerate(SECTIONS.items()):
+            progress(0.05 + 0.8 * i / len(SECTIONS), f"Section: {SECTIONS[name][0]}")
+            if needs_finance and conn is None:
+                parts.append(_unavailable(name, conn_error))
+                continue
+            try:
+                metrics, tables = loader(conn)
+            except Exception as e:
+                parts.append(_unavailable(name, e))
+                continue
+            section_html, was_cached = render_section(name, metrics, tables)
+            (reused if was_cached else rendered).append(name)
+            parts.append(section_html)
+    finally:
+        if own_conn:
+            conn.close()
+
+    progress(0.9, "Assembling document")
+    generated = datetime.datetime.now()
+    document = DOCUMENT_TEMPLATE.substitute(
+        title="AMAS Data-Driven Strategy Report",
+        generated=f"{generated:%Y-%m-%d %H:%M}",
+        sections="\n".join(parts),
+    )
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    with open(HTML_PATH, "w", encoding="utf-8") as f:
+        f.write(document)
+
+    pdf_path, pdf_error = None, None
+    if pdf:
+        progress(0.95, "Rendering PDF")
+        try:
+            from weasyprint import HTML
+            HTML(string=document).write_pdf(PDF_PATH)
+            pdf_path = PDF_PATH
+        except ImportError:
+            pdf_error = "PDF output needs WeasyPrint (pip install weasyprint)."
+        except Exception as e:
+            pdf_error = f"PDF rendering failed: {e}"
+
+    meta = {
+        "generated": generated.isoformat(timespec="seconds"),
+        "html": HTML_PATH,
+        "pdf": pdf_path,
+        "pdf_error": pdf_error,
+        "rendered": rendered,
+        "reused": reused,
+    }
+    with open(META_PATH, "w") as f:
+        json.dump(meta, f, indent=1)
+    return meta
+
+
+def last_report() -> dict:
+    """Metadata of the last built report (None if never built)."""
+    try:
+        with open(META_PATH, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def report_build_job(job, pdf: bool = True):
+    """Background job ("report.build")."""
+    return build_report(pdf=pdf, progress=job.progress)
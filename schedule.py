@@ -0,0 +1,238 @@
+import sqlite3
+from collections import deque
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from instrumentation import query_timer
+from phase_plans import DB_PATH, _db_stamp, load_phase_plan
+
+# ========================= SCHEDULE ENGINE =========================
+# Critical-path analysis over the Phase 1 subtasks. Dependencies are optional:
+# without any, every subtask is its own chain and only its planned dates count.
+# All values are in days; analysis runs in O(V + E) over the task graph.
+DEPENDENCY_TABLE = "subtask_dependencies"
+
+# Slack (days) at or below which a subtask is on the critical path
+CRITICAL_SLACK = 1e-6
+
+# Extrapolation from little progress is noisy: a started subtask is projected
+# to take at most this multiple of its planned duration (plus any time already elapsed)
+MAX_STRETCH = 5.0
+
+# Dates further than this from the earliest start are clamped (pandas' datetime range is finite)
+HORIZON_DAYS = 36500
+
+
+# ========================= DEPENDENCY TABLE =========================
+def ensure_dependency_table(conn):
+    """Create the (predecessor, successor) dependency table if it does not exist."""
+    conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {DEPENDENCY_TABLE} (
+            predecessor_id INTEGER NOT NULL,
+            successor_id INTEGER NOT NULL,
+            PRIMARY KEY (predecessor_id, successor_id)
+        )
+        """
+    )
+    conn.commit()
+
+
+def load_dependencies(conn) -> pd.DataFrame:
+    """All dependency edges as a DataFrame (predecessor_id, successor_id)."""
+    ensure_dependency_table(conn)
+    with query_timer("schedule.dependencies") as event:
+        edges = pd.read_sql_query(
+            f"SELECT predecessor_id, successor_id FROM {DEPENDENCY_TABLE}", conn
+        )
+        event["rows"] = len(edges)
+    return edges
+
+
+def add_dependency(conn, predecessor_id: int, successor_id: int):
+    """
+    Record that `successor_id` cannot start before `predecessor_id` finishes.
+    Raises ValueError for self-dependencies and edges that would close a cycle.
+    """
+    if predecessor_id == successor_id:
+        raise ValueError("A subtask cannot depend on itself.")
+    edges = load_dependencies(conn)
+    succs = {}
+    for p, s in edges.itertuples(index=False):
+        succs.setdefault(p, []).append(s)
+
+    # The new edge closes a cycle if the predecessor is reachable from the successor
+    seen, pending = set(), [successor_id]
+    while pending:
+        node = pending.pop()
+        if node == predecessor_id:
+            raise ValueError(f"Subtask {successor_id} already leads to subtask {predecessor_id}.")
+        if node not in seen:
+            seen.add(node)
+            pending.extend(succs.get(node, []))
+
+    conn.execute(
+        f"INSERT OR IGNORE INTO {DEPENDENCY_TABLE} (predecessor_id, successor_id) VALUES (?, ?)",
+        (predecessor_id, successor_id),
+    )
+    conn.commit()
+
+
+def remove_dependency(conn, predecessor_id: int, successor_id: int):
+    """Delete one dependency edge."""
+    ensure_dependency_table(conn)
+    conn.execute(
+        f"DELETE FROM {DEPENDENCY_TABLE} WHERE predecessor_id = ? AND successor_id = ?",
+        (predecessor_id, successor_id),
+    )
+    conn.commit()
+
+
+# ========================= ANALYSIS =========================
+def topological_order(n: int, succs) -> list:
+    """Kahn's algorithm over node indexes 0..n-1. Raises ValueError on a cycle."""
+    indegree = [0] * n
+    for targets in succs:
+        for v in targets:
+            indegree[v] += 1
+    queue = deque(i for i in range(n) if indegree[i] == 0)
+    order = []
+    while queue:
+        u = queue.popleft()
+        order.append(u)
+        for v in succs[u]:
+            indegree[v] -= 1
+            if indegree[v] == 0:
+                queue.append(v)
+    if len(order) != n:
+        raise ValueError("Subtask dependencies contain a cycle.")
+    return order
+
+
+def projected_durations(start, duration, progress, today: float):
+    """
+    Expected duration (days) of each subtask from its progress so far:
+    started work is extrapolated at the observed rate, finished work keeps its plan.
+    """
+    elapsed = today - start
+    fraction = np.clip(progress / 100.0, 0.0, 1.0)
+    started = (elapsed > 0) & (fraction > 0) & (fraction < 1)
+    projected = duration.copy()
+    projected[started] = np.minimum(
+        elapsed[started] / fraction[started],
+        np.maximum(elapsed[started], duration[started] * MAX_STRETCH),
+    )
+    return projected
+
+
+def analyze_schedule(tasks: pd.DataFrame, edges: pd.DataFrame, today=None):
+    """
+    Critical-path analysis of `tasks` (id, Task, Start, End, Progress) under
+    `edges` (predecessor_id, successor_id). Returns (per-subtask frame, summary dict).
+    Subtasks without both dates are left out and counted in the summary.
+    """
+    today = pd.Timestamp(today or date.today())
+    scheduled = tasks.dropna(subset=["Start", "End"]).reset_index(drop=True)
+    n = len(scheduled)
+    summary = {"subtasks": n, "unscheduled": len(tasks) - n, "dependencies": 0}
+    if n == 0:
+        return scheduled, summary
+
+    # Days since the earliest planned start
+    origin = scheduled["Start"].min()
+    day = pd.Timedelta(days=1)
+    start = ((scheduled["Start"] - origin) / day).to_numpy(dtype=float)
+    duration = np.maximum(((scheduled["End"] - scheduled["Start"]) / day).to_numpy(dtype=float), 0.0)
+    progress = pd.to_numeric(scheduled["Progress"], errors="coerce").fillna(0).to_numpy(dtype=float)
+    now = (today - origin) / day
+
+    index = {task_id: i for i, task_id in enumerate(scheduled["id"])}
+    succs = [[] for _ in range(n)]
+    for p, s in edges.itertuples(index=False):
+        if p in index and s in index:
+            succs[index[p]].append(index[s])
+            summary["dependencies"] += 1
+    order = topological_order(n, succs)
+
+    # Forward pass: planned (earliest) and projected schedules
+    es = start.copy()
+    ef = np.empty(n)
+    proj_duration = projected_durations(start, duration, progress, now)
+    proj_start = start.copy()
+    proj_finish = np.empty(n)
+    for u in order:
+        ef[u] = es[u] + duration[u]
+        proj_finish[u] = proj_start[u] + proj_duration[u]
+        if progress[u] < 100:
+            proj_finish[u] = max(proj_finish[u], now)
+        for v in succs[u]:
+            es[v] = max(es[v], ef[u])
+            proj_start[v] = max(proj_start[v], proj_finish[u])
+
+    # Backward pass: latest finish without moving the project finish
+    finish = ef.max()
+    lf = np.full(n, finish)
+    for u in reversed(order):
+        for v in succs[u]:
+            lf[u] = min(lf[u], lf[v] - duration[v])
+    ls = lf - duration
+    slack = ls - es
+
+    def as_date(values):
+        return origin + pd.to_timedelta(np.clip(values, -HORIZON_DAYS, HORIZON_DAYS), unit="D")
+
+    result = scheduled[["id", "Task", "Aspect", "Start", "End", "Progress"]].copy()
+    result["Duration"] = duration.round(1)
+    result["Earliest Start"] = as_date(es)
+    result["Earliest Finish"] = as_date(ef)
+    result["Latest Start"] = as_date(ls)
+    result["Latest Finish"] = as_date(lf)
+    result["Slack"] = slack.round(1)
+    result["Critical"] = slack <= CRITICAL_SLACK
+    result["Projected Finish"] = as_date(proj_finish).round("D")
+    result["Projected Delay"] = ((result["Projected Finish"] - result["End"]) / day).round(1)
+
+    summary.update({
+        "planned_finish": as_date(finish),
+        "projected_finish": as_date(proj_finish.max()).round("D"),
+        "critical": int(result["Critical"].sum()),
+        "late": int((result["Projected Delay"] > 0).sum()),
+    })
+    return result, summary
+
+
+# ========================= CACHED ACCESSOR =========================
+_initialized = set()
+
+
+def _ensure_initialized(db_path: str):
+    """Create the dependency table once per process, before the file stamp is taken."""
+    if db_path not in _initialized:
+        conn = sqlite3.connect(db_path)
+        try:
+            ensure_dependency_table(conn)
+        finally:
+            conn.close()
+        _initialized.add(db_path)
+
+
+@st.cache_data(show_spinner=False)
+def _schedule_analysis(db_path: str, stamp: int, today: str):
+    conn = sqlite3.connect(db_path)
+    try:
+        edges = load_dependencies(conn)
+    finally:
+        conn.close()
+    return analyze_schedule(load_phase_plan("phase1", db_path), edges, today)
+
+
+def schedule_analysis(db_path: str = DB_PATH, today=None):
+    """
+    Critical path, slack and projected finish of the Phase 1 subtasks.
+    Cached until subtasks.db changes (or the day rolls over).
+    """
+    today = str(pd.Timestamp(today or date.today()).date())
+    _ensure_initialized(db_path)
+    return _schedule_analysis(db_path, _db_stamp(db_path), today)
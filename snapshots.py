@@ -0,0 +1,284 @@
+import datetime
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+
+import pandas as pd
+from finance_replica import row_checksum
+from instrumentation import timed_read_sql
+
+# ========================= COLUMNAR SNAPSHOTS =========================
+# Exports the finance and planning tables to Parquet for analysts and dashboards:
+#
+#   snapshots/
+#     manifest.json
+#     budgets/part-<hash>.parquet
+#     budget_lines/part-<hash>.parquet
+#     subtasks/part-<hash>.parquet
+#     phases/part-<hash>.parquet
+#     transactions/month=2025-03/part-<hash>.parquet
+#
+# Run on a schedule (e.g. cron: `0 2 * * * cd /app && python snapshots.py`) or
+# queue a "snapshot.run" job. Each run only writes partitions whose source rows
+# changed since the manifest was written (per month: row count and a checksum of
+# every column); everything else is left in place. Month partitions whose rows
+# are all gone are removed.
+# Read a table back with load_snapshot("transactions").
+SNAPSHOT_DIR = "snapshots"
+MANIFEST_NAME = "manifest.json"
+SUBTASKS_DB = "subtasks.db"
+
+# Tables of subtasks.db copied whole (skipped when missing)
+SQLITE_TABLES = ["subtasks", "phases"]
+
+
+# ========================= MANIFEST =========================
+def manifest_path(root: str = SNAPSHOT_DIR) -> str:
+    return os.path.join(root, MANIFEST_NAME)
+
+
+def load_manifest(root: str = SNAPSHOT_DIR) -> dict:
+    """The snapshot manifest (empty if no snapshot was taken yet)."""
+    try:
+        with open(manifest_path(root), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"version": 1, "tables": {}, "runs": []}
+
+
+def _save_manifest(manifest: dict, root: str):
+    path = manifest_path(root)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True, default=str)
+    os.replace(tmp, path)
+
+
+# ========================= WRITING =========================
+def frame_signature(df: pd.DataFrame) -> str:
+    """Content hash of a frame (values, columns and dtypes)."""
+    h = hashlib.sha256()
+    h.update(json.dumps([f"{c}:{t}" for c, t in df.dtypes.items()]).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return h.hexdigest()[:24]
+
+
+def write_partition(df: pd.DataFrame, directory: str, signature: str) -> str:
+    """
+    Write `df` as the only Parquet file of `directory` (atomically, replacing an
+    older version of the partition). Returns the file path.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"part-{signature}.parquet")
+    tmp = f"{path}.{os.getpid()}.tmp"
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp, compression="zstd")
+    os.replace(tmp, path)
+    for name in os.listdir(directory):
+        if name.endswith(".parquet") and os.path.join(directory, name) != path:
+            os.remove(os.path.join(directory, name))
+    return path
+
+
+def _partition_names(manifest: dict) -> set:
+    """Names of all partitions in the manifest, as listed in a run's "written"."""
+    return {
+        table if key == "all" else f"{table}/month={key}"
+        for table, entry in manifest["tables"].items() for key in entry["partitions"]
+    }
+
+
+def _record(manifest: dict, table: str, key: str, entry: dict):
+    manifest["tables"].setdefault(table, {"partitions": {}})["partitions"][key] = entry
+
+
+def snapshot_frame(manifest: dict, root: str, table: str, df: pd.DataFrame, key: str = "all",
+                   partition_dir: str = None) -> bool:
+    """Write one partition if its content changed since the manifest. Returns True if written."""
+    signature = frame_signature(df)
+    current = manifest["tables"].get(table, {}).get("partitions", {}).get(key)
+    directory = os.path.join(root, table, partition_dir) if partition_dir else os.path.join(root, table)
+    if current and current["signature"] == signature and os.path.exists(current["path"]):
+        return False
+    path = write_partition(df, directory, signature)
+    _record(manifest, table, key, {
+        "path": path,
+        "rows": len(df),
+        "signature": signature,
+        "columns": [str(c) for c in df.columns],
+        "written_at": datetime.datetime.now().isoformat(timespec="seconds"),
+    })
+    return True
+
+
+# ========================= SOURCES =========================
+def transaction_months(conn) -> pd.DataFrame:
+    """Per-month (count, row checksum) of transactions: the signature that decides which partitions to rewrite."""
+    columns = timed_read_sql("SELECT * FROM transactions WHERE 1 = 0", conn, label="snapshots.columns").columns
+    months = timed_read_sql(
+        f"""
+        SELECT
+            YEAR(transaction_date) AS y,
+            MONTH(transaction_date) AS m,
+            COUNT(*) AS n,
+            {row_checksum(columns)} AS checksum
+        FROM transactions
+        GROUP BY YEAR(transaction_date), MONTH(transaction_date)
+        ORDER BY y, m
+        """,
+        conn,
+        label="snapshots.transaction_months",
+    )
+    dated = months["y"].notna() & months["m"].notna()
+    months["month"] = "unknown"
+    months.loc[dated, "month"] = [f"{int(y):04d}-{int(m):02d}" for y, m in zip(months.loc[dated, "y"], months.loc[dated, "m"])]
+    return months
+
+
+def snapshot_transactions(manifest: dict, root: str, conn) -> list:
+    """Write the month partitions of `transactions` that are new or changed; remove months without rows."""
+    table = manifest["tables"].setdefault("transactions", {"partitions": {}})
+    months = transaction_months(conn)
+    for month in set(table["partitions"]) - set(months["month"]):
+        shutil.rmtree(os.path.join(root, "transactions", f"month={month}"), ignore_errors=True)
+        del table["partitions"][month]
+
+    written = []
+    for row in months.itertuples(index=False):
+        source = f"{int(row.n)}:{int(row.checksum)}"
+        current = table["partitions"].get(row.month)
+        if current and current.get("source") == source and os.path.exists(current["path"]):
+            continue
+
+        if row.month == "unknown":
+            where, params = "transaction_date IS NULL", None
+        else:
+            start = datetime.date.fromisoformat(f"{row.month}-01")
+            end = (start + datetime.timedelta(days=32)).replace(day=1)
+            where, params = "transaction_date >= %s AND transaction_date < %s", [start, end]
+        df = timed_read_sql(
+            f"SELECT * FROM transactions WHERE {where} ORDER BY transaction_id",
+            conn,
+            params=params,
+            label="snapshots.transactions_month",
+        )
+        if snapshot_frame(manifest, root, "transactions", df, key=row.month, partition_dir=f"month={row.month}"):
+            written.append(f"transactions/month={row.month}")
+        table["partitions"][row.month]["source"] = source
+    return written
+
+
+def snapshot_finance(manifest: dict, root: str, conn) -> list:
+    """budgets, budget lines (budget vs. spent per line) and transactions."""
+    written = []
+    budgets = timed_read_sql("SELECT * FROM budgets ORDER BY budget_id", conn, label="snapshots.budgets")
+    if snapshot_frame(manifest, root, "budgets", budgets):
+        written.append("budgets")
+
+    lines = timed_read_sql(
+        """
+        SELECT
+            b.budget_line,
+            COUNT(*) AS items,
+            COALESCE(SUM(b.budget_usd), 0) AS budget_usd,
+            COALESCE(SUM(x.spent), 0) AS spent_usd
+        FROM budgets b
+        LEFT JOIN (
+            SELECT budget_id, SUM(amount_usd) AS spent
+            FROM transactions
+            GROUP BY budget_id
+        ) x ON x.budget_id = b.budget_id
+        GROUP BY b.budget_line
+        ORDER BY b.budget_line
+        """,
+        conn,
+        label="snapshots.budget_lines",
+    )
+    if snapshot_frame(manifest, root, "budget_lines", lines):
+        written.append("budget_lines")
+
+    return written + snapshot_transactions(manifest, root, conn)
+
+
+def snapshot_sqlite(manifest: dict, root: str, db_path: str = SUBTASKS_DB) -> list:
+    """Copy the planning tables of subtasks.db."""
+    written = []
+    conn = sqlite3.connect(db_path)
+    try:
+        existing = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        for table in SQLITE_TABLES:
+            if table not in existing:
+                continue
+            df = timed_read_sql(f'SELECT * FROM "{table}"', conn, label=f"snapshots.{table}")
+            if snapshot_frame(manifest, root, table, df):
+                written.append(table)
+    finally:
+        conn.close()
+    return written
+
+
+def take_snapshot(root: str = SNAPSHOT_DIR, finance_conn=None, include_finance: bool = True,
+                  db_path: str = SUBTASKS_DB) -> dict:
+    """
+    Snapshot all tables into `root`, writing only new or changed partitions.
+    Returns this run's manifest entry.
+    """
+    os.makedirs(root, exist_ok=True)
+    manifest = load_manifest(root)
+    before = _partition_names(manifest)
+    written = snapshot_sqlite(manifest, root, db_path)
+
+    if include_finance:
+        conn, own_conn = finance_conn, False
+        if conn is None:
+            from finance import get_connection
+            conn, own_conn = get_connection(), True
+        try:
+            written += snapshot_finance(manifest, root, conn)
+        finally:
+            if own_conn:
+                conn.close()
+
+    after = _partition_names(manifest)
+    run = {
+        "taken_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "written": written,
+        "removed": sorted(before - after),
+        "unchanged": len(after) - len(written),
+    }
+    manifest["runs"] = (manifest.get("runs", []) + [run])[-100:]
+    _save_manifest(manifest, root)
+    return run
+
+
+def load_snapshot(table: str, root: str = SNAPSHOT_DIR) -> pd.DataFrame:
+    """Read a snapshotted table (all partitions; `month` is added for transactions)."""
+    return pd.read_parquet(os.path.join(root, table))
+
+
+def snapshot_job(job, include_finance: bool = True):
+    """Background job ("snapshot.run")."""
+    job.progress(0.1, "Taking snapshot")
+    run = take_snapshot(include_finance=include_finance)
+    job.progress(1.0, f"{len(run['written'])} partitions written, {run['unchanged']} unchanged")
+    return run
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export finance and planning tables to partitioned Parquet.")
+    parser.add_argument("--out", default=SNAPSHOT_DIR, help="Snapshot directory")
+    parser.add_argument("--skip-finance", action="store_true", help="Only snapshot subtasks.db tables")
+    args = parser.parse_args()
+
+    result = take_snapshot(args.out, include_finance=not args.skip_finance)
+    print(f"Wrote {len(result['written'])} partitions ({result['unchanged']} unchanged) -> {manifest_path(args.out)}")
+    for part in result["written"]:
+        print(f"  {part}")
+    for part in result["removed"]:
+        print(f"  removed {part}")
@@ -0,0 +1,172 @@
+import decimal
+import hashlib
+import os
+import threading
+import time
+
+import pandas as pd
+from instrumentation import query_timer
+
+# ========================= STREAMING READS =========================
+# pd.read_sql fetches the whole result before building one DataFrame. stream_sql
+# instead reads an unbuffered cursor (mysql.connector's default; server-side for
+# MySQL) in batches of `chunk_rows` and yields one typed DataFrame per batch, so
+# consumers hold a single chunk at a time. Works with any DB-API connection,
+# including the finance replica.
+CHUNK_ROWS = 2000
+EXPORT_DIR = os.path.join(".cache", "exports")
+# Exports kept on disk: the newest MAX_EXPORTS, none older than EXPORT_MAX_AGE seconds
+MAX_EXPORTS = 20
+EXPORT_MAX_AGE = 24 * 3600
+
+
+def _typed_chunk(rows, columns, dtypes):
+    df = pd.DataFrame.from_records(rows, columns=columns)
+    for col in columns:
+        if col in dtypes:
+            continue
+        values = df[col].dropna()
+        if values.empty:
+            continue
+        if pd.api.types.is_bool_dtype(values):
+            continue
+        if pd.api.types.is_integer_dtype(values):
+            dtypes[col] = "Int64"
+        elif pd.api.types.is_float_dtype(values) or isinstance(values.iloc[0], decimal.Decimal):
+            dtypes[col] = "float64"
+    for col, dtype in dtypes.items():
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype(dtype)
+    return df
+
+
+def stream_sql(query: str, conn, params=None, chunk_rows: int = CHUNK_ROWS, dtypes: dict = None,
+               label: str = "stream"):
+    """
+    Yield the result of `query` as DataFrames of up to `chunk_rows` rows. Column
+    types are fixed by the first chunk that has a value (numeric columns become
+    float64/Int64) or given in `dtypes`, so every chunk has the same schema.
+    """
+    dtypes = dict(dtypes or {})
+    with query_timer(label) as event:
+        cur = conn.cursor()
+        rows_seen = 0
+        try:
+            cur.execute(query, params or ())
+            columns = [d[0] for d in cur.description]
+            while True:
+                rows = cur.fetchmany(chunk_rows)
+                if not rows:
+                    break
+                rows_seen += len(rows)
+                yield _typed_chunk(rows, columns, dtypes)
+        finally:
+            # An unbuffered MySQL cursor must be read to the end before the
+            # connection can run another statement (consumer stopped early)
+            try:
+                while cur.fetchmany(chunk_rows):
+                    pass
+            except Exception:
+                pass
+            cur.close()
+            event["rows"] = rows_seen
+
+
+class StreamSummary:
+    """Consumers for one pass over a stream: row count, column totals, one page and a CSV file."""
+
+    def __init__(self, sum_columns=(), page: int = 1, page_size: int = 100, csv_path: str = None):
+        self.rows = 0
+        self.totals = {c: 0.0 for c in sum_columns}
+        self.page_start = (max(int(page), 1) - 1) * page_size
+        self.page_size = page_size
+        self._page_parts = []
+        self.csv_path = csv_path
+        self._csv = None
+        self._tmp = None
+
+    def add(self, chunk: pd.DataFrame):
+        start, end = self.rows, self.rows + len(chunk)
+        for col in self.totals:
+            self.totals[col] += float(pd.to_numeric(chunk[col], errors="coerce").sum())
+
+        lo = max(self.page_start - start, 0)
+        hi = min(self.page_start + self.page_size - start, len(chunk))
+        if lo < hi:
+            self._page_parts.append(chunk.iloc[lo:hi])
+
+        if self.csv_path:
+            header = self._csv is None
+            if header:
+                self._open_csv()
+            chunk.to_csv(self._csv, index=False, header=header)
+        self.rows = end
+
+    def _open_csv(self):
+        os.makedirs(os.path.dirname(self.csv_path) or ".", exist_ok=True)
+        self._tmp = f"{self.csv_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        self._csv = open(self._tmp, "w", newline="", encoding="utf-8")
+
+    def consume(self, chunks):
+        """Feed every chunk of a stream; returns self."""
+        columns = None
+        for chunk in chunks:
+            columns = chunk.columns
+            self.add(chunk)
+        self.columns = columns
+        self.close()
+        return self
+
+    def close(self):
+        if self.csv_path and self._csv is None and self.rows == 0:
+            self._open_csv()  # empty result: empty file
+        if self._csv is not None:
+            self._csv.close()
+            os.replace(self._tmp, self.csv_path)
+            self._csv = None
+
+    def page(self) -> pd.DataFrame:
+        """Rows of the requested page (empty frame if past the end)."""
+        if not self._page_parts:
+            return pd.DataFrame(columns=getattr(self, "columns", None))
+        return pd.concat(self._page_parts, ignore_index=True)
+
+    def pages(self) -> int:
+        return max((self.rows + self.page_size - 1) // self.page_size, 1)
+
+
+def export_path(name: str, *key) -> str:
+    """Path under .cache/exports for an export identified by `key` (e.g. query and parameters)."""
+    digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(EXPORT_DIR, f"{name}_{digest}.csv")
+
+
+def prune_exports(keep: str = None, directory: str = EXPORT_DIR) -> int:
+    """
+    Delete old exports (and abandoned temp files) so the export directory stays
+    bounded; `keep` is never deleted. Returns the number of files removed.
+    """
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return 0
+    now = time.time()
+    files = []
+    for name in names:
+        path = os.path.join(directory, name)
+        try:
+            files.append((os.path.getmtime(path), path))
+        except OSError:
+            continue
+    files.sort(reverse=True)
+    removed = 0
+    for i, (mtime, path) in enumerate(files):
+        if keep and os.path.abspath(path) == os.path.abspath(keep):
+            continue
+        if i >= MAX_EXPORTS or now - mtime > EXPORT_MAX_AGE:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+    return removed
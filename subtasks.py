@@ -2,69 +2,29 @@ import sqlite3
 import pandas as pd
 import streamlit as st
 import datetime
-import base64
-import json
-import requests
-
-
-# ========================= GITHUB PUSH FUNCTION =========================
-def upload_file_to_github(
-    github_user: str,
-    github_repo: str,
-    github_pat: str,
-    file_path: str,
-    local_file_path: str,
-    commit_message: str,
-):
-    """
-    Upload or update a file (e.g., 'subtasks.db') in the given GitHub repo.
-    """
-    url = f"https://api.github.com/repos/{github_user}/{github_repo}/contents/{file_path}"
-    headers = {"Authorization": f"Bearer {github_pat}"}
-
-    # Read local file into memory
-    with open(local_file_path, "rb") as file:
-        content = file.read()
-
-    b64_content = base64.b64encode(content).decode("utf-8")
-
-    # Check if file already exists on GitHub to get its 'sha'
-    response = requests.get(url, headers=headers)
-    sha = response.json()["sha"] if response.status_code == 200 else None
+from concurrency import ConcurrencyConflict, changed_fields, merge_view, three_way_merge
+from instrumentation import query_timer
 
-    payload = {
-        "message": commit_message,
-        "content": b64_content,
-        "sha": sha,
-    }
 
-    response = requests.put(url, headers=headers, data=json.dumps(payload))
-    if response.status_code in [200, 201]:
-        st.success("Database successfully pushed to GitHub.")
-    else:
-        st.error(f"Failed to upload file to GitHub: {response.status_code}\n{response.text}")
-
-
-def push_db_to_github(commit_message: str = None):
+# ========================= GITHUB PUSH =========================
+def push_db_to_github(commit_message: str = None) -> int:
     """
-    Helper to push 'subtasks.db' to your GitHub repo with a default or custom commit message.
+    Queue a background push of 'subtasks.db' to the GitHub repo (see jobs.py) and
+    return the job id. Repeated saves while a push is still queued share that job.
     """
+    from jobs import submit
+
     if commit_message is None:
         commit_message = f"Update subtasks.db at {datetime.datetime.now()}"
-    
-    # Use st.secrets or your own method for these values:
-    github_user = "habdulhaq87"
-    github_repo = "amasdatadriven"
-    github_pat = st.secrets["github"]["pat"]
-
-    upload_file_to_github(
-        github_user=github_user,
-        github_repo=github_repo,
-        github_pat=github_pat,
-        file_path="subtasks.db",       # GitHub path
-        local_file_path="subtasks.db", # Local file
-        commit_message=commit_message,
+
+    job_id = submit(
+        "github.push",
+        {"local_file_path": "subtasks.db", "file_path": "subtasks.db", "commit_message": commit_message},
+        dedupe_key="github.push:subtasks.db",
     )
+    st.session_state["github_push_job"] = job_id
+    st.info(f"GitHub push queued (job #{job_id}).")
+    return job_id
 
 
 # ========================= DATABASE SETUP =========================
@@ -88,22 +48,44 @@ def initialize_subtasks_database():
             person_involved TEXT,
             budget REAL,
             deadline TEXT,
-            progress INTEGER
+            progress INTEGER,
+            version INTEGER NOT NULL DEFAULT 1
         )
         """
     )
+    ensure_version_column(conn)
     conn.commit()
     return conn
 
 
+def ensure_version_column(conn):
+    """Add the row `version` column to databases created before it existed."""
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(subtasks)")]
+    if "version" not in columns:
+        conn.execute("ALTER TABLE subtasks ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+        conn.commit()
+
+
+def fetch_subtask(conn, subtask_id):
+    """Return one subtask as a dict (None if it does not exist)."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM subtasks WHERE id = ?", (subtask_id,))
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    return dict(zip([col[0] for col in cursor.description], row))
+
+
 def fetch_subtasks_from_db(conn):
     """
     Fetch all subtasks from the database as a pandas DataFrame.
     """
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM subtasks")
-    columns = [col[0] for col in cursor.description]
-    rows = cursor.fetchall()
+    with query_timer("subtasks.fetch_all") as event:
+        cursor.execute("SELECT * FROM subtasks")
+        columns = [col[0] for col in cursor.description]
+        rows = cursor.fetchall()
+        event["rows"] = len(rows)
     return pd.DataFrame(rows, columns=columns)
 
 
@@ -141,65 +123,182 @@ def save_subtasks_to_db(conn, subtasks):
     push_db_to_github(commit_message="Add new subtasks.")
 
 
-def update_subtask_in_db(conn, subtask_id, updated_data):
+SUBTASK_FIELDS = [
+    "category", "aspect", "current_situation", "name", "detail", "start_time",
+    "outcome", "person_involved", "budget", "deadline", "progress",
+]
+
+
+def update_subtask_in_db(conn, subtask_id, updated_data, expected_version=None):
     """
     Update a subtask in the database by its ID.
+    With `expected_version`, the update only applies if nobody saved the row since
+    that version was read; otherwise ConcurrencyConflict is raised with the current row.
+    Without it, ValueError is raised if no subtask has that ID.
     Then push the updated 'subtasks.db' to GitHub.
     """
-    cursor = conn.cursor()
-    cursor.execute(
-        """
+    query = """
         UPDATE subtasks
         SET category = ?, aspect = ?, current_situation = ?, name = ?, detail = ?,
-            start_time = ?, outcome = ?, person_involved = ?, budget = ?, deadline = ?, progress = ?
+            start_time = ?, outcome = ?, person_involved = ?, budget = ?, deadline = ?, progress = ?,
+            version = version + 1
         WHERE id = ?
-        """,
-        (
-            updated_data.get("category", ""),
-            updated_data.get("aspect", ""),
-            updated_data.get("current_situation", ""),
-            updated_data.get("name", ""),
-            updated_data.get("detail", ""),
-            updated_data.get("start_time", None),
-            updated_data.get("outcome", ""),
-            updated_data.get("person_involved", ""),
-            updated_data.get("budget", 0.0),
-            updated_data.get("deadline", None),
-            updated_data.get("progress", 0),
-            subtask_id,
-        ),
-    )
+        """
+    params = [
+        updated_data.get("category", ""),
+        updated_data.get("aspect", ""),
+        updated_data.get("current_situation", ""),
+        updated_data.get("name", ""),
+        updated_data.get("detail", ""),
+        updated_data.get("start_time", None),
+        updated_data.get("outcome", ""),
+        updated_data.get("person_involved", ""),
+        updated_data.get("budget", 0.0),
+        updated_data.get("deadline", None),
+        updated_data.get("progress", 0),
+        subtask_id,
+    ]
+    if expected_version is not None:
+        query += " AND version = ?"
+        params.append(int(expected_version))
+
+    cursor = conn.cursor()
+    with query_timer("subtasks.update") as event:
+        cursor.execute(query, params)
+        event["rows"] = cursor.rowcount
+    if cursor.rowcount == 0:
+        conn.rollback()
+        if expected_version is None:
+            raise ValueError(f"Subtask {subtask_id} not found.")
+        raise ConcurrencyConflict(subtask_id, fetch_subtask(conn, subtask_id))
     conn.commit()
 
     # Push the updated DB to GitHub
     push_db_to_github(commit_message=f"Update subtask {subtask_id}.")
 
 
-def delete_subtask_from_db(conn, subtask_id):
+def delete_subtask_from_db(conn, subtask_id, expected_version=None):
     """
     Delete a subtask from the database by its ID.
+    With `expected_version`, refuses (ConcurrencyConflict) if the row changed since it was read.
     Then push the updated 'subtasks.db' to GitHub.
     """
+    query = "DELETE FROM subtasks WHERE id = ?"
+    params = [subtask_id]
+    if expected_version is not None:
+        query += " AND version = ?"
+        params.append(int(expected_version))
+
     cursor = conn.cursor()
-    cursor.execute("DELETE FROM subtasks WHERE id = ?", (subtask_id,))
+    cursor.execute(query, params)
+    if cursor.rowcount == 0 and expected_version is not None:
+        conn.rollback()
+        raise ConcurrencyConflict(subtask_id, fetch_subtask(conn, subtask_id))
     conn.commit()
 
     # Push the updated DB to GitHub
     push_db_to_github(commit_message=f"Delete subtask {subtask_id}.")
 
 
+# ========================= PARQUET / ARROW IMPORT =========================
+# Uploaded column name -> subtasks column name
+SUBTASK_COLUMN_MAP = {
+    "Category": "category",
+    "Aspect": "aspect",
+    "Current Situation": "current_situation",
+    "Name": "name",
+    "Detail": "detail",
+    "Start Time": "start_time",
+    "Outcome": "outcome",
+    "Person Involved": "person_involved",
+    "Budget": "budget",
+    "Deadline": "deadline",
+    "Progress (%)": "progress",
+}
+
+
+def _arrow_column_values(column, target: str) -> list:
+    """Convert one Arrow column into Python values for the given subtasks column."""
+    import pyarrow.compute as pc
+    import pyarrow.types as pat
+
+    if target in ("start_time", "deadline"):
+        if pat.is_date(column.type) or pat.is_timestamp(column.type):
+            return pc.strftime(column, format="%Y-%m-%d").to_pylist()
+        return [pd.to_datetime(v).date().isoformat() if v else None for v in column.to_pylist()]
+    if target == "budget":
+        return pc.fill_null(column.cast("float64"), 0.0).to_pylist()
+    if target == "progress":
+        # Fractional percentages (e.g. 37.5) are rounded; a plain int64 cast rejects them
+        return pc.fill_null(pc.round(column.cast("float64")).cast("int64"), 0).to_pylist()
+    return pc.fill_null(column.cast("string"), "").to_pylist()
+
+
+def save_subtask_batches(conn, batches) -> int:
+    """
+    Insert subtasks from an iterator of Arrow RecordBatches in a single transaction.
+    Each batch is inserted with executemany using its native column types.
+    Returns the number of inserted rows.
+    """
+    targets = list(SUBTASK_COLUMN_MAP.values())
+    insert_sql = f"INSERT INTO subtasks ({', '.join(targets)}) VALUES ({', '.join('?' for _ in targets)})"
+
+    inserted = 0
+    with conn:
+        for batch in batches:
+            names = batch.schema.names
+            columns = []
+            for source, target in SUBTASK_COLUMN_MAP.items():
+                if source in names:
+                    columns.append(_arrow_column_values(batch.column(names.index(source)), target))
+                else:
+                    default = {"budget": 0.0, "progress": 0, "start_time": None, "deadline": None}.get(target, "")
+                    columns.append([default] * batch.num_rows)
+            rows = list(zip(*columns))
+            conn.executemany(insert_sql, rows)
+            inserted += len(rows)
+    return inserted
+
+
 # ========================= UI FUNCTIONS =========================
 def upload_csv_subtasks(conn):
     """
-    Provide a file uploader to import subtasks from a CSV file.
-    The CSV is expected to have columns:
+    Provide a file uploader to import subtasks from a CSV, Parquet or Arrow IPC file.
+    The file is expected to have columns:
       Category, Aspect, Current Situation, Name, Detail, Start Time, 
       Outcome, Person Involved, Budget, Deadline, Progress (%)
     """
+    from database_phases import ARROW_FORMATS, detect_file_format, open_arrow_batches, read_uploaded_table
+
     st.subheader("Upload Subtasks from CSV")
-    csv_file = st.file_uploader("Upload CSV", type=["csv"])
+    csv_file = st.file_uploader("Upload CSV, Parquet or Arrow", type=["csv", "parquet", "arrow", "feather"])
 
     if csv_file is not None:
+        file_content = csv_file.getvalue()
+        file_format = detect_file_format(file_content, csv_file.name)
+
+        if file_format in ARROW_FORMATS:
+            try:
+                preview = read_uploaded_table(file_content, file_format=file_format)
+            except ImportError:
+                st.error("Install pyarrow to import Parquet/Arrow files.")
+                return
+
+            st.write("Preview of uploaded file:")
+            st.dataframe(preview.head())
+
+            if st.button("Import File"):
+                try:
+                    _, batches = open_arrow_batches(file_content, file_format)
+                    inserted = save_subtask_batches(conn, batches)
+                except (ValueError, TypeError, sqlite3.Error) as e:
+                    # pyarrow's ArrowInvalid / ArrowTypeError are ValueError / TypeError
+                    st.error(f"Import failed, no subtasks were added: {e}")
+                else:
+                    push_db_to_github(commit_message="Add new subtasks.")
+                    st.success(f"{inserted} subtasks imported; GitHub push queued.")
+            return
+
         df = pd.read_csv(csv_file)
 
         st.write("Preview of uploaded CSV:")
@@ -226,7 +325,7 @@ def upload_csv_subtasks(conn):
 
             # Now save the newly uploaded subtasks to the database
             save_subtasks_to_db(conn, new_subtasks)
-            st.success("CSV subtasks imported and pushed to GitHub successfully!")
+            st.success("CSV subtasks imported; GitHub push queued.")
 
 
 def render_saved_subtasks(conn):
@@ -239,6 +338,16 @@ def render_saved_subtasks(conn):
     """
     st.subheader("View and Edit Saved Subtasks")
 
+    # Message of a save that was followed by a rerun
+    flash = st.session_state.pop("subtasks_saved", None)
+    if flash:
+        st.success(flash)
+
+    # Status of the latest queued GitHub push from this session
+    if "github_push_job" in st.session_state:
+        from jobs_ui import render_job_progress
+        render_job_progress(st.session_state["github_push_job"], key="subtasks_push")
+
     # Allow CSV upload here
     upload_csv_subtasks(conn)
 
@@ -247,27 +356,98 @@ def render_saved_subtasks(conn):
 
     if not saved_subtasks.empty:
         for _, subtask in saved_subtasks.iterrows():
-            with st.expander(f"Subtask ID: {subtask['id']}"):
+            sid = subtask["id"]
+            # The row as it was when this editor opened: its version guards the save,
+            # its values are the common ancestor for the merge view.
+            base_key = f"subtask_base_{sid}"
+            if base_key not in st.session_state:
+                st.session_state[base_key] = subtask.to_dict()
+            base = st.session_state[base_key]
+
+            with st.expander(f"Subtask ID: {sid}"):
                 updated_data = {}
 
-                updated_data["category"] = st.text_input("Category", subtask["category"], key=f"category_{subtask['id']}")
-                updated_data["aspect"] = st.text_input("Aspect", subtask["aspect"], key=f"aspect_{subtask['id']}")
-                updated_data["current_situation"] = st.text_area("Current Situation", subtask["current_situation"], key=f"current_situation_{subtask['id']}")
-                updated_data["name"] = st.text_input("Name", subtask["name"], key=f"name_{subtask['id']}")
-                updated_data["detail"] = st.text_area("Detail", subtask["detail"], key=f"detail_{subtask['id']}")
-                updated_data["start_time"] = st.text_input("Start Time", subtask["start_time"], key=f"start_time_{subtask['id']}")
-                updated_data["outcome"] = st.text_area("Outcome", subtask["outcome"], key=f"outcome_{subtask['id']}")
-                updated_data["person_involved"] = st.text_input("Person Involved", subtask["person_involved"], key=f"person_involved_{subtask['id']}")
-                updated_data["budget"] = st.number_input("Budget", subtask["budget"], step=100.0, key=f"budget_{subtask['id']}")
-                updated_data["deadline"] = st.text_input("Deadline", subtask["deadline"], key=f"deadline_{subtask['id']}")
-                updated_data["progress"] = st.slider("Progress (%)", 0, 100, subtask["progress"], key=f"progress_{subtask['id']}")
-
-                if st.button(f"Save Changes for Subtask {subtask['id']}", key=f"save_{subtask['id']}"):
-                    update_subtask_in_db(conn, subtask["id"], updated_data)
-                    st.success(f"Subtask {subtask['id']} updated and pushed to GitHub.")
-
-                if st.button(f"Delete Subtask {subtask['id']}", key=f"delete_{subtask['id']}"):
-                    delete_subtask_from_db(conn, subtask["id"])
-                    st.success(f"Subtask {subtask['id']} deleted and pushed to GitHub.")
+                updated_data["category"] = st.text_input("Category", base["category"], key=f"category_{sid}")
+                updated_data["aspect"] = st.text_input("Aspect", base["aspect"], key=f"aspect_{sid}")
+                updated_data["current_situation"] = st.text_area("Current Situation", base["current_situation"], key=f"current_situation_{sid}")
+                updated_data["name"] = st.text_input("Name", base["name"], key=f"name_{sid}")
+                updated_data["detail"] = st.text_area("Detail", base["detail"], key=f"detail_{sid}")
+                updated_data["start_time"] = st.text_input("Start Time", base["start_time"], key=f"start_time_{sid}")
+                updated_data["outcome"] = st.text_area("Outcome", base["outcome"], key=f"outcome_{sid}")
+                updated_data["person_involved"] = st.text_input("Person Involved", base["person_involved"], key=f"person_involved_{sid}")
+                updated_data["budget"] = st.number_input("Budget", base["budget"], step=100.0, key=f"budget_{sid}")
+                updated_data["deadline"] = st.text_input("Deadline", base["deadline"], key=f"deadline_{sid}")
+                updated_data["progress"] = st.slider("Progress (%)", 0, 100, base["progress"], key=f"progress_{sid}")
+
+                if int(subtask["version"]) != int(base["version"]):
+                    if not changed_fields(base, updated_data, SUBTASK_FIELDS):
+                        # Nothing edited here yet: just pick up the newer row
+                        _reset_subtask_editor(sid)
+                        st.rerun()
+                    st.info("This subtask was saved by someone else after you opened it; saving will show a merge view.")
+
+                if st.button(f"Save Changes for Subtask {sid}", key=f"save_{sid}"):
+                    try:
+                        update_subtask_in_db(conn, sid, updated_data, expected_version=base["version"])
+                        _reset_subtask_editor(sid)
+                        st.success(f"Subtask {sid} updated; GitHub push queued.")
+                    except ConcurrencyConflict as e:
+                        st.session_state[f"subtask_conflict_{sid}"] = e.current
+
+                if st.button(f"Delete Subtask {sid}", key=f"delete_{sid}"):
+                    try:
+                        delete_subtask_from_db(conn, sid, expected_version=base["version"])
+                        _reset_subtask_editor(sid)
+                        st.success(f"Subtask {sid} deleted; GitHub push queued.")
+                    except ConcurrencyConflict as e:
+                        st.session_state[f"subtask_conflict_{sid}"] = e.current
+
+                conflict_key = f"subtask_conflict_{sid}"
+                if conflict_key in st.session_state:
+                    render_subtask_conflict(conn, sid, base, updated_data, st.session_state[conflict_key])
     else:
         st.write("No subtasks found in the database.")
+
+
+def _reset_subtask_editor(subtask_id):
+    """Forget the editor's base row, conflict and widget values so it reloads from the database."""
+    for key in [f"subtask_base_{subtask_id}", f"subtask_conflict_{subtask_id}"] + \
+            [f"{field}_{subtask_id}" for field in SUBTASK_FIELDS]:
+        st.session_state.pop(key, None)
+
+
+def render_subtask_conflict(conn, subtask_id, base, mine, theirs):
+    """Merge view for a subtask saved by someone else while it was being edited."""
+    if theirs is None:
+        st.error(f"Subtask {subtask_id} was deleted by someone else.")
+        if st.button("Dismiss", key=f"conflict_dismiss_{subtask_id}"):
+            _reset_subtask_editor(subtask_id)
+            st.rerun()
+        return
+
+    merged, conflicts = three_way_merge(base, mine, theirs, SUBTASK_FIELDS)
+    st.warning(
+        f"Subtask {subtask_id} was changed by someone else (version {base['version']} → {theirs['version']}). "
+        + (f"Conflicting fields: {', '.join(conflicts)}." if conflicts else "Your changes do not overlap.")
+    )
+    st.dataframe(merge_view(base, mine, theirs, SUBTASK_FIELDS), use_container_width=True)
+
+    c1, c2, c3 = st.columns(3)
+    try:
+        if c1.button("Merge (keep theirs on conflicts)", key=f"conflict_merge_{subtask_id}"):
+            update_subtask_in_db(conn, subtask_id, merged, expected_version=theirs["version"])
+            _reset_subtask_editor(subtask_id)
+            st.session_state["subtasks_saved"] = f"Subtask {subtask_id} merged; GitHub push queued."
+            st.rerun()
+        if c2.button("Overwrite with mine", key=f"conflict_mine_{subtask_id}"):
+            update_subtask_in_db(conn, subtask_id, mine, expected_version=theirs["version"])
+            _reset_subtask_editor(subtask_id)
+            st.session_state["subtasks_saved"] = f"Subtask {subtask_id} updated; GitHub push queued."
+            st.rerun()
+    except ConcurrencyConflict as e:
+        # Changed yet again: show the newest version
+        st.session_state[f"subtask_conflict_{subtask_id}"] = e.current
+        st.rerun()
+    if c3.button("Discard mine", key=f"conflict_discard_{subtask_id}"):
+        _reset_subtask_editor(subtask_id)
+        st.rerun()
@@ -0,0 +1,172 @@
+import datetime
+import sqlite3
+
+import pytest
+
+import finance_replica as fr
+
+
+# ------------------- MySQL stand-in -------------------
+class StandInCursor:
+    """DB-API cursor with mysql.connector's %s placeholders over SQLite."""
+
+    def __init__(self, conn):
+        self._cur = conn.cursor()
+
+    def execute(self, query, params=()):
+        self._cur.execute(query.replace("%s", "?"), tuple(params or ()))
+
+    def fetchone(self):
+        return self._cur.fetchone()
+
+    def fetchmany(self, size):
+        return self._cur.fetchmany(size)
+
+    def fetchall(self):
+        return self._cur.fetchall()
+
+    @property
+    def description(self):
+        return self._cur.description
+
+    def close(self):
+        self._cur.close()
+
+
+class StandIn:
+    """The primary: budgets and transactions with MySQL-like types (dates as date objects)."""
+
+    def __init__(self):
+        self.db = sqlite3.connect(":memory:", detect_types=sqlite3.PARSE_DECLTYPES)
+        fr.register_mysql_functions(self.db)
+        self.db.execute(
+            "CREATE TABLE budgets (budget_id INTEGER PRIMARY KEY, budget_line TEXT, task TEXT, "
+            "start_date DATE, end_date DATE, budget_usd REAL)"
+        )
+        self.db.execute(
+            "CREATE TABLE transactions (transaction_id INTEGER PRIMARY KEY, budget_id INTEGER, "
+            "transaction_date DATE, description TEXT, amount_usd REAL, notes TEXT)"
+        )
+        self.db.executemany(
+            "INSERT INTO budgets VALUES (?, ?, ?, ?, ?, ?)",
+            [(i, f"Phase {i % 3}", f"task {i}", "2025-01-01", "2025-12-31", 1000.0 * i) for i in range(1, 6)],
+        )
+        self.db.executemany(
+            "INSERT INTO transactions (budget_id, transaction_date, description, amount_usd) VALUES (?, ?, ?, ?)",
+            [(i % 5 + 1, f"2025-03-{i % 28 + 1:02d}", f"item {i}", 10.0 + i) for i in range(2500)],
+        )
+
+    def cursor(self):
+        return StandInCursor(self.db)
+
+    def close(self):
+        self.db.close()
+
+
+@pytest.fixture
+def primary():
+    source = StandIn()
+    yield source
+    source.close()
+
+
+@pytest.fixture
+def replica_path(tmp_path):
+    return str(tmp_path / "replica.db")
+
+
+def _rows(path, query, params=()):
+    conn = fr.replica_connect(path)
+    try:
+        return conn.execute(query, params).fetchall()
+    finally:
+        conn.close()
+
+
+def _same_data(primary, path):
+    for table, key in fr.KEYS.items():
+        source = primary.db.execute(f"SELECT * FROM {table} ORDER BY {key}").fetchall()
+        assert _rows(path, f"SELECT * FROM {table} ORDER BY {key}") == source
+
+
+# ------------------- tests -------------------
+def test_first_sync_copies_both_tables_with_types(primary, replica_path):
+    result = fr.sync_replica(primary, replica_path)
+    assert result["full"] and result["budgets"] and result["transactions"] == 2500
+    _same_data(primary, replica_path)
+
+    date, amount = _rows(replica_path, "SELECT transaction_date, amount_usd FROM transactions LIMIT 1")[0]
+    assert isinstance(date, datetime.date)
+    assert isinstance(amount, float)
+    assert fr.replica_status(replica_path)["tx_watermark"] == 2500
+
+
+def test_unchanged_primary_pulls_nothing(primary, replica_path):
+    fr.sync_replica(primary, replica_path)
+    version = fr.replica_status(replica_path)["data_version"]
+
+    result = fr.sync_replica(primary, replica_path)
+    assert result == {"budgets": False, "transactions": 0, "blocks": 0, "full": False}
+    assert fr.replica_status(replica_path)["data_version"] == version
+
+
+def test_update_of_any_column_is_picked_up(primary, replica_path):
+    fr.sync_replica(primary, replica_path)
+    # count and SUM(amount_usd) stay the same: only a checksum notices these
+    primary.db.execute("UPDATE transactions SET budget_id = 5 WHERE transaction_id = 10")
+    primary.db.execute("UPDATE transactions SET description = 'fixed typo' WHERE transaction_id = 20")
+
+    result = fr.sync_replica(primary, replica_path)
+    assert not result["full"]
+    assert result["blocks"] == 1
+    _same_data(primary, replica_path)
+
+
+def test_inserts_and_deletes_are_picked_up(primary, replica_path):
+    fr.sync_replica(primary, replica_path)
+    primary.db.execute("DELETE FROM transactions WHERE transaction_id IN (5, 1500)")
+    primary.db.execute(
+        "INSERT INTO transactions (budget_id, transaction_date, description, amount_usd) "
+        "VALUES (1, '2025-04-01', 'new', 99.5)"
+    )
+
+    result = fr.sync_replica(primary, replica_path)
+    assert not result["full"]
+    assert result["blocks"] == 3
+    _same_data(primary, replica_path)
+    assert fr.replica_status(replica_path)["tx_watermark"] == 2501
+
+
+def test_budget_text_edit_reloads_budgets(primary, replica_path):
+    fr.sync_replica(primary, replica_path)
+    primary.db.execute("UPDATE budgets SET task = 'renamed' WHERE budget_id = 2")
+
+    result = fr.sync_replica(primary, replica_path)
+    assert result["budgets"]
+    assert _rows(replica_path, "SELECT task FROM budgets WHERE budget_id = 2") == [("renamed",)]
+
+
+def test_null_and_empty_values_differ(primary, replica_path):
+    primary.db.execute("UPDATE transactions SET notes = '' WHERE transaction_id = 7")
+    fr.sync_replica(primary, replica_path)
+    primary.db.execute("UPDATE transactions SET notes = NULL WHERE transaction_id = 7")
+
+    assert fr.sync_replica(primary, replica_path)["blocks"] == 1
+    assert _rows(replica_path, "SELECT notes FROM transactions WHERE transaction_id = 7") == [(None,)]
+
+
+def test_replica_cursor_accepts_mysql_placeholders(primary, replica_path):
+    fr.sync_replica(primary, replica_path)
+    conn = fr.ReplicaConnection(replica_path)
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            "SELECT COUNT(*) FROM transactions WHERE transaction_date BETWEEN %s AND %s",
+            (datetime.date(2025, 3, 1), datetime.date(2025, 3, 1)),
+        )
+        expected = primary.db.execute(
+            "SELECT COUNT(*) FROM transactions WHERE transaction_date = '2025-03-01'"
+        ).fetchone()
+        assert cur.fetchone() == expected
+    finally:
+        conn.close()
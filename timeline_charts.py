@@ -0,0 +1,211 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+# ------------------- FIGURE CACHE -------------------
+# slot (e.g. "phase2.summary") -> (fingerprint, built plotly Figure).
+# A slot holds one figure: when its task frame or options change, the new
+# figure replaces the old entry. Slots are evicted LRU beyond MAX_SLOTS.
+# The Figure object itself is kept (not its JSON): st.plotly_chart uses a
+# Figure as-is, while a dict or JSON string would be re-validated on every rerun.
+MAX_SLOTS = 64
+
+_figure_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """Hash of a frame's values, index, column names and dtypes."""
+    h = hashlib.sha1()
+    h.update(json.dumps([str(c) for c in df.columns]).encode())
+    h.update(json.dumps([str(t) for t in df.dtypes]).encode())
+    h.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return h.hexdigest()
+
+
+def figure_key(df: pd.DataFrame, options: dict) -> str:
+    """Cache key: frame fingerprint plus the chart/layout options."""
+    h = hashlib.sha1(frame_fingerprint(df).encode())
+    h.update(json.dumps(options, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+def cached_figure(slot: str, df: pd.DataFrame, build, **options):
+    """
+    Return the figure for `slot`, calling `build(df, **options)` only when the
+    data or options changed. The returned Figure is shared: pass it to
+    st.plotly_chart as-is and do not mutate it.
+    """
+    key = figure_key(df, options)
+    with _cache_lock:
+        cached = _figure_cache.get(slot)
+        if cached is not None and cached[0] == key:
+            _figure_cache.move_to_end(slot)
+            return cached[1]
+
+    figure = build(df, **options)
+    with _cache_lock:
+        _figure_cache[slot] = (key, figure)
+        _figure_cache.move_to_end(slot)
+        while len(_figure_cache) > MAX_SLOTS:
+            _figure_cache.popitem(last=False)
+    return figure
+
+
+def _build_timeline(df: pd.DataFrame, layout: dict = None, **timeline_kwargs):
+    import plotly.express as px
+
+    fig = px.timeline(df, **timeline_kwargs)
+    if layout:
+        fig.update_layout(**layout)
+    return fig
+
+
+def cached_timeline(slot: str, df: pd.DataFrame, layout: dict = None, **timeline_kwargs):
+    """px.timeline(df, **timeline_kwargs) with `layout` applied, cached per slot."""
+    return cached_figure(slot, df, _build_timeline, layout=layout, **timeline_kwargs)
+
+
+# ------------------- SCALABLE TIMELINE -------------------
+# Past SCALABLE_ROWS bars a per-subtask Gantt is unreadable, so pages default to
+# an aggregated (category/aspect) view with drill-down. Bars narrower than one
+# pixel of the plot are merged per row, and past WEBGL_ROWS bars the chart is
+# drawn as WebGL line segments instead of one SVG path per bar.
+SCALABLE_ROWS = 300
+WEBGL_ROWS = 1500
+PLOT_WIDTH_PX = 1200
+PROGRESS_BANDS = 5
+
+# Numeric columns added up when bars are merged; other numeric columns are averaged
+SUM_COLUMNS = ("Budget",)
+
+
+def aggregate_timeline(df: pd.DataFrame, by: str) -> pd.DataFrame:
+    """One bar per `by` value: earliest Start, latest End, subtask count, summed/averaged numbers."""
+    agg = {"Start": ("Start", "min"), "End": ("End", "max"), "Subtasks": ("Start", "size")}
+    for col in df.select_dtypes("number").columns:
+        if col in (by, "id"):
+            continue
+        agg[col] = (col, "sum" if col in SUM_COLUMNS else "mean")
+    return df.groupby(by, sort=True).agg(**agg).reset_index()
+
+
+def bucket_subpixel(df: pd.DataFrame, y: str, width_px: int = PLOT_WIDTH_PX) -> pd.DataFrame:
+    """
+    Merge bars shorter than one pixel (at `width_px` over the full date span) that
+    share a row and pixel column into a single bar. Adds a `Subtasks` count.
+    """
+    df = df.copy()
+    if "Subtasks" not in df:
+        df["Subtasks"] = 1
+    if df.empty:
+        return df
+
+    t0 = df["Start"].min()
+    span = df["End"].max() - t0
+    pixel = span / width_px if span > pd.Timedelta(0) else pd.Timedelta(days=1)
+    short = (df["End"] - df["Start"]) < pixel
+    if not short.any():
+        return df
+
+    small = df[short].copy()
+    small["_bucket"] = ((small["Start"] - t0) // pixel).astype("int64")
+    groups = small.groupby([y, "_bucket"], sort=False)
+
+    agg = {"Start": ("Start", "min"), "End": ("End", "max"), "Subtasks": ("Subtasks", "sum")}
+    for col in small.columns:
+        if col in agg or col in (y, "_bucket"):
+            continue
+        if pd.api.types.is_numeric_dtype(small[col]):
+            agg[col] = (col, "sum" if col in SUM_COLUMNS else "mean")
+        else:
+            agg[col] = (col, "first")
+    merged = groups.agg(**agg).reset_index().drop(columns="_bucket")
+
+    # Label merged bars by their count and keep them at least one pixel wide
+    text_cols = [c for c in merged.columns if c not in agg or agg[c][1] == "first"]
+    text_cols = [c for c in text_cols if c not in (y, "Start", "End")]
+    multi = merged["Subtasks"] > 1
+    for col in text_cols:
+        merged[col] = merged[col].astype(object)
+        merged.loc[multi, col] = merged.loc[multi, "Subtasks"].map(lambda n: f"{n} subtasks")
+    merged["End"] = merged["End"].where(merged["End"] - merged["Start"] >= pixel, merged["Start"] + pixel)
+
+    return pd.concat([df[~short], merged[df.columns]], ignore_index=True)
+
+
+def _hover_text(df: pd.DataFrame, y: str, hover_cols) -> pd.Series:
+    text = df[y].astype(str)
+    text = text + "<br>" + df["Start"].dt.strftime("%Y-%m-%d").fillna("TBD") + " – " + df["End"].dt.strftime("%Y-%m-%d").fillna("TBD")
+    for col in hover_cols:
+        text = text + f"<br>{col}: " + df[col].astype(str)
+    return text
+
+
+def _build_gl_timeline(df: pd.DataFrame, y: str, color: str = None, hover_data=(),
+                       title: str = None, layout: dict = None):
+    """
+    Timeline drawn with Scattergl: each bar is a thick horizontal line segment,
+    one trace per color group (progress bands for numeric colors).
+    """
+    import numpy as np
+    import plotly.graph_objects as go
+    from plotly.colors import sample_colorscale
+
+    if color is None:
+        groups = [(None, df, None)]
+    elif pd.api.types.is_numeric_dtype(df[color]):
+        low, high = df[color].min(), df[color].max()
+        edges = np.linspace(low, high, PROGRESS_BANDS + 1) if high > low else np.array([low, low + 1])
+        band = np.clip(np.searchsorted(edges, df[color].to_numpy(), side="right") - 1, 0, len(edges) - 2)
+        colors = sample_colorscale("Plasma", [i / max(len(edges) - 2, 1) for i in range(len(edges) - 1)])
+        groups = [
+            (f"{color} {edges[i]:.0f}–{edges[i + 1]:.0f}", df[band == i], colors[i])
+            for i in range(len(edges) - 1) if (band == i).any()
+        ]
+    else:
+        groups = [(str(value), part, None) for value, part in df.groupby(color, sort=True)]
+
+    rows = df[y].nunique()
+    line_width = max(2, min(18, 360 // max(rows, 1)))
+    hover_cols = [c for c in hover_data if c in df]
+
+    fig = go.Figure()
+    for name, part, line_color in groups:
+        n = len(part)
+        x = np.empty(3 * n, dtype=object)
+        x[0::3] = np.datetime_as_string(part["Start"].to_numpy(), unit="s")
+        x[1::3] = np.datetime_as_string(part["End"].to_numpy(), unit="s")
+        yy = np.empty(3 * n, dtype=object)
+        yy[0::3] = yy[1::3] = part[y].astype(str).to_numpy()
+        text = np.empty(3 * n, dtype=object)
+        text[0::3] = text[1::3] = _hover_text(part, y, hover_cols).to_numpy()
+        fig.add_trace(go.Scattergl(
+            x=x, y=yy, mode="lines", name=name, hovertext=text, hoverinfo="text",
+            line=dict(width=line_width, color=line_color), connectgaps=False,
+            showlegend=name is not None,
+        ))
+
+    fig.update_layout(title=title, xaxis_type="date")
+    fig.update_yaxes(type="category", categoryorder="category descending")
+    if layout:
+        fig.update_layout(**layout)
+    return fig
+
+
+def scalable_timeline(slot: str, df: pd.DataFrame, y: str, color: str = None, hover_data=(),
+                      title: str = None, layout: dict = None, width_px: int = PLOT_WIDTH_PX):
+    """
+    Cached timeline that stays interactive with thousands of bars: sub-pixel bars
+    are bucketed per row, and large results are drawn with WebGL (Scattergl).
+    """
+    bars = bucket_subpixel(df, y, width_px)
+    hover = [c for c in (*hover_data, "Subtasks") if c in bars]
+    if len(bars) > WEBGL_ROWS:
+        return cached_figure(slot, bars, _build_gl_timeline, y=y, color=color, hover_data=hover,
+                             title=title, layout=layout)
+    return cached_timeline(slot, bars, layout=layout, x_start="Start", x_end="End", y=y,
+                           color=color, hover_data=hover, title=title)
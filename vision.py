@@ -1,4 +1,5 @@
 import streamlit as st
+from assets import image_derivative
 
 def render_vision():
     # Title and Introduction
@@ -14,7 +15,7 @@ def render_vision():
     col1, col2 = st.columns([1, 3])
     with col1:
         st.image(
-            "input/seamless.jpeg",
+            image_derivative("input/seamless.jpeg"),
             caption="Automated Receiving",
             use_container_width=True
         )
@@ -33,7 +34,7 @@ def render_vision():
         """)
     with col2:
         st.image(
-            "input/integ.jpeg",
+            image_derivative("input/integ.jpeg"),
             caption="Integrated Inventory",
             use_container_width=True
         )
@@ -42,7 +43,7 @@ def render_vision():
     col1, col2 = st.columns([1, 3])
     with col1:
         st.image(
-            "input/well.jpeg",
+            image_derivative("input/well.jpeg"),
             caption="Optimized Shelving",
             use_container_width=True
         )
@@ -61,7 +62,7 @@ def render_vision():
         """)
     with col2:
         st.image(
-            "input/ceo.jpeg",
+            image_derivative("input/ceo.jpeg"),
             caption="Real-Time Dashboards",
             use_container_width=True
         )
@@ -70,7 +71,7 @@ def render_vision():
     col1, col2 = st.columns([1, 3])
     with col1:
         st.image(
-            "input/hr.jpg",
+            image_derivative("input/hr.jpg"),
             caption="Data-Driven Staff Management",
             use_container_width=True
         )
@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from phase_plans import DB_PATH, _db_stamp, load_phase_plan
+from schedule import HORIZON_DAYS
+
+# ========================= WORKLOAD ENGINE =========================
+# `person_involved` is free text ("Farman, Qasim, Tester"). It is split into one
+# assignment per person and swept over each subtask's start_time..deadline
+# (inclusive) to count concurrent subtasks per person per day.
+PERSON_SEPARATORS = r"\s*(?:[,;/&\n+]|\band\b)\s*"
+
+# A person working on more than this many subtasks on one day is overloaded
+OVERLOAD_TASKS = 2
+
+
+def parse_assignments(tasks: pd.DataFrame) -> pd.DataFrame:
+    """
+    One row per (subtask, person) with columns id, Person, Start, End.
+    Names are whitespace-normalized and matched case-insensitively; each person
+    is shown with their most frequent spelling. Rows without dates are dropped.
+    """
+    df = tasks[["id", "Person", "Start", "End"]].dropna(subset=["Start", "End"])
+    names = df["Person"].fillna("").astype(str).str.split(PERSON_SEPARATORS, regex=True)
+    df = df.assign(Person=names).explode("Person")
+    df["Person"] = df["Person"].str.strip().str.replace(r"\s+", " ", regex=True)
+    df = df[df["Person"].str.len() > 0]
+
+    key = df["Person"].str.casefold()
+    spellings = pd.DataFrame({"key": key, "Person": df["Person"]}).value_counts()
+    display = spellings.reset_index().drop_duplicates("key").set_index("key")["Person"]
+    df["Person"] = key.map(display)
+    return df.drop_duplicates(["id", "Person"]).reset_index(drop=True)
+
+
+def sweep_workload(assignments: pd.DataFrame):
+    """
+    Concurrent subtasks per person per day.
+    Returns (persons, dates, counts) where counts[i, j] is the number of
+    subtasks persons[i] is assigned to on dates[j].
+    """
+    if assignments.empty:
+        return [], pd.DatetimeIndex([]), np.zeros((0, 0), dtype=np.int32)
+
+    person_codes, persons = pd.factorize(assignments["Person"], sort=True)
+    start = assignments["Start"].dt.normalize()
+    end = assignments["End"].dt.normalize()
+    end = end.where(end >= start, start)
+    origin = start.min()
+    # A stray far-future date must not size the sweep: clamp to the schedule horizon
+    first = np.clip(((start - origin).dt.days).to_numpy(), 0, HORIZON_DAYS)
+    last = np.clip(((end - origin).dt.days).to_numpy(), 0, HORIZON_DAYS)
+    days = int(last.max()) + 1
+
+    # Interval sweep: +1 on the first day, -1 the day after the last, then a running sum.
+    # Flattened (person, day) indexes let bincount build the whole difference array at once.
+    width = days + 1
+    size = len(persons) * width
+    diff = np.bincount(person_codes * width + first, minlength=size)
+    diff -= np.bincount(person_codes * width + last + 1, minlength=size)
+    counts = np.cumsum(diff.reshape(len(persons), width), axis=1)[:, :days].astype(np.int32)
+
+    dates = pd.date_range(origin, periods=days, freq="D")
+    return list(persons), dates, counts
+
+
+def overload_windows(persons, dates, counts, limit: int = OVERLOAD_TASKS) -> pd.DataFrame:
+    """Consecutive days on which a person has more than `limit` concurrent subtasks."""
+    columns = ["Person", "From", "To", "Days", "Peak Tasks"]
+    if counts.size == 0:
+        return pd.DataFrame(columns=columns)
+
+    over = counts > limit
+    # Pad each row with a False on both sides so runs never cross rows
+    padded = np.zeros((over.shape[0], over.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = over
+    edges = np.diff(padded, axis=1)
+    rows, starts = np.nonzero(edges == 1)
+    _, stops = np.nonzero(edges == -1)
+    if len(rows) == 0:
+        return pd.DataFrame(columns=columns)
+
+    flat = counts.ravel()
+    offsets = rows * counts.shape[1]
+    bounds = np.column_stack([offsets + starts, offsets + stops]).ravel()
+    peaks = np.maximum.reduceat(np.append(flat, 0), bounds)[0::2]
+
+    windows = pd.DataFrame({
+        "Person": np.asarray(persons, dtype=object)[rows],
+        "From": dates[starts],
+        "To": dates[stops - 1],
+        "Days": stops - starts,
+        "Peak Tasks": peaks,
+    })
+    return windows.sort_values(["Peak Tasks", "Days"], ascending=False).reset_index(drop=True)
+
+
+# ========================= CACHED ACCESSOR =========================
+@st.cache_data(show_spinner=False)
+def _staff_workload(db_path: str, stamp: int, limit: int):
+    assignments = parse_assignments(load_phase_plan("phase1", db_path))
+    persons, dates, counts = sweep_workload(assignments)
+    return persons, dates, counts, overload_windows(persons, dates, counts, limit)
+
+
+def staff_workload(limit: int = OVERLOAD_TASKS, db_path: str = DB_PATH):
+    """
+    (persons, dates, counts, overload windows) for the Phase 1 subtasks,
+    cached until subtasks.db changes.
+    """
+    return _staff_workload(db_path, _db_stamp(db_path), limit)